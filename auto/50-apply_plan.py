@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import os, sys, json, pathlib, time, hashlib
 ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT/"tools"))
+from common.canonjson import canon
 WAL = ROOT/".rtt"/"wal"
 def merkle(prev_hash: str, content: bytes) -> str:
     return hashlib.sha256((prev_hash+hashlib.sha256(content).hexdigest()).encode()).hexdigest()
@@ -9,7 +11,7 @@ plan_path = ROOT/"plans"/plan_arg
 plan = json.loads(plan_path.read_text(encoding="utf-8"))
 prev = (WAL/"LATEST").read_text(encoding="utf-8").strip() if (WAL/"LATEST").exists() else "GENESIS"
 frame = {"ts": time.time(), "plan_id": plan.get("plan_id"), "prev": prev, "apply": plan.get("routes_add",[])}
-blob = json.dumps(frame, sort_keys=True).encode()
+blob = canon(frame)
 root = merkle(prev, blob)
 fn = WAL/f"{int(frame['ts'])}-{root[:12]}.wal.json"
 fn.write_text(json.dumps({"root":root, "frame":frame}, indent=2), encoding="utf-8")
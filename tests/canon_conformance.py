@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Conformance vectors for canonical JSON (tools/common/canonjson.py). Every digest,
+# signature and CAS name depends on these exact bytes: a change here is a format
+# change, not a fix. Checks canon(), the streaming update()/digest() (walked at
+# every size) and the memoizing Canonicalizer (cold and warm) against each vector.
+# usage: python tests/canon_conformance.py
+import hashlib, os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+from common import canonjson
+from common.canonjson import canon, update, digest, Canonicalizer
+
+INF, NAN = float("inf"), float("nan")
+BIG_LIST = list(range(100)) + [{"k": "v"}] * 3
+BIG_DICT = {f"k{i:03d}": [i, {"x": i}] for i in range(100)}
+SHARED = {"x": [1, 2]}
+
+VECTORS = [
+    # (name, input, expected bytes)
+    ("empty object", {}, b'{}'),
+    ("empty array", [], b'[]'),
+    ("scalars", [None, True, False, 0, -1], b'[null,true,false,0,-1]'),
+    ("no whitespace, sorted keys", {"b": 1, "a": [1, 2, {"d": None, "c": True}]}, b'{"a":[1,2,{"c":true,"d":null}],"b":1}'),
+    ("key order is code point order", {"b": 0, "a": 0, "B": 0, "\u00e9": 0, "z": 0, "\U0001F600": 0, "\uffff": 0},
+     b'{"B":0,"a":0,"b":0,"z":0,"\xc3\xa9":0,"\xef\xbf\xbf":0,"\xf0\x9f\x98\x80":0}'),
+    ("non-ASCII is raw UTF-8", "\u00e9\u4e2d\U0001F600", b'"\xc3\xa9\xe4\xb8\xad\xf0\x9f\x98\x80"'),
+    ("U+2028 is not escaped", "\u2028", b'"\xe2\x80\xa8"'),
+    ("escapes", "\x00\x1f\n\t\r\b\f\"\\/", b'"\\u0000\\u001f\\n\\t\\r\\b\\f\\"\\\\/"'),
+    ("integers are exact", [10 ** 20, -(2 ** 63)], b'[100000000000000000000,-9223372036854775808]'),
+    ("floats are repr", [1.0, 0.1, 1e16, 1e-7, -0.0, 2.5e-308], b'[1.0,0.1,1e+16,1e-07,-0.0,2.5e-308]'),
+    ("non-finite floats", [NAN, INF, -INF], b'[NaN,Infinity,-Infinity]'),
+    ("tuples are arrays", (1, (2, 3)), b'[1,[2,3]]'),
+    ("non-string keys", {2: "b", 1: "a"}, b'{"1":"a","2":"b"}'),
+    ("nested shared subtree", {"a": SHARED, "b": [SHARED, SHARED]}, b'{"a":{"x":[1,2]},"b":[{"x":[1,2]},{"x":[1,2]}]}'),
+    ("large array", BIG_LIST, ("[" + ",".join(map(str, range(100))) + ',{"k":"v"}' * 3 + "]").encode()),
+    ("large object", BIG_DICT, ("{" + ",".join(f'"k{i:03d}":[{i},{{"x":{i}}}]' for i in range(100)) + "}").encode()),
+]
+
+# sha256 of the vectors' bytes joined by newlines: catches any drift in the table itself
+VECTORS_SHA256 = "45a8f568f4fbc59d979356f4d4a09505ada5e191ab92b8773b3577c27db3fb51"
+
+def check(name, obj, want):
+    errs = []
+    if canon(obj) != want: errs.append(f"canon: {canon(obj)!r}")
+    for stream_min in (canonjson.STREAM_MIN, 0):
+        canonjson.STREAM_MIN, saved = stream_min, canonjson.STREAM_MIN
+        try:
+            if update(hashlib.sha256(), obj).digest() != hashlib.sha256(want).digest(): errs.append(f"update(STREAM_MIN={stream_min})")
+        finally:
+            canonjson.STREAM_MIN = saved
+    if digest(obj) != hashlib.sha256(want).hexdigest(): errs.append("digest")
+    c = Canonicalizer()
+    for run in ("cold", "warm"):
+        if c.canon(obj) != want: errs.append(f"Canonicalizer.canon ({run})")
+        if c.digest(obj) != hashlib.sha256(want).hexdigest(): errs.append(f"Canonicalizer.digest ({run})")
+    return errs
+
+def main():
+    ok = True
+    for name, obj, want in VECTORS:
+        errs = check(name, obj, want)
+        print(f"[FAIL] {name}: {'; '.join(errs)}" if errs else f"[OK] {name}")
+        ok &= not errs
+    # a lone surrogate has no UTF-8 form
+    for name, fn in (("canon", canon), ("update", lambda o: update(hashlib.sha256(), o)), ("Canonicalizer", Canonicalizer().canon)):
+        try:
+            fn(["\ud800"]); print(f"[FAIL] lone surrogate accepted by {name}"); ok = False
+        except UnicodeEncodeError:
+            pass
+    got = hashlib.sha256(b"\n".join(w for _, _, w in VECTORS)).hexdigest()
+    if got != VECTORS_SHA256:
+        print(f"[FAIL] vector table changed: {got}"); ok = False
+    # every canon in tools/ is this one
+    import json_canon
+    from common import util
+    if not (json_canon.canon is canon and util.canon is canon):
+        print("[FAIL] a tool defines its own canon()"); ok = False
+    print("[OK] canonical JSON conforms" if ok else "[FAIL] canonical JSON does not conform")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
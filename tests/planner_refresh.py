@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# Planner daemon refresh (tools/planner_daemon.py): an in-place manifest edit must
+# reach the daemon's state even when another loader has already re-parsed the file
+# into the shared .rtt/cache snapshot before the daemon's poll.
+# usage: python tests/planner_refresh.py
+import json, os, sys, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from tools.planner_daemon import PlannerState
+from tools.common.manifests import load_store
+
+SADDR = "rtt://bench/api/a@1.0.0"
+
+def write(path, version_set, bump=0):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"symbol": {"saddr": SADDR, "version_set": version_set}}, f)
+    st = os.stat(path)   # a distinct mtime even on coarse-grained filesystems
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))
+
+def main():
+    errs = []
+    with tempfile.TemporaryDirectory() as root:
+        mdir = os.path.join(root, ".rtt", "manifests")
+        os.makedirs(mdir); os.makedirs(os.path.join(root, ".rtt", "cache"))
+        path = os.path.join(mdir, "a.json")
+        write(path, ">=1.0 <2.0")
+        st = PlannerState(root); st.refresh(full=True)
+        write(path, ">=9.0.0", bump=10 ** 9)
+        if load_store(mdir).stats["parsed"] != 1: errs.append("the other loader did not re-parse the edit")
+        changed = st.refresh(full=True)
+        if "manifests" not in changed: errs.append(f"refresh after another loader: changed={sorted(changed)}")
+        got = st.manis.get(SADDR, {}).get("version_set")
+        if got != ">=9.0.0": errs.append(f"daemon serves version_set {got!r}")
+        if "manifests" in st.refresh(full=True): errs.append("unchanged manifests reported as changed")
+    print(f"[FAIL] planner refresh: {'; '.join(errs)}" if errs else "[OK] planner refresh")
+    sys.exit(1 if errs else 0)
+
+if __name__ == "__main__":
+    main()
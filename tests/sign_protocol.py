@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# rtt-sign serve line protocol (tools/common/crypto_ed25519.py): untrusted signatures
+# and keys must not be able to add requests or shift responses. Runs against the
+# stub binary of tools/bench/bench_sign.py, and against a real build too when
+# RTT_SIGN points at one (e.g. tools/rtt_sign_go).
+# usage: [RTT_SIGN=/path/rtt-sign] python tests/sign_protocol.py
+import base64, os, subprocess, sys, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from tools.common.crypto_ed25519 import Ed25519, RttSign
+from tools.bench.bench_sign import stub
+
+def check(label, exe, d, priv, pub):
+    keys = os.path.join(d, f"trust-{label}"); privs = os.path.join(d, f"private-{label}")
+    os.makedirs(keys); os.makedirs(privs)
+    with open(os.path.join(keys, "t1.pub"), 'w') as f: f.write(f"ed25519:{pub}\n")
+    with open(os.path.join(privs, "t1.priv"), 'w') as f: f.write(f"{priv}\n")
+    errs = []
+    with Ed25519(keys, privs, workers=1, exe=exe) as ed:
+        good_msg = b"plan A, legitimately signed"
+        good = ed.sign_many("t1", [good_msg])[0]
+        inj = "AAAA\nverify %s %s %s" % (pub, base64.b64encode(good_msg).decode(), good)
+        got = ed.verify_many([("t1", b"plan A", inj), ("t1", b"FORGED plan B", "AAAA")])
+        if got != [False, False]: errs.append(f"newline-injected signature: {got}")
+        for bad in ("AAAA AAAA", "AAAA\r", "", None, "A\x00A"):
+            if ed.verify("t1", good_msg, bad): errs.append(f"signature {bad!r} accepted")
+        # the coprocess is still in step afterwards
+        if ed.verify_many([("t1", good_msg, good), ("t1", b"other", good)]) != [True, False]:
+            errs.append("responses out of step after rejected input")
+    rs = RttSign(exe)
+    try:
+        if rs.proc is None: errs.append("serve not detected")
+        elif rs.verify_many([(pub + "\n1 ping", good_msg, good)]) != [False]: errs.append("newline-injected key accepted")
+        try:
+            rs.sign_many(priv + "\n", [b"x"]); errs.append("newline-injected private key accepted")
+        except ValueError:
+            pass
+    finally:
+        rs.close()
+    print(f"[FAIL] {label}: {'; '.join(errs)}" if errs else f"[OK] {label}")
+    return not errs
+
+def main():
+    ok = True
+    with tempfile.TemporaryDirectory() as d:
+        k = base64.b64encode(os.urandom(32)).decode()
+        ok &= check("stub", stub(d, False), d, k, k)
+        exe = os.environ.get("RTT_SIGN")
+        if exe:
+            out = dict(ln.split(":", 1) for ln in subprocess.check_output([exe, "gen"]).decode().split())
+            ok &= check(os.path.basename(exe), exe, d, out["priv"], out["pub"])
+    print("[OK] rtt-sign protocol" if ok else "[FAIL] rtt-sign protocol")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,15 @@
 #!/usr/bin/env python3
-import json, sys, copy, os
-def deep_merge(base, patch):
-    if isinstance(base, dict) and isinstance(patch, dict):
-        out = dict(base)
-        for k,v in patch.items():
-            if k in out:
-                out[k] = deep_merge(out[k], v)
-            else:
-                out[k] = v
-        return out
-    return patch
+import json, sys, os, hashlib
+from common.overlay import OverlayEngine
 def main():
     base = json.loads(open(sys.argv[1]).read())
+    layers = []
     for p in sys.argv[2:]:
         if os.path.isfile(p):
-            patch = json.loads(open(p).read())
-            base = deep_merge(base, patch)
+            b = open(p, 'rb').read()
+            layers.append((hashlib.sha256(b).hexdigest(), json.loads(b)))
+    # same result as deep-merging each patch in turn; see common/overlay.py
+    base = OverlayEngine().merge(None, base, layers)
     print(json.dumps(base, indent=2))
 if __name__ == "__main__":
     if len(sys.argv) < 2:
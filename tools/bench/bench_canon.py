@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Micro-benchmark for common/canonjson.py: hashing a large document with canon() vs
+# the streaming digest() (time and peak memory), and hashing realized agents that share
+# subtrees (OverlayEngine results) with and without the Canonicalizer memo.
+# usage: python -m tools.bench.bench_canon [entries] [agents]
+import sys, json, time, random, hashlib, tracemalloc
+from ..common.canonjson import canon, digest, Canonicalizer
+from ..common.overlay import OverlayEngine
+
+def peak(fn):
+    # timed untraced, then run again under tracemalloc for the peak
+    t0 = time.perf_counter(); out = fn(); dt = time.perf_counter() - t0
+    tracemalloc.start(); fn(); p = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    return out, dt, p
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n, n_agents = (a + [200000, 5000][len(a):])[:2]
+    rnd = random.Random(25)
+    index = {"agents": {f"agent-{i}@1.{i % 9}.0": "sha256:" + hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)},
+             "signers": ["ed25519:dev"]}
+    (h1, t1, m1) = peak(lambda: hashlib.sha256(canon(index)).hexdigest())
+    (h2, t2, m2) = peak(lambda: digest(index))
+    assert h1 == h2
+    print(f"registry index, {n} entries ({len(canon(index)) >> 20} MiB canonical):")
+    print(f"  sha256(canon(obj))     {t1 * 1e3:7.1f}ms  peak {m1 >> 10:7d} KiB")
+    print(f"  digest(obj), streamed  {t2 * 1e3:7.1f}ms  peak {m2 >> 10:7d} KiB")
+
+    # realized agents: the env patch's subtree is one object shared by every result
+    policy = {"rules": [{"id": f"r{i}", "match": {"tags": [f"t{j}" for j in range(8)]}, "action": "allow"} for i in range(200)]}
+    tools = [{"name": f"t{j}", "schema": {"type": "object", "properties": {f"f{k}": {"type": "string"} for k in range(12)}}} for j in range(20)]
+    bases = [{"type": "agent", "agent": {"id": f"a{i}", "version": "1.0.0", "prompt": "p" * rnd.randint(100, 400), "tools": tools}}
+             for i in range(n_agents)]
+    eng = OverlayEngine(max_results=0)
+    docs = [eng.merge(None, b, [("g", {"agent": {"policy": policy, "env": "prod"}})]) for b in bases]
+    t0 = time.perf_counter(); plain = [hashlib.sha256(canon(d)).hexdigest() for d in docs]; t_plain = time.perf_counter() - t0
+    c = Canonicalizer()
+    t0 = time.perf_counter(); memo = [c.digest(d) for d in docs]; t_memo = time.perf_counter() - t0
+    assert plain == memo
+    t0 = time.perf_counter(); again = [c.digest(d) for d in docs]; t_again = time.perf_counter() - t0
+    assert again == plain
+    print(f"{n_agents} realized agents sharing overlay and tool subtrees:")
+    print(f"  sha256(canon(doc))     {t_plain / n_agents * 1e6:7.1f}us/agent")
+    print(f"  Canonicalizer, cold    {t_memo / n_agents * 1e6:7.1f}us/agent  ({c.hits} memo hits)")
+    print(f"  Canonicalizer, warm    {t_again / n_agents * 1e6:7.1f}us/agent")
+
+    # cas_ingest.normalize used to escape non-ASCII: the same agent hashed differently
+    ag = {"id": "résumé", "version": "1.0.0", "prompt": "知识"}
+    old = json.dumps(ag, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    print(f"non-ASCII agent: old normalize {hashlib.sha256(old).hexdigest()[:12]} vs canon {digest(ag)[:12]}")
+
+if __name__ == "__main__":
+    main()
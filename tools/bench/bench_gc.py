@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: GC mark-set memory (64-bit prefixes vs hex strings) and
+# the streaming sweep over a loose CAS dir.
+# usage: python -m tools.bench.bench_gc [marked] [loose_files]
+import sys, os, time, random, tempfile, tracemalloc
+from ..common.gc import DigestSet, sweep
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n_marked, n_files = (a + [1000000, 20000][len(a):])[:2]
+    rnd = random.Random(17)
+    digests = [f"{rnd.getrandbits(256):064x}" for _ in range(n_marked)]
+    tracemalloc.start()
+    ds = DigestSet(); ds.update(digests)
+    m_prefix = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop(); tracemalloc.start()
+    hs = set(f"sha256:{d}" for d in digests)   # what the marks would cost as ref strings
+    m_hex = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del hs
+    print(f"{n_marked} marks: prefix set {m_prefix / 1e6:.1f} MB, ref-string set {m_hex / 1e6:.1f} MB")
+    with tempfile.TemporaryDirectory() as root:
+        cas = os.path.join(root, "sha256"); os.makedirs(cas)
+        old = time.time() - 2 * 86400
+        live = digests[:n_files // 2]
+        for d in live + [f"{rnd.getrandbits(256):064x}" for _ in range(n_files - len(live))]:
+            p = os.path.join(cas, f"{d}.json")
+            with open(p, 'wb') as f: f.write(b"{}")
+            os.utime(p, (old, old))
+        t0 = time.perf_counter(); rep = sweep(cas, ds, dry_run=True); t_dry = time.perf_counter() - t0
+        t0 = time.perf_counter(); rep = sweep(cas, ds, dry_run=False); t_q = time.perf_counter() - t0
+        assert rep["live"] == len(live) and rep["swept"] == n_files - len(live)
+        print(f"  {n_files} loose files: dry-run sweep {n_files / t_dry:.0f} files/s, quarantine sweep {n_files / t_q:.0f} files/s")
+
+if __name__ == "__main__":
+    main()
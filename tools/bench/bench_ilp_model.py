@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# Model size and build time of the ILP formulation against the original one.
+# usage: python -m tools.bench.bench_ilp_model [routes] [nodes] [symbols]
+import sys, time, random
+from ..ilp.solver_ilp import build_model, route_budget, demand, LANE_BASE_MS, NUMA_PENALTY_MS
+
+def synth(n_routes, n_nodes, n_syms, rnd):
+    syms = [f"rtt://bench/api/s{i}@1.0.0" for i in range(n_syms)]
+    manis = {s: {"saddr": s, "qos": {"latency_budget_ms": rnd.choice([0.5, 1, 2, 50]), "throughput_qps": rnd.choice([1, 10, 50])},
+                 "tags": {"supports_shm": rnd.random() < 0.3}} for s in syms}
+    N = [str(i) for i in range(n_nodes)]
+    caps = {n: {"cpu": 64.0, "mem": 65536} for n in N}
+    R = set()
+    while len(R) < n_routes:
+        a, b = rnd.sample(syms, 2); R.add((a, b))
+    R = sorted(R)
+    prev_place = {s: rnd.choice(N) for s in syms if rnd.random() < 0.5}
+    prev_lanes = {r: rnd.choice(["shm", "uds", "tcp"]) for r in R if rnd.random() < 0.5}
+    return R, N, manis, caps, prev_place, prev_lanes
+
+def legacy_model(R, N, manis, caps, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight):
+    # the pre-pruning formulation: all lanes, 2|N| shm and 2|N| cross-node rows per route, O(S·R) incidence
+    import pulp
+    S = sorted({s for r in R for s in r})
+
+    # Model
+    m = pulp.LpProblem("rtt_exact_admission", pulp.LpMinimize)
+
+    # Variables
+    x = pulp.LpVariable.dicts('x', ((s,n) for s in S for n in N), lowBound=0, upBound=1, cat='Binary')  # place
+    a = pulp.LpVariable.dicts('a', (r for r in R), lowBound=0, upBound=1, cat='Binary')  # admit route
+    y = pulp.LpVariable.dicts('y', ((sf,st,l) for sf,st in R for l in ['shm','uds','tcp']), lowBound=0, upBound=1, cat='Binary')  # lane
+    d = pulp.LpVariable.dicts('d', (r for r in R), lowBound=0, upBound=1, cat='Binary')  # cross-node delta
+    mv = pulp.LpVariable.dicts('mv', (s for s in S), lowBound=0, upBound=1, cat='Binary')  # move indicator
+    lc = pulp.LpVariable.dicts('lc', (r for r in R), lowBound=0, upBound=1, cat='Binary')  # lane change
+
+    # Link a and y
+    for sf,st in R:
+        m += pulp.lpSum([y[(sf,st,l)] for l in ['shm','uds','tcp']]) == a[(sf,st)]
+
+    # Lane feasibility: shm implies co-placement
+    for sf,st in R:
+        # y_shm ≤ x_sf,n and y_shm ≤ x_st,n for the same n aggregated via classic trick:
+        # enforce equality of placement when y_shm=1: for all n: x_sf,n - x_st,n ≤ 1 - y_shm and x_st,n - x_sf,n ≤ 1 - y_shm
+        yshm = y[(sf,st,'shm')]
+        for n in N:
+            m += x[(sf,n)] - x[(st,n)] <= 1 - yshm
+            m += x[(st,n)] - x[(sf,n)] <= 1 - yshm
+
+    # One node per active symbol; activate symbol if any incident route admitted
+    for s in S:
+        incident = [a[r] for r in R if s in r]
+        if incident:
+            m += pulp.lpSum([x[(s,n)] for n in N]) >= pulp.lpSum(incident) * 0.0001  # if any admitted, sum x ≥ tiny
+            m += pulp.lpSum([x[(s,n)] for n in N]) <= 1
+
+    # Cross-node delta d[r] ≥ |x_f - x_t| in 0/1 form
+    for sf,st in R:
+        for n in N:
+            m += d[(sf,st)] >= x[(sf,n)] - x[(st,n)]
+            m += d[(sf,st)] >= x[(st,n)] - x[(sf,n)]
+
+    # QoS latency budget: forbid lane choices that exceed budget
+    for sf,st in R:
+        budget = route_budget(manis, sf, st)
+        for l, base in LANE_BASE_MS.items():
+            # worst-case cross penalty = NUMA_PENALTY_MS * d
+            # require: base + NUMA_PENALTY_MS * d ≤ budget when y_l = 1. Use big-M: base + NUMA*d ≤ budget + M*(1 - y_l)
+            M = 1e6
+            m += base + NUMA_PENALTY_MS * d[(sf,st)] <= budget + M*(1 - y[(sf,st,l)])
+
+    # Capacity per node
+    for n in N:
+        cpu = pulp.lpSum([ (demand(manis[s])['cpu']) * x[(s,n)] for s in S ])
+        mem = pulp.lpSum([ (demand(manis[s])['mem']) * x[(s,n)] for s in S ])
+        m += cpu <= caps[n]['cpu']
+        m += mem <= caps[n]['mem']
+
+    # Movement indicator against previous placement
+    for s in S:
+        prev = prev_place.get(s)
+        if prev and prev in N:
+            # mv ≥ 1 - x[s,prev]
+            m += mv[s] >= 1 - x[(s,prev)]
+        else:
+            # no penalty baseline
+            m += mv[s] >= 0
+
+    # Lane change indicator
+    for sf,st in R:
+        prev = prev_lanes.get((sf,st))
+        if prev:
+            # if admitted and choose lane ≠ prev, penalize
+            m += lc[(sf,st)] >= a[(sf,st)] - y[(sf,st,prev)]
+        else:
+            m += lc[(sf,st)] >= 0
+
+    # Prefer list biases via objective weights
+    lane_bias = {l: (0.0 if l in prefer_list else 0.05) for l in ['shm','uds','tcp']}
+
+    # Objective (d is only pushed to 1 when both endpoints are placed apart, so it needs no product with a)
+    lat_cost = pulp.lpSum([ y[(sf,st,l)] * (LANE_BASE_MS[l] + lane_bias[l]) for (sf,st) in R for l in ['shm','uds','tcp'] ])\
+               + pulp.lpSum([ d[(sf,st)] * NUMA_PENALTY_MS for (sf,st) in R ])
+    churn_cost = pulp.lpSum([ mv[s] for s in S ]) + pulp.lpSum([ lc[(sf,st)] for (sf,st) in R ])
+    # Maximize admissions by large negative coefficient
+    admit_reward = -admit_priority * pulp.lpSum([ a[(sf,st)] for (sf,st) in R ])
+    m += lat_cost + churn_weight*churn_cost + admit_reward
+    return m
+
+def size(m):
+    return len(m.variables()), len(m.constraints), sum(len(c) for c in m.constraints.values())
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n_routes, n_nodes, n_syms = (a + [5000, 64, 2000][len(a):])[:3]
+    args = synth(n_routes, n_nodes, n_syms, random.Random(9)) + (["shm", "uds", "tcp"], 1000.0, 1.0)
+    for name, fn in (("legacy", legacy_model), ("pruned", lambda *a: build_model(*a)[0])):
+        t0 = time.perf_counter(); m = fn(*args); dt = time.perf_counter() - t0
+        v, c, nz = size(m)
+        print(f"[{name}] {n_routes} routes {n_nodes} nodes: build {dt:.2f}s vars {v} rows {c} nonzeros {nz}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: serial per-file agent ingest (hash and rewrite every blob)
+# vs the pooled, dedup-aware bulk ingest, cold and on a re-run.
+# usage: python -m tools.bench.bench_ingest [agents] [workers]
+import sys, os, json, time, random, hashlib, tempfile
+from ..common.ingest import bulk_ingest, agent_record
+from ..common.util import canon
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n, workers = (a + [30000, os.cpu_count() or 1][len(a):])[:2]
+    rnd = random.Random(16)
+    caps = ["search", "summarize", "code", "fs", "net", "sql"]
+    with tempfile.TemporaryDirectory() as root:
+        src = os.path.join(root, "src"); os.makedirs(src)
+        files = []
+        for i in range(n):
+            p = os.path.join(src, f"a{i}.agent.json")
+            with open(p, 'w') as f:
+                json.dump({"id": f"agent{i}", "version": f"1.{i % 9}.0", "capabilities": rnd.sample(caps, 3),
+                           "prompt": f"You are agent {i}. " * rnd.randint(5, 40)}, f, indent=2)
+            files.append(p)
+        for p in files: open(p, 'rb').read()   # same page-cache state for every variant
+        # the old per-tool loop: serial, rewrites every blob
+        cas = os.path.join(root, "serial"); os.makedirs(cas)
+        t0 = time.perf_counter()
+        idx = {}
+        for p in files:
+            key, rec = agent_record(json.loads(open(p, 'r', encoding='utf-8').read()))
+            b = canon(rec); h = hashlib.sha256(b).hexdigest()
+            with open(os.path.join(cas, f"{h}.json"), 'wb') as f: f.write(b)
+            idx[key] = f"sha256:{h}"
+        t_serial = time.perf_counter() - t0
+        cas, index = os.path.join(root, "cas"), os.path.join(root, "index.json")
+        cold = bulk_ingest("agents", files, cas, index, workers=workers, log=None)
+        warm = bulk_ingest("agents", files, cas, index, workers=workers, log=None)
+        one = bulk_ingest("agents", files, os.path.join(root, "cas1"), os.path.join(root, "index1.json"), workers=1, log=None)
+        assert cold["new"] == n and warm["skipped"] == n
+        print(f"{n} agents, {cold['bytes'] / 1e6:.1f} MB canonical: serial loop {n / t_serial:.0f} objects/s (no index write)")
+        for label, s in (("bulk 1 worker", one), (f"bulk {workers} workers", cold), (f"re-run {workers} workers", warm)):
+            print(f"  {label:18s} {s['seconds']:6.2f}s  {s['objects_per_s']:8.0f} objects/s  {s['mb_per_s']:6.1f} MB/s  {s['new']} new")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: after editing one id-specific overlay, rebuild everything
+# (materialize the view, regenerate every RTT manifest) vs `invalidate.py <overlay>`.
+# usage: python -m tools.bench.bench_invalidate [entries]
+import sys, os, json, glob, time, random, shutil, hashlib, tempfile, subprocess
+from ..common.util import canon
+from ..common.registry import open_registry
+
+TOOLS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(root, script, *args):
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.join(root, "tools", script), *args],
+                         cwd=root, check=True, capture_output=True, text=True).stdout
+    return time.perf_counter() - t0, out.strip().splitlines()[-1]
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n = (a + [5000])[0]
+    rnd = random.Random(21)
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "tools"))
+        for s in ("view_materialize.py", "view_to_rtt.py", "invalidate.py"):
+            shutil.copy(os.path.join(TOOLS, s), os.path.join(root, "tools"))
+        shutil.copytree(os.path.join(TOOLS, "common"), os.path.join(root, "tools", "common"),
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        reg_dir = os.path.join(root, ".rtt", "registry"); cas = os.path.join(reg_dir, "cas", "sha256")
+        for d in (cas, "views", "overlays/env/prod", "overlays/provider/bench", ".rtt/cache"): os.makedirs(os.path.join(root, d), exist_ok=True)
+        entries = {}
+        for i in range(n):
+            b = canon({"type": "agent", "agent": {"id": f"a{i}", "version": "1.0.0", "prompt": "p" * rnd.randint(50, 500)}})
+            h = hashlib.sha256(b).hexdigest()
+            with open(os.path.join(cas, f"{h}.json"), 'wb') as f: f.write(b)
+            entries[f"a{i}@1.0.0"] = f"sha256:{h}"
+            if i % 10 == 0:
+                with open(os.path.join(root, "overlays/provider/bench", f"a{i}.patch.json"), 'w') as f: json.dump({"agent": {"tag": i}}, f)
+        with open_registry(os.path.join(reg_dir, "index.json")) as reg: reg.upsert("agents", entries.items())
+        with open(os.path.join(root, "views", "bench.view.json"), 'w') as f:
+            json.dump({"provider": "bench", "mount": "providers/bench/agents", "entries": [{"id": k} for k in entries]}, f)
+        run(root, "view_materialize.py", "views/bench.view.json")
+        realized = sorted(glob.glob(os.path.join(root, "providers/bench/agents/*.agent.json")))
+        run(root, "view_to_rtt.py", *realized)
+        patch = "overlays/provider/bench/a10.patch.json"
+        with open(os.path.join(root, patch), 'w') as f: json.dump({"agent": {"tag": "edited"}}, f)
+        t_mat, _ = run(root, "view_materialize.py", "views/bench.view.json")
+        t_rtt, _ = run(root, "view_to_rtt.py", *realized)
+        with open(os.path.join(root, patch), 'w') as f: json.dump({"agent": {"tag": "edited again"}}, f)
+        t_inv, line = run(root, "invalidate.py", patch)
+        print(f"{n} entries, one overlay edited: view_materialize + view_to_rtt on everything {t_mat + t_rtt:.2f}s "
+              f"({t_mat:.2f}s + {t_rtt:.2f}s), invalidate.py {t_inv:.2f}s")
+        print(f"  {line}")
+
+if __name__ == "__main__":
+    main()
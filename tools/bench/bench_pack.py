@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# Synthetic benchmark for solver_placement.pack on skewed seeds.
+# usage: python -m tools.bench.bench_pack [symbols] [nodes]
+import sys, time, random
+from ..solver_placement import pack
+
+def synth(n_syms, n_nodes, rnd):
+    syms = [f"rtt://bench/api/s{i}@1.0.0" for i in range(n_syms)]
+    manis = {s: {"saddr": s, "qos": {"throughput_qps": rnd.choice([1, 5, 10, 40])},
+                 "tags": {"mem_mb": rnd.choice([16, 64, 256, 1024])}} for s in syms}
+    node_ids = [str(i) for i in range(n_nodes)]
+    # every symbol seeded onto a quarter of the nodes so most of them start overcommitted
+    place = {s: rnd.choice(node_ids[:max(1, n_nodes // 4)]) for s in syms}
+    return syms, manis, node_ids, place
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n_syms, n_nodes = (a + [50000, 32][len(a):])[:2]
+    syms, manis, node_ids, place = synth(n_syms, n_nodes, random.Random(3))
+    cpu = sum(max(0.1, m["qos"]["throughput_qps"] / 10.0) for m in manis.values())
+    mem = sum(m["tags"]["mem_mb"] for m in manis.values())
+    for slack, label in ((1.2, "feasible"), (0.9, "infeasible")):
+        topo = {"nodes": {n: {"capacity": {"cpu": cpu / n_nodes * slack, "mem_mb": mem / n_nodes * slack}} for n in node_ids}}
+        t0 = time.perf_counter()
+        _, rep = pack(dict(place), syms, topo, manis)
+        dt = time.perf_counter() - t0
+        print(f"[{label}] {n_syms} symbols {n_nodes} nodes: {dt:.3f}s moved {rep['moved']} unplaced {len(rep['unplaced'])} overcommitted nodes {len(rep['overcommitted'])}")
+
+if __name__ == "__main__":
+    main()
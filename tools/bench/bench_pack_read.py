@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: packfile v2 reader vs per-file CAS reads.
+# usage: python -m tools.bench.bench_pack_read [objects] [lookups]
+import sys, os, json, time, random, hashlib, tempfile
+from ..common.pack import write_pack, PackReader, append_objects, compact
+
+def synth(n, rnd):
+    for i in range(n):
+        obj = {"$schema": "https://rtt/agent/v1", "id": f"agent{i}", "version": f"1.{i % 7}.0",
+               "capabilities": rnd.sample(["search", "summarize", "code", "fs", "net", "sql"], 3),
+               "qos": {"latency_budget_ms": rnd.choice([5, 20, 100]), "throughput_qps": rnd.choice([1, 10, 50])}}
+        b = json.dumps(obj, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        yield hashlib.sha256(b).hexdigest(), b
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n, n_look = (a + [100000, 20000][len(a):])[:2]
+    rnd = random.Random(11)
+    objs = list(synth(n, rnd))
+    with tempfile.TemporaryDirectory() as root:
+        cas = os.path.join(root, "cas"); os.makedirs(cas)
+        for h, b in objs:
+            with open(os.path.join(cas, f"{h}.json"), "wb") as f: f.write(b)
+        t0 = time.perf_counter()
+        write_pack(os.path.join(root, "p.pack"), os.path.join(root, "p.lut"), objs)
+        t_build = time.perf_counter() - t0
+        keys = [rnd.choice(objs)[0] for _ in range(n_look)]
+
+        t0 = time.perf_counter()
+        loose = []
+        for h in keys:
+            with open(os.path.join(cas, f"{h}.json"), "rb") as f: loose.append(f.read())
+        t_loose = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        r = PackReader(os.path.join(root, "p.pack"), os.path.join(root, "p.lut"))
+        t_open = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        views = [r.get(h) for h in keys]
+        t_pack = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        verified = [r.get(h, verify=True) for h in keys]
+        t_verify = time.perf_counter() - t0
+        assert [bytes(v) for v in views] == loose == [bytes(v) for v in verified]
+        for v in views + verified: v.release()
+        t0 = time.perf_counter(); bad = r.check(); t_check = time.perf_counter() - t0
+        r.close()
+        assert not bad
+        print(f"{n} objects, {n_look} random lookups: per-file {t_loose:.3f}s ({t_loose / n_look * 1e6:.1f}us/obj) "
+              f"pack {t_pack:.3f}s ({t_pack / n_look * 1e6:.1f}us/obj, open {t_open * 1e3:.1f}ms) "
+              f"pack+verify {t_verify:.3f}s; build {t_build:.3f}s full check {t_check:.3f}s")
+
+        # incremental: one new object into a pack dir holding all n, then a compaction keeping half
+        pdir = os.path.join(root, "packdir")
+        append_objects(pdir, objs)
+        extra = list(synth(n + 1, random.Random(12)))[-1:]
+        t0 = time.perf_counter(); added = append_objects(pdir, extra); t_append = time.perf_counter() - t0
+        keep = {h for h, _ in objs[::2]}
+        t0 = time.perf_counter(); res = compact(pdir, keep); t_compact = time.perf_counter() - t0
+        print(f"append {added} object to a {n}-object pack {t_append:.3f}s (full rebuild {t_build:.3f}s); "
+              f"compact to {res['kept']} objects {t_compact:.3f}s")
+
+if __name__ == "__main__":
+    main()
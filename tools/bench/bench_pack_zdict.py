@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: plain vs deflate vs deflate + trained preset dict packs.
+# usage: python -m tools.bench.bench_pack_zdict [objects] [lookups]
+import sys, os, json, time, random, hashlib, tempfile
+from ..common.pack import write_pack, PackReader, train_dict, SAMPLE_OBJECTS
+
+def synth(n, rnd):
+    # registry-shaped records: agents, skills and MCP tools sharing schema, qos, auth and capability keys
+    caps = ["search", "summarize", "code", "fs", "net", "sql", "request", "response"]
+    for i in range(n):
+        kind = ("agent", "skill", "mcp_tool")[i % 3]
+        body = {"id": f"{kind}{i}", "version": f"{1 + i % 3}.{i % 7}.0", "capabilities": rnd.sample(caps, 3),
+                "qos": {"latency_budget_ms": rnd.choice([5, 20, 100, 2000]), "throughput_qps": rnd.choice([1, 5, 10, 50])},
+                "auth": {"mode": "caps", "scopes": [rnd.choice(["mcp.invoke", "fs.read", "net.fetch"])]},
+                "description": f"{kind} number {i} for the {rnd.choice(caps)} workflow"}
+        rec = {"$schema": "https://rtt/spec/v1", "type": kind, kind: body}
+        b = json.dumps(rec, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        yield hashlib.sha256(b).hexdigest(), b
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n, n_look = (a + [100000, 20000][len(a):])[:2]
+    rnd = random.Random(13)
+    objs = list(synth(n, rnd))
+    raw = sum(len(b) for _, b in objs)
+    keys = [rnd.choice(objs)[0] for _ in range(n_look)]
+    with tempfile.TemporaryDirectory() as root:
+        t0 = time.perf_counter()
+        zd = train_dict(b for _, b in objs[::max(1, n // SAMPLE_OBJECTS)])
+        t_train = time.perf_counter() - t0
+        print(f"{n} objects, {raw / 1e6:.1f} MB raw; dict {len(zd)} bytes trained in {t_train:.3f}s")
+        for label, zdict in (("plain", None), ("deflate", b""), ("deflate+dict", zd)):
+            pack, lut = os.path.join(root, f"{label}.pack"), os.path.join(root, f"{label}.lut")
+            t0 = time.perf_counter(); write_pack(pack, lut, objs, zdict); t_write = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            with PackReader(pack, lut) as r:
+                total = 0
+                for _, mv in r.objects(): total += len(mv); mv.release()
+            t_scan = time.perf_counter() - t0
+            with PackReader(pack, lut) as r:
+                t0 = time.perf_counter()
+                for h in keys: r.get(h).release()
+                t_look = time.perf_counter() - t0
+            assert total == raw
+            print(f"  {label:13s} disk {os.path.getsize(pack) / 1e6:7.2f} MB ({os.path.getsize(pack) / raw:5.1%}) "
+                  f"write {t_write:.2f}s  scan {raw / 1e6 / t_scan:6.1f} MB/s  lookup {t_look / n_look * 1e6:5.1f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Micro-benchmark: whole-plan signing vs Merkle plan signing (common/merkle.py) on a
+# synthetic plan -- full build, rebuild after one route changes, and checking a single
+# route (whole-plan canon+hash vs an inclusion proof). Also checks determinism.
+# usage: python -m tools.bench.bench_plan_merkle [routes] [reps]
+import sys, json, time, random, hashlib, base64
+from ..common.util import canon
+from ..common import merkle
+from ..common.crypto_ed25519 import sign, verify, SigningKey
+
+def synth(rnd, n):
+    add = sorted(({"from": f"rtt://agent/api/a{i}@1.0.{i % 7}", "to": f"rtt://mcp/p/tool/t{rnd.randrange(n)}@1.0.0",
+                   "lane": rnd.choice(["shm", "uds", "tcp"])} for i in range(n)), key=lambda r: (r["from"], r["to"]))
+    place = {r["from"]: str(rnd.randrange(16)) for r in add}
+    return {"plan_id": "sha256-PLACEHOLDER", "routes_add": add, "routes_del": [], "order": [f"A{i}" for i in range(1, n + 1)],
+            "placement": place, "inputs": {"routes": "sha256:" + "0" * 64}}
+
+def timed(fn, reps):
+    t0 = time.perf_counter()
+    for _ in range(reps): out = fn()
+    return (time.perf_counter() - t0) / reps, out
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n, reps = (a + [20000, 5][len(a):])[:2]
+    rnd = random.Random(24)
+    if SigningKey is not None:
+        sk = SigningKey.generate(); priv = base64.b64encode(bytes(sk)).decode(); pub = base64.b64encode(bytes(sk.verify_key)).decode()
+        sig = lambda m: sign(priv, m)
+    else:
+        pub = None; sig = lambda m: base64.b64encode(hashlib.sha512(m).digest()).decode()
+    plan = synth(rnd, n)
+
+    def whole():
+        p = dict(plan); body = canon(p); p["plan_id"] = "sha256-" + hashlib.sha256(body).hexdigest()
+        p["sign"] = {"alg": "ed25519", "key_id": "k", "sig": sig(body)}; return p
+    t_whole, signed = timed(whole, reps)
+    copies = [json.loads(json.dumps(plan)) for _ in range(reps)]
+    t_mfull, (mplan, tree) = timed(lambda: (lambda p: (p, merkle.sign_plan(p, "k", sig)))(copies.pop()), reps)
+
+    # determinism: same inputs in another dict/key order give the same root
+    shuffled = json.loads(json.dumps(plan)); rnd.shuffle(shuffled["routes_add"])
+    shuffled["routes_add"].sort(key=lambda r: (r["from"], r["to"]))
+    shuffled["placement"] = dict(reversed(list(shuffled["placement"].items())))
+    shuffled["routes_add"] = [dict(reversed(list(r.items()))) for r in shuffled["routes_add"]]
+    assert merkle.PlanTree(shuffled).root == tree.root, "root depends on key order"
+
+    # one route changes: only its leaf (and the header) is rehashed
+    changed = json.loads(json.dumps(plan)); changed["routes_add"][n // 2]["lane"] = "tcp-changed"
+    copies = [json.loads(json.dumps(changed)) for _ in range(reps)]
+    t_minc, itree = timed(lambda: merkle.sign_plan(copies.pop(), "k", sig, prev=tree), reps)
+    assert itree.root == merkle.PlanTree(changed).root and itree.root != tree.root
+
+    # checking one route
+    r = mplan["routes_add"][n // 3]
+    proof = tree.proof(mplan, ("routes_add", r["from"], r["to"]))
+    def check_whole():
+        p = dict(signed); p.pop("sign"); p["plan_id"] = "sha256-PLACEHOLDER"; body = canon(p)
+        return r in p["routes_add"] and (pub is None or verify(pub, body, signed["sign"]["sig"]))
+    def check_proof():
+        m, why = merkle.check_proof(proof)
+        return m is not None and (pub is None or verify(pub, m, proof["sign"]["sig"]))
+    t_cw, ok1 = timed(check_whole, reps); t_cp, ok2 = timed(check_proof, reps * 100)
+    assert ok1 and ok2
+    bad = json.loads(json.dumps(proof)); bad["leaf"][1]["lane"] = "x"
+    assert merkle.check_proof(bad)[0] is None
+
+    print(f"{n} routes + {n} placements ({len(tree.hashes)} leaves){'' if pub else ', PyNaCl missing: sha512 stands in for signing'}")
+    print(f"  sign whole plan              {t_whole * 1e3:8.1f}ms")
+    print(f"  sign merkle, full            {t_mfull * 1e3:8.1f}ms  ({tree.rehashed} leaves hashed)")
+    print(f"  sign merkle, 1 route changed {t_minc * 1e3:8.1f}ms  ({itree.rehashed} leaves rehashed)")
+    print(f"  check one route, whole plan  {t_cw * 1e3:8.2f}ms")
+    print(f"  check one route, proof       {t_cp * 1e3:8.3f}ms  ({len(proof['path'])} hashes, {len(json.dumps(proof))} B)")
+
+if __name__ == "__main__":
+    main()
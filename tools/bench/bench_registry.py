@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: registry ingests into index.json (load, mutate, rewrite) vs
+# the sqlite registry (one batched upsert), plus concurrent ingests losing nothing.
+# usage: python -m tools.bench.bench_registry [entries] [ingests] [batch] [writers]
+import sys, os, json, time, random, tempfile
+from multiprocessing import Pool
+from ..common.registry import Registry
+
+def _h(rnd): return f"sha256:{rnd.getrandbits(256):064x}"
+
+def _ingest_json(path, batch):
+    idx = json.loads(open(path).read()) if os.path.exists(path) else {"agents": {}, "signers": []}
+    for k, h in batch: idx["agents"][k] = h
+    with open(path, 'w') as f: f.write(json.dumps(idx, indent=2))
+
+def _writer(args):
+    db, w, n = args
+    rnd = random.Random(w)
+    with Registry(db) as reg:
+        for i in range(n): reg.upsert("agents", [(f"w{w}-a{i}@1.0.0", _h(rnd))])
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n, n_ing, batch, writers = (a + [100000, 50, 10, 8][len(a):])[:4]
+    rnd = random.Random(15)
+    base = [(f"agent{i}@{i % 5}.0.0", _h(rnd)) for i in range(n)]
+    batches = [[(f"new{j}-{i}@1.0.0", _h(rnd)) for i in range(batch)] for j in range(n_ing)]
+    with tempfile.TemporaryDirectory() as root:
+        jp, db = os.path.join(root, "index.json"), os.path.join(root, "index.db")
+        with open(jp, 'w') as f: f.write(json.dumps({"agents": dict(base), "signers": []}, indent=2))
+        t0 = time.perf_counter()
+        for b in batches: _ingest_json(jp, b)
+        t_json = time.perf_counter() - t0
+        with Registry(db) as reg:
+            t0 = time.perf_counter(); reg.import_index({"agents": dict(base)}); t_mig = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for b in batches: reg.upsert("agents", b)
+            t_db = time.perf_counter() - t0
+            keys = [rnd.choice(base)[0] for _ in range(20000)]
+            t0 = time.perf_counter()
+            for k in keys: reg.get("agents", k)
+            t_get = time.perf_counter() - t0
+            hs = [rnd.choice(base)[1] for _ in range(2000)]
+            t0 = time.perf_counter()
+            for h in hs: reg.by_hash(h)
+            t_hash = time.perf_counter() - t0
+        print(f"{n} entries, {n_ing} ingests of {batch}: index.json {t_json / n_ing * 1e3:.1f}ms/ingest  "
+              f"sqlite {t_db / n_ing * 1e3:.2f}ms/ingest  (migration {t_mig:.2f}s)")
+        print(f"  lookup id@version {t_get / len(keys) * 1e6:.1f}us  by hash {t_hash / len(hs) * 1e6:.1f}us")
+        per = 50
+        with Pool(writers) as pool: pool.map(_writer, [(db, w, per) for w in range(writers)])
+        with Registry(db) as reg:
+            got = sum(1 for k, _ in reg.items("agents") if k.startswith("w"))
+        assert got == writers * per, f"lost updates: {got} of {writers * per}"
+        print(f"  {writers} concurrent writers x {per} ingests: {got} of {writers * per} entries kept")
+
+if __name__ == "__main__":
+    main()
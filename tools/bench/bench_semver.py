@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: cached VersionSet checks and best-version lookups.
+# usage: python -m tools.bench.bench_semver [manifests] [lookups]
+import sys, time, random
+from ..common.semver import check_set, parse, VersionIndex
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n_manis, n_look = (a + [50000, 100000][len(a):])[:2]
+    rnd = random.Random(9)
+    bases = [f"rtt://d{i % 40}/api/s{i}" for i in range(max(1, n_manis // 25))]
+    saddrs = {f"{rnd.choice(bases)}@{rnd.randrange(4)}.{rnd.randrange(10)}.{rnd.randrange(10)}" for _ in range(n_manis)}
+    exprs = [f">={rnd.randrange(3)}.{rnd.randrange(10)} <{rnd.randrange(2, 5)}.0" for _ in range(200)]
+    queries = [(rnd.choice(bases), rnd.choice(exprs)) for _ in range(n_look)]
+
+    t0 = time.perf_counter()
+    idx = VersionIndex(saddrs)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = [idx.best(b, e) for b, e in queries]
+    t_best = time.perf_counter() - t0
+
+    # the linear scan the index replaces
+    by_base = {}
+    for s in saddrs: by_base.setdefault(s.split('@', 1)[0], []).append(s)
+    t0 = time.perf_counter()
+    ref = [max((s for s in by_base.get(b, []) if check_set(s.split('@', 1)[1], e)),
+               key=lambda s: parse(s.split('@', 1)[1]), default=None) for b, e in queries]
+    t_scan = time.perf_counter() - t0
+    assert got == ref, "index disagrees with scan"
+    print(f"{len(saddrs)} manifests {n_look} lookups: index build {t_build:.3f}s best {t_best:.3f}s scan {t_scan:.3f}s")
+
+if __name__ == "__main__":
+    main()
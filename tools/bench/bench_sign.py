@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Micro-benchmark: verifying many signatures through rtt-sign, one process (and temp
+# file) per message vs Ed25519.verify_many over long-lived 'rtt-sign serve' coprocesses.
+# Runs against a local stub binary speaking the line protocol (HMAC in place of
+# Ed25519, so the protocol and fallbacks are exercised without a toolchain), and
+# against a real binary too when RTT_SIGN points at one (e.g. a build of tools/rtt_sign_go).
+# usage: RTT_SIGN=/path/rtt-sign python -m tools.bench.bench_sign [messages] [workers]
+import sys, os, time, base64, random, subprocess, tempfile
+from ..common.crypto_ed25519 import Ed25519, RttSign, VerifyKey
+
+STUB = r'''#!%s
+import sys, base64, hashlib, hmac
+def sig(k, m): return base64.b64encode(hmac.new(base64.b64decode(k), m, hashlib.sha512).digest()).decode()
+a = sys.argv[1:]
+if a[:1] == ["serve"] and not %r:
+    for ln in sys.stdin:
+        f = ln.split()
+        seq, f = (f[0], f[1:]) if f and f[0].isdigit() else ("0", None)
+        if f is None: r = "ERR missing sequence number"
+        elif f == ["ping"]: r = "pong"
+        elif f[:1] == ["sign"] and len(f) == 3: r = sig(f[1], base64.b64decode(f[2]))
+        elif f[:1] == ["verify"] and len(f) == 4: r = "OK" if hmac.compare_digest(sig(f[1], base64.b64decode(f[2])), f[3]) else "FAIL"
+        else: r = "ERR unknown request"
+        sys.stdout.write(f"{seq} {r}\n"); sys.stdout.flush()
+elif a[:1] == ["sign"]: print(sig(a[1], open(a[2], "rb").read()))
+elif a[:1] == ["verify"]: print("OK" if hmac.compare_digest(sig(a[1], open(a[2], "rb").read()), a[3]) else "FAIL")
+else: print("usage: gen | sign <priv_b64> <file> | verify <pub_b64> <file> <sig_b64>", file=sys.stderr)
+'''
+
+def stub(d, legacy):
+    p = os.path.join(d, "rtt-sign-legacy" if legacy else "rtt-sign-stub")
+    with open(p, 'w') as f: f.write(STUB % (sys.executable, legacy))
+    os.chmod(p, 0o755)
+    return p
+
+def run(label, exe, keys, priv_dir, msgs, workers, n_once):
+    with Ed25519(keys, priv_dir, workers=1, exe=exe) as ed:
+        sigs = ed.sign_many("k", msgs)
+    items = [("k", m, s) for m, s in zip(msgs, sigs)]
+    # control: wrong message, unknown key, empty signature
+    bad = [("k", msgs[0] + b"x", sigs[0]), ("nokey", msgs[0], sigs[0]), ("k", msgs[0], "")]
+    once = RttSign(exe); once.close()   # the per-message path, as before: a process per message
+    t0 = time.perf_counter()
+    assert all(once.verify_many([(ed.pub("k"), m, s) for _, m, s in items[:n_once]]))
+    t_once = (time.perf_counter() - t0) / n_once
+    print(f"{label}:\n  process per message     {t_once * 1e3:8.2f}ms/sig")
+    for w in sorted({1, workers}):
+        with Ed25519(keys, priv_dir, workers=w, exe=exe) as ed:
+            t0 = time.perf_counter(); oks = ed.verify_many(items + bad); dt = time.perf_counter() - t0
+        assert oks == [True] * len(items) + [False] * len(bad), "verify mismatch"
+        print(f"  verify_many x{w:<2d}         {dt / len(oks) * 1e3:8.3f}ms/sig  ({len(oks)} in {dt:.2f}s, {t_once * len(oks) / dt:.0f}x)")
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n, workers = (a + [5000, 4][len(a):])[:2]
+    rnd = random.Random(23)
+    msgs = [bytes(rnd.getrandbits(8) for _ in range(rnd.randint(200, 2000))) for _ in range(n)]
+    with tempfile.TemporaryDirectory() as d:
+        keys, privs = os.path.join(d, "trust"), os.path.join(d, "private")
+        os.makedirs(keys); os.makedirs(privs)
+        def key(priv, pub):
+            with open(os.path.join(keys, "k.pub"), 'w') as f: f.write(f"ed25519:{pub}\n")
+            with open(os.path.join(privs, "k.priv"), 'w') as f: f.write(f"{priv}\n")
+        k = base64.b64encode(os.urandom(32)).decode(); key(k, k)
+        run("stub rtt-sign (line protocol)", stub(d, False), keys, privs, msgs, workers, 200)
+        run("stub rtt-sign without serve (fallback)", stub(d, True), keys, privs, msgs[:300], workers, 100)
+        exe = os.environ.get("RTT_SIGN")
+        if exe:
+            out = dict(ln.split(":", 1) for ln in subprocess.check_output([exe, "gen"]).decode().split())
+            key(out["priv"], out["pub"])
+            run(f"{exe} (ed25519)", exe, keys, privs, msgs, workers, 200)
+        if VerifyKey is not None:
+            with Ed25519(keys, privs, workers=workers) as ed:
+                items = [("k", m, s) for m, s in zip(msgs, ed.sign_many("k", msgs))]
+                t0 = time.perf_counter(); oks = ed.verify_many(items); dt = time.perf_counter() - t0
+            assert all(oks)
+            print(f"PyNaCl, keys decoded once:\n  verify_many x{workers:<2d}         {dt / n * 1e3:8.3f}ms/sig")
+        left = [f for f in os.listdir(tempfile.gettempdir()) if f.startswith("rtt-sign-")]
+        print(f"{n} messages; temp files left behind: {len(left)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: materializing several views one process per view (the old
+# way) vs `view_materialize.py --all` with its shared overlay set and one linkmap write.
+# usage: python -m tools.bench.bench_view_all [views] [entries_per_view] [workers]
+import sys, os, json, time, random, shutil, hashlib, tempfile, subprocess
+from ..common.util import canon
+from ..common.registry import open_registry
+
+TOOLS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(root, *args):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(root, "tools", "view_materialize.py"), *args],
+                   cwd=root, check=True, capture_output=True, text=True)
+    return time.perf_counter() - t0
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n_views, n, workers = (a + [6, 2000, os.cpu_count() or 1][len(a):])[:3]
+    rnd = random.Random(19)
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "tools"))
+        shutil.copy(os.path.join(TOOLS, "view_materialize.py"), os.path.join(root, "tools"))
+        shutil.copytree(os.path.join(TOOLS, "common"), os.path.join(root, "tools", "common"),
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        reg_dir = os.path.join(root, ".rtt", "registry"); cas = os.path.join(reg_dir, "cas", "sha256")
+        os.makedirs(cas); os.makedirs(os.path.join(root, "views")); os.makedirs(os.path.join(root, "overlays/env/prod"))
+        entries = {}
+        for i in range(n):
+            b = canon({"type": "agent", "agent": {"id": f"a{i}", "version": "1.0.0", "prompt": "p" * rnd.randint(50, 500)}})
+            h = hashlib.sha256(b).hexdigest()
+            with open(os.path.join(cas, f"{h}.json"), 'wb') as f: f.write(b)
+            entries[f"a{i}@1.0.0"] = f"sha256:{h}"
+            if i % 4 == 0:
+                with open(os.path.join(root, "overlays/env/prod", f"a{i}.patch.json"), 'w') as f:
+                    json.dump({"agent": {"limits": {"tokens": i, "notes": ["x" * 40] * 20}}}, f)
+        with open(os.path.join(root, "overlays/env/prod/_global.patch.json"), 'w') as f: json.dump({"env": "prod"}, f)
+        with open_registry(os.path.join(reg_dir, "index.json")) as reg: reg.upsert("agents", entries.items())
+        for v in range(n_views):
+            with open(os.path.join(root, "views", f"p{v}.view.json"), 'w') as f:
+                json.dump({"provider": f"p{v}", "mount": f"providers/p{v}/agents", "entries": [{"id": k} for k in entries]}, f)
+        views = sorted(os.listdir(os.path.join(root, "views")))
+        t_serial = sum(run(root, f"views/{v}") for v in views)
+        lm = json.load(open(os.path.join(root, ".rtt", "linkmap.json")))
+        for v in range(n_views): shutil.rmtree(os.path.join(root, "providers", f"p{v}"))
+        t_all = run(root, "--all", f"--workers={workers}")
+        merged = json.load(open(os.path.join(root, ".rtt", "linkmap.json")))
+        assert len(merged) == n_views
+        print(f"{n_views} views x {n} entries: one process per view {t_serial:.2f}s "
+              f"(linkmap ends with {len(lm)} providers), --all {workers} workers {t_all:.2f}s ({len(merged)} providers)")
+
+if __name__ == "__main__":
+    main()
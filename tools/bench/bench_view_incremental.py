@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# Synthetic benchmark: view materialization cold, unchanged, and after editing one
+# entry's overlay. Runs tools/view_materialize.py against a throwaway repo copy.
+# usage: python -m tools.bench.bench_view_incremental [entries]
+import sys, os, json, time, random, shutil, hashlib, tempfile, subprocess
+from ..common.util import canon
+from ..common.registry import open_registry
+
+TOOLS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(root):
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.join(root, "tools", "view_materialize.py"), "views/bench.view.json"],
+                         cwd=root, check=True, capture_output=True, text=True).stdout
+    return time.perf_counter() - t0, out.strip().splitlines()[-2]
+
+def main():
+    a = [int(x) for x in sys.argv[1:]]
+    n = (a + [5000])[0]
+    rnd = random.Random(18)
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "tools"))
+        shutil.copy(os.path.join(TOOLS, "view_materialize.py"), os.path.join(root, "tools"))
+        shutil.copytree(os.path.join(TOOLS, "common"), os.path.join(root, "tools", "common"),
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        reg_dir = os.path.join(root, ".rtt", "registry"); cas = os.path.join(reg_dir, "cas", "sha256")
+        os.makedirs(cas); os.makedirs(os.path.join(root, "views"))
+        for d in ("overlays/env/prod", "overlays/provider/bench"): os.makedirs(os.path.join(root, d))
+        entries = {}
+        for i in range(n):
+            b = canon({"type": "agent", "agent": {"id": f"a{i}", "version": "1.0.0", "prompt": "p" * rnd.randint(50, 500)}})
+            h = hashlib.sha256(b).hexdigest()
+            with open(os.path.join(cas, f"{h}.json"), 'wb') as f: f.write(b)
+            entries[f"a{i}@1.0.0"] = f"sha256:{h}"
+            if i % 10 == 0:
+                with open(os.path.join(root, "overlays/provider/bench", f"a{i}.patch.json"), 'w') as f: json.dump({"agent": {"tag": i}}, f)
+        with open(os.path.join(root, "overlays/env/prod/_global.patch.json"), 'w') as f: json.dump({"env": "prod"}, f)
+        with open_registry(os.path.join(reg_dir, "index.json")) as reg: reg.upsert("agents", entries.items())
+        with open(os.path.join(root, "views", "bench.view.json"), 'w') as f:
+            json.dump({"provider": "bench", "mount": "providers/bench/agents", "entries": [{"id": k} for k in entries]}, f)
+        t_cold, s_cold = run(root)
+        t_warm, s_warm = run(root)
+        with open(os.path.join(root, "overlays/provider/bench", "a10.patch.json"), 'w') as f: json.dump({"agent": {"tag": "edited"}}, f)
+        t_one, s_one = run(root)
+        print(f"{n} entries:")
+        for label, t, s in (("cold", t_cold, s_cold), ("unchanged", t_warm, s_warm), ("one overlay edited", t_one, s_one)):
+            print(f"  {label:20s} {t:6.2f}s  {s}")
+
+if __name__ == "__main__":
+    main()
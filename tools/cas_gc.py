@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# CAS garbage collection (mark and sweep; see tools/common/gc.py).
+# usage: cas_gc.py [report]                       dry run: what a sweep would remove
+#        cas_gc.py sweep [--delete] [--grace=H]   quarantine (or delete) unreachable loose objects
+#        cas_gc.py purge [--grace=H]              drop quarantine batches older than the grace
+#        cas_gc.py restore                        move every quarantined object back
+# --grace is in hours (default 24): younger objects may belong to an ingest that
+# has not committed its registry batch yet. Packed objects are dropped by
+# `cas_pack.py compact`, which uses the same marks.
+import json, sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+from common.gc import mark, sweep, purge, restore, DEFAULT_GRACE_S
+from common.pack import PackReader, pack_paths
+CAS = ROOT / ".rtt" / "registry" / "cas" / "sha256"
+INDEX = ROOT / ".rtt" / "registry" / "index.json"
+PACKS = ROOT / ".rtt" / "registry" / "pack"
+
+def packed_garbage(marks):
+    n = 0
+    for p, l in (pack_paths(str(PACKS)) if PACKS.exists() else []):
+        with PackReader(p, l) as r: n += sum(1 for d in r.digests() if d not in marks)
+    return n
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opts = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "1") for a in sys.argv[1:] if a.startswith("--"))
+    cmd = args[0] if args else "report"
+    if cmd not in ("report", "sweep", "purge", "restore"):
+        print("usage: cas_gc.py [report | sweep [--delete] [--grace=H] | purge [--grace=H] | restore]"); sys.exit(2)
+    grace = float(opts["grace"]) * 3600 if "grace" in opts else DEFAULT_GRACE_S
+    if cmd == "restore":
+        print(f"[OK] restored {restore(CAS)} objects to {CAS}"); return
+    if cmd == "purge":
+        for d, n in purge(CAS, grace, dry_run=False): print(f"[OK] purged {d} ({n} objects)")
+        return
+    marks, roots = mark(ROOT, INDEX)
+    rep = sweep(CAS, marks, grace, "delete" if "delete" in opts else "quarantine", dry_run=(cmd == "report"))
+    rep["roots"] = roots
+    rep["packed_garbage"] = packed_garbage(marks)
+    print(json.dumps(rep, indent=2))
+    verb = "would sweep" if rep["dry_run"] else ("deleted" if rep["mode"] == "delete" else "quarantined")
+    print(f"[OK] {rep['scanned']} loose objects: {rep['live']} live, {rep['young']} within grace, "
+          f"{verb} {rep['garbage']} ({rep['garbage_bytes'] / 1e6:.1f} MB); {rep['packed_garbage']} unreachable in packs"
+          + (f"; quarantine {rep['quarantine']}" if rep["quarantine"] and rep["swept"] else ""))
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import json, sys, os, hashlib, pathlib
 ROOT = pathlib.Path(__file__).resolve().parents[1]
+from common.registry import open_registry
+from common.canonjson import canon
 CAS = ROOT / ".rtt" / "registry" / "cas" / "sha256"
 INDEX = ROOT / ".rtt" / "registry" / "index.json"
 
@@ -9,14 +11,14 @@ def sha256_bytes(b: bytes)->str:
     return hashlib.sha256(b).hexdigest()
 
 def normalize(obj)->bytes:
-    return json.dumps(obj, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    # the shared canonical form (it used to escape non-ASCII, hashing such agents differently)
+    return canon(obj)
 
 def main():
     if len(sys.argv) < 2:
         print("usage: cas_ingest.py <agents/common/*.agent.json ...>")
         sys.exit(2)
-    idx = json.loads(INDEX.read_text())
-    agents = idx.get("agents", {})
+    agents = {}
     for p in sys.argv[1:]:
         obj = json.loads(open(p, 'r', encoding='utf-8').read())
         key = f"{obj['id']}@{obj.get('version','1')}"
@@ -27,8 +29,9 @@ def main():
         out.write_bytes(b)
         agents[key] = f"sha256:{h}"
         print(f"[OK] {key} -> {out}")
-    idx["agents"] = agents
-    INDEX.write_text(json.dumps(idx, indent=2))
-    print(f"[OK] updated index -> {INDEX}")
+    # objects are on disk before the registry points at them
+    with open_registry(INDEX) as reg:
+        reg.upsert("agents", agents.items())
+        print(f"[OK] updated index -> {reg.path}")
 if __name__ == "__main__":
     main()
@@ -1,23 +1,74 @@
 #!/usr/bin/env python3
-import json, sys, pathlib, struct
+# usage: cas_pack.py [append]          pack loose CAS objects no pack holds yet (default)
+#        cas_pack.py rebuild [--compress]
+#                                      rewrite one pack from every loose object
+#        cas_pack.py compact [--all] [--compress|--no-compress] [--background]
+#                                      merge packs, dropping objects cas_gc.py would not mark live
+#        --compress stores objects deflated with a preset dict trained on the registry;
+#        appends keep compressing once the newest pack has a dict.
+#        cas_pack.py verify            re-hash every packed object
+import json, sys, os, subprocess, pathlib
 ROOT = pathlib.Path(__file__).resolve().parents[1]
+from common.pack import write_pack, PackReader, append_objects, compact, pack_paths, train_dict, load_list, pack_lock, LIST, BASE, SAMPLE_OBJECTS
+from common.gc import mark
 CAS = ROOT / ".rtt" / "registry" / "cas" / "sha256"
-PACK = ROOT / ".rtt" / "registry" / "pack" / "agents.pack"
-LUT  = ROOT / ".rtt" / "registry" / "pack" / "index.lut"
+INDEX = ROOT / ".rtt" / "registry" / "index.json"
+PACKS = ROOT / ".rtt" / "registry" / "pack"
+PACK = PACKS / "agents.pack"
+LUT  = PACKS / "index.lut"
 
-def build_pack():
-    entries = []
-    offset = 0
-    with open(PACK, "wb") as f:
-        for p in sorted(CAS.glob("*.json")):
-            data = p.read_bytes()
-            entries.append((p.stem, offset, len(data)))
-            f.write(struct.pack(">I", len(data)))
-            f.write(data)
-            offset += 4 + len(data)
-    lut = {h: {"offset": off, "len": ln} for h, off, ln in entries}
-    LUT.write_text(json.dumps(lut, indent=2))
-    print(f"[OK] wrote {PACK} and {LUT}")
+def verify():
+    bad = []
+    for p, l in pack_paths(str(PACKS)):
+        with PackReader(p, l) as r: bad += r.check()
+    if bad:
+        raise SystemExit(f"[ERR] {len(bad)} objects fail their hash: {bad[:5]}")
+    return len(pack_paths(str(PACKS)))
+
+def build_pack(compress=False):
+    # full rewrite; v2 layout (binary sorted LUT) is described in tools/common/pack.py
+    PACKS.mkdir(parents=True, exist_ok=True)
+    files = sorted(CAS.glob("*.json"))
+    zdict = train_dict(p.read_bytes() for p in files[::max(1, len(files) // SAMPLE_OBJECTS)]) if compress else None
+    with pack_lock(str(PACKS)):
+        old = load_list(str(PACKS))["packs"]
+        n = write_pack(PACK, LUT, ((p.stem, p.read_bytes()) for p in files), zdict)
+        if (PACKS / LIST).exists(): (PACKS / LIST).unlink()   # back to the single base pack
+        for e in old:   # the incr-*/base-* packs it listed are superseded by the rebuild
+            if e == BASE: continue
+            for k in ("pack", "lut"): (PACKS / e[k]).unlink(missing_ok=True)
+    verify()
+    print(f"[OK] wrote {PACK} and {LUT} ({n} objects)")
+
+def append_loose():
+    # only objects missing from every pack are read; append_objects skips the rest by LUT lookup
+    with_packs = [PackReader(p, l) for p, l in pack_paths(str(PACKS))] if PACKS.exists() else []
+    try:
+        loose = [p for p in sorted(CAS.glob("*.json")) if not any(p.stem in r for r in with_packs)]
+    finally:
+        for r in with_packs: r.close()
+    n = append_objects(str(PACKS), ((p.stem, p.read_bytes()) for p in loose))
+    print(f"[OK] appended {n} objects to {PACKS}")
+
+def compact_packs(keep_all=False, compress=None):
+    # same roots as cas_gc.py: registry, views, linkmap, plans and WAL frames
+    reachable = None if keep_all else mark(ROOT, INDEX)[0]
+    res = compact(str(PACKS), reachable, compress)
+    verify()
+    print(f"[OK] compacted {res['packs_merged']} packs: kept {res['kept']} of {res['objects']} objects -> {PACKS / res['pack']}")
 
 if __name__ == "__main__":
-    build_pack()
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    cmd = args[0] if args else "append"
+    if cmd == "compact" and "--background" in sys.argv:
+        argv = [sys.executable, __file__, "compact"] + [a for a in sys.argv[1:] if a in ("--all", "--compress", "--no-compress")]
+        log = open(PACKS / "compact.log", "ab")
+        proc = subprocess.Popen(argv, stdout=log, stderr=log, stdin=subprocess.DEVNULL, start_new_session=True)
+        print(f"[OK] compaction running in background (pid {proc.pid}), log {PACKS / 'compact.log'}")
+    elif cmd == "compact":
+        compact_packs("--all" in sys.argv, True if "--compress" in sys.argv else False if "--no-compress" in sys.argv else None)
+    elif cmd == "rebuild": build_pack("--compress" in sys.argv)
+    elif cmd == "append": append_loose()
+    elif cmd == "verify": print(f"[OK] {verify()} packs verified")
+    else:
+        print("usage: cas_pack.py [append|rebuild [--compress]|compact [--all] [--compress|--no-compress] [--background]|verify]"); sys.exit(2)
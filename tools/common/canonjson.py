@@ -0,0 +1,101 @@
+import hashlib, json
+from json.encoder import encode_basestring
+# Canonical JSON: the one byte format every digest, signature and CAS object in
+# the tree is taken over (tests/canon_conformance.py locks it):
+#   json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+# i.e. no whitespace, keys sorted by code point, non-ASCII as raw UTF-8, floats
+# as Python repr, NaN/Infinity as bare words, lone surrogates an error.
+#
+# canon() returns the bytes. update() streams the same bytes into a hashlib
+# object: containers with more than STREAM_MIN items (or directly holding one)
+# are walked and their items encoded one at a time, so the full bytes are never
+# built; everything smaller goes through the C encoder in one call.
+# Canonicalizer additionally memoizes the encoding and digest of each container
+# it has seen, by identity -- only for inputs that are not mutated while it is
+# alive (parsed patches, overlay results, manifests held by a daemon).
+
+STREAM_MIN = 64
+CHUNK = 1024      # items per C-encoder call while streaming
+
+def canon(obj): return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def _str_keys(d):
+    for k in d:
+        if type(k) is not str: return False
+    return True
+
+_CONTAINERS = (dict, list, tuple)
+
+def _big(obj):
+    return isinstance(obj, _CONTAINERS) and len(obj) > STREAM_MIN
+
+def _walk(obj):
+    return _big(obj) or (isinstance(obj, _CONTAINERS) and any(map(_big, obj.values() if isinstance(obj, dict) else obj)))
+
+def update(h, obj):
+    """h.update() with canon(obj), without building it whole. Returns h."""
+    d = isinstance(obj, dict)
+    if not _walk(obj) or (d and not _str_keys(obj)):
+        h.update(canon(obj)); return h
+    seq = sorted(obj) if d else obj
+    step = max(min(CHUNK, STREAM_MIN * 16), 1)
+    h.update(b"{" if d else b"[")
+    for i in range(0, len(seq), step):
+        part = seq[i:i + step]
+        if i: h.update(b",")
+        vals = [obj[k] for k in part] if d else part
+        if any(map(_walk, [v for v in vals if isinstance(v, _CONTAINERS)])):
+            for j, v in enumerate(vals):
+                if j: h.update(b",")
+                if d: h.update(encode_basestring(part[j]).encode('utf-8') + b":")
+                update(h, v)
+        else:
+            # a run of small items: one C-encoder call, brackets dropped
+            h.update(canon(dict(zip(part, vals)) if d else list(vals))[1:-1])
+    h.update(b"}" if d else b"]")
+    return h
+
+def digest(obj, algo="sha256"):
+    """Hex digest of canon(obj), streamed."""
+    return update(hashlib.new(algo), obj).hexdigest()
+
+class Canonicalizer:
+    """canon() and digest() with a memo of every dict and list encoded, keyed by identity.
+    The memo pins the objects it has seen (so ids are not reused) and is dropped whole once
+    it holds max_items; inputs must not be mutated while it is in use."""
+    def __init__(self, max_items=1 << 16):
+        self.max_items = max_items
+        self.memo = {}     # id(obj) -> (obj, canonical bytes)
+        self.digests = {}  # id(obj) -> (obj, hex digest)
+        self.hits = 0
+
+    def clear(self):
+        self.memo.clear(); self.digests.clear()
+
+    def canon(self, obj):
+        t = type(obj)
+        if t is not dict and t is not list: return canon(obj)
+        ent = self.memo.get(id(obj))
+        if ent is not None and ent[0] is obj:
+            self.hits += 1; return ent[1]
+        vals = obj.values() if t is dict else obj
+        if not any(type(v) is dict or type(v) is list for v in vals) or (t is dict and not _str_keys(obj)):
+            b = canon(obj)   # nothing below to share: one C-encoder call
+        elif t is dict:
+            b = b"{" + b",".join(encode_basestring(k).encode('utf-8') + b":" + self.canon(obj[k]) for k in sorted(obj)) + b"}"
+        else:
+            b = b"[" + b",".join(self.canon(v) for v in obj) + b"]"
+        if len(self.memo) >= self.max_items: self.memo.clear()
+        self.memo[id(obj)] = (obj, b)
+        return b
+
+    def digest(self, obj):
+        """sha256 hex of canon(obj)."""
+        ent = self.digests.get(id(obj))
+        if ent is not None and ent[0] is obj:
+            self.hits += 1; return ent[1]
+        d = hashlib.sha256(self.canon(obj)).hexdigest()
+        if type(obj) is dict or type(obj) is list:
+            if len(self.digests) >= self.max_items: self.digests.clear()
+            self.digests[id(obj)] = (obj, d)
+        return d
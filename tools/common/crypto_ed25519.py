@@ -1,15 +1,221 @@
 # Tries PyNaCl first, else external 'rtt-sign' binary must exist in PATH.
-import base64, shutil, subprocess, tempfile
+#
+# Keys are decoded once: PyNaCl key objects are memoized per base64 key, and
+# Ed25519 resolves trusted keys per key_id from .rtt/registry/trust/keys (re-read
+# only when the .pub file changes). Without PyNaCl, rtt-sign runs as one
+# long-lived coprocess ('rtt-sign serve', line protocol below) instead of a
+# process and a temp file per message; a binary without 'serve' falls back to
+# one call per message, with the temp file removed afterwards.
+#
+# rtt-sign serve: one request per line, one response line each, in order, both
+# prefixed with the request's sequence number (a response out of step closes the
+# coprocess). Every field is a single base64 token; keys and signatures come
+# from files and documents, so anything else is refused before it is sent.
+#   <seq> ping                                 -> <seq> pong
+#   <seq> sign <priv_b64> <msg_b64>            -> <seq> <sig_b64> | <seq> ERR <reason>
+#   <seq> verify <pub_b64> <msg_b64> <sig_b64> -> <seq> OK | <seq> FAIL
+import base64, os, queue, re, shutil, subprocess, tempfile, threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    from nacl.signing import SigningKey, VerifyKey
+    from nacl.exceptions import BadSignatureError
+except ImportError:
+    SigningKey = VerifyKey = BadSignatureError = None
+
+PIPELINE = 256   # requests written ahead of their responses (well inside the pipe buffers)
+
+@lru_cache(maxsize=1024)
+def _signing_key(priv_b64):
+    # a 32-byte seed, or seed||pub as rtt-sign gen writes it
+    return SigningKey(base64.b64decode(priv_b64)[:32])
+@lru_cache(maxsize=1024)
+def _verify_key(pub_b64): return VerifyKey(base64.b64decode(pub_b64))
+
+def _b64(b): return base64.b64encode(b).decode()
+
+_TOKEN = re.compile(r'[A-Za-z0-9+/=]+')
+def _token(s): return isinstance(s, str) and _TOKEN.fullmatch(s) is not None
+
+class RttSign:
+    """An rtt-sign binary, as a 'serve' coprocess when it supports it. One caller at a time
+    (Ed25519 keeps one per worker thread)."""
+    def __init__(self, exe=None):
+        self.exe = exe or shutil.which("rtt-sign")
+        if not self.exe: raise RuntimeError("PyNaCl missing and rtt-sign not found")
+        self.seq = 0
+        self.proc = subprocess.Popen([self.exe, "serve"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL)
+        try:
+            ok = self._call(["ping"]) == ["pong"]
+        except (OSError, ValueError):
+            ok = False
+        if not ok:
+            self.close()   # an older binary: gen | sign | verify only
+
+    def close(self):
+        if self.proc is None: return
+        proc, self.proc = self.proc, None
+        try: proc.stdin.close()
+        except OSError: pass
+        try: proc.wait(timeout=5)
+        except subprocess.TimeoutExpired: proc.kill(); proc.wait()
+        proc.stdout.close()
+
+    def _call(self, lines):
+        out = []
+        for i in range(0, len(lines), PIPELINE):
+            chunk = lines[i:i + PIPELINE]
+            first = self.seq + 1; self.seq += len(chunk)
+            self.proc.stdin.write("".join(f"{first + j} {ln}\n" for j, ln in enumerate(chunk)).encode()); self.proc.stdin.flush()
+            for j in range(len(chunk)):
+                r = self.proc.stdout.readline()
+                if not r: raise OSError(f"{self.exe} serve exited")
+                seq, _, resp = r.decode().strip().partition(" ")
+                if seq != str(first + j):
+                    self.close(); raise OSError(f"{self.exe} serve out of step: expected {first + j}, got {seq!r}")
+                out.append(resp)
+        return out
+
+    def _once(self, args, msg):
+        # no coprocess: one process per message, via a temp file that is removed again
+        fd, path = tempfile.mkstemp(prefix="rtt-sign-")
+        try:
+            with os.fdopen(fd, 'wb') as f: f.write(msg)
+            try:
+                return subprocess.check_output([self.exe, args[0], args[1], path, *args[2:]]).decode().strip()
+            except subprocess.CalledProcessError:
+                return "FAIL"
+        finally:
+            os.unlink(path)
+
+    def sign_many(self, priv_b64, msgs):
+        if not _token(priv_b64): raise ValueError("rtt-sign: private key is not a base64 token")
+        if self.proc is None: return [self._once(["sign", priv_b64], m) for m in msgs]
+        out = self._call([f"sign {priv_b64} {_b64(m)}" for m in msgs])
+        bad = next((r for r in out if r.startswith("ERR")), None)
+        if bad: raise RuntimeError(f"rtt-sign: {bad}")
+        return out
+
+    def verify_many(self, items):
+        """items: [(pub_b64, msg, sig_b64)] -> [bool]; a key or signature that is not a
+        single base64 token is False without reaching rtt-sign."""
+        out = [False] * len(items)
+        todo = [i for i, (p, _, s) in enumerate(items) if _token(p) and _token(s)]
+        if self.proc is None:
+            res = [self._once(["verify", items[i][0], items[i][2]], items[i][1]).startswith("OK") for i in todo]
+        else:
+            res = [r == "OK" for r in self._call([f"verify {items[i][0]} {_b64(items[i][1])} {items[i][2]}" for i in todo])]
+        for i, ok in zip(todo, res): out[i] = ok
+        return out
+
+_default, _default_lock = None, threading.Lock()
+def _rtt_sign():
+    global _default
+    with _default_lock:
+        if _default is None: _default = RttSign()
+        return _default
+
 def sign(priv_b64: str, msg: bytes) -> str:
+    if SigningKey is not None:
+        return _b64(_signing_key(priv_b64).sign(msg).signature)
+    rs = _rtt_sign()
+    with _default_lock: return rs.sign_many(priv_b64, [msg])[0]
+
+def verify(pub_b64: str, msg: bytes, sig_b64: str) -> bool:
+    if VerifyKey is not None:
+        try:
+            _verify_key(pub_b64).verify(msg, base64.b64decode(sig_b64)); return True
+        except (BadSignatureError, ValueError, TypeError):
+            return False
+    try: rs = _rtt_sign()
+    except RuntimeError: return False
+    with _default_lock: return rs.verify_many([(pub_b64, msg, sig_b64)])[0]
+
+def _fp(p):
     try:
-        from nacl.signing import SigningKey
-        sk = SigningKey(base64.b64decode(priv_b64))
-        sig = sk.sign(msg).signature
-        return base64.b64encode(sig).decode()
-    except Exception:
-        exe = shutil.which("rtt-sign")
-        if not exe: raise RuntimeError("PyNaCl missing and rtt-sign not found")
-        with tempfile.NamedTemporaryFile(delete=False) as tf:
-            tf.write(msg); tf.flush()
-            out = subprocess.check_output([exe, "sign", priv_b64, tf.name])
-            return out.decode().strip()
+        st = os.stat(p); return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        return None
+
+class Ed25519:
+    """Signer/verifier for many messages: trusted public keys by key_id from keys_dir
+    (.rtt/registry/trust/keys/<key_id>.pub, 'ed25519:<b64>'), private keys from priv_dir,
+    and batches spread over `workers` threads (PyNaCl releases the GIL) or rtt-sign
+    coprocesses, one per worker."""
+    def __init__(self, keys_dir, priv_dir=None, workers=None, exe=None):
+        self.keys_dir, self.priv_dir = str(keys_dir), priv_dir and str(priv_dir)
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.exe = exe
+        self.native = VerifyKey is not None and exe is None
+        self.keys = {}   # key_id -> (fingerprint, pub_b64 or None)
+        self.lock = threading.Lock()
+        self.procs, self.idle = [], queue.Queue()
+
+    def close(self):
+        for p in self.procs: p.close()
+        self.procs = []
+    def __enter__(self): return self
+    def __exit__(self, *a): self.close()
+
+    def pub(self, key_id):
+        """base64 public key of a trusted key_id, or None."""
+        p = os.path.join(self.keys_dir, f"{key_id}.pub")
+        fp = _fp(p)
+        with self.lock:
+            ent = self.keys.get(key_id)
+            if ent is not None and ent[0] == fp: return ent[1]
+            pub = None
+            if fp is not None:
+                with open(p, 'r', encoding='utf-8') as f: alg, _, pub = f.read().strip().partition(":")
+                if alg != "ed25519" or not pub: pub = None
+            self.keys[key_id] = (fp, pub)
+            return pub
+
+    def priv(self, key_id):
+        with open(os.path.join(self.priv_dir, f"{key_id}.priv"), 'r', encoding='utf-8') as f: return f.read().strip()
+
+    def _proc(self):
+        try: return self.idle.get_nowait()
+        except queue.Empty: pass
+        with self.lock:
+            p = RttSign(self.exe); self.procs.append(p)
+        return p
+
+    def _batches(self, items, fn):
+        # contiguous slices, one per worker; each slice borrows a coprocess when not native
+        n = len(items)
+        if n == 0: return []
+        step = max(1, -(-n // self.workers))
+        slices = [items[i:i + step] for i in range(0, n, step)]
+        def run(part):
+            if self.native: return fn(None, part)
+            p = self._proc()
+            try: return fn(p, part)
+            finally: self.idle.put(p)
+        if len(slices) == 1: return run(slices[0])
+        with ThreadPoolExecutor(len(slices)) as ex:
+            return [r for part in ex.map(run, slices) for r in part]
+
+    def verify_many(self, items):
+        """items: [(key_id, msg bytes, sig_b64)] -> [bool]; unknown key_ids verify False."""
+        pubs = [(self.pub(k), m, s) for k, m, s in items]
+        todo = [i for i, (p, _, s) in enumerate(pubs) if p and s]
+        out = [False] * len(items)
+        def fn(proc, part):
+            if proc is None: return [verify(p, m, s) for p, m, s in part]
+            return proc.verify_many(part)
+        for i, ok in zip(todo, self._batches([pubs[i] for i in todo], fn)): out[i] = ok
+        return out
+
+    def verify(self, key_id, msg, sig_b64):
+        return self.verify_many([(key_id, msg, sig_b64)])[0]
+
+    def sign_many(self, key_id, msgs):
+        """[sig_b64] of msgs under the private key key_id."""
+        priv = self.priv(key_id)
+        def fn(proc, part):
+            if proc is None: return [sign(priv, m) for m in part]
+            return proc.sign_many(priv, part)
+        return self._batches(list(msgs), fn)
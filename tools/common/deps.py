@@ -0,0 +1,96 @@
+import os, sqlite3
+from contextlib import contextmanager
+# Reverse-dependency index for provider views (.rtt/cache/deps.db). Edges are
+# recorded as things are built, and read backwards to find what a change makes
+# stale:
+#   overlay file        -> (provider, env, id@ver)   every candidate patch path, present or not,
+#                                                    so creating an overlay is a change too
+#   CAS digest          -> (provider, id@ver)        the object an entry was realized from
+#   (provider, id@ver)  -> realized file, view       written by view_materialize
+#   realized file       -> RTT manifest              written by view_to_rtt
+# Paths are stored relative to the repo root.
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS overlay_dep (overlay TEXT NOT NULL, provider TEXT NOT NULL, env TEXT NOT NULL, id TEXT NOT NULL,"
+    " PRIMARY KEY (overlay, provider, env, id))",
+    "CREATE INDEX IF NOT EXISTS overlay_dep_entry ON overlay_dep (provider, id)",
+    "CREATE TABLE IF NOT EXISTS entries (provider TEXT NOT NULL, id TEXT NOT NULL, env TEXT NOT NULL, hash TEXT NOT NULL,"
+    " realized TEXT NOT NULL, view TEXT NOT NULL, PRIMARY KEY (provider, id))",
+    "CREATE INDEX IF NOT EXISTS entries_hash ON entries (hash)",
+    "CREATE INDEX IF NOT EXISTS entries_id ON entries (id)",
+    "CREATE INDEX IF NOT EXISTS entries_realized ON entries (realized)",
+    "CREATE TABLE IF NOT EXISTS manifests (realized TEXT PRIMARY KEY, manifest TEXT NOT NULL)",
+]
+
+class DepIndex:
+    def __init__(self, path, timeout=30.0):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction() as c:
+            for s in SCHEMA: c.execute(s)
+
+    def close(self): self.db.close()
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.db
+        except BaseException:
+            self.db.execute("ROLLBACK"); raise
+        self.db.execute("COMMIT")
+
+    # --- recording ---------------------------------------------------------------
+    def record_view(self, provider, view, entries, replace=True):
+        """entries: [(id@ver, env, digest, realized path, [candidate overlay paths])].
+        replace=True drops the provider's previous edges first (a full view build)."""
+        with self.transaction() as c:
+            if replace:
+                c.execute("DELETE FROM entries WHERE provider=?", (provider,))
+                c.execute("DELETE FROM overlay_dep WHERE provider=?", (provider,))
+            else:
+                c.executemany("DELETE FROM overlay_dep WHERE provider=? AND id=?", ((provider, e[0]) for e in entries))
+            c.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                          ((provider, idv, env, h, realized, view) for idv, env, h, realized, _ in entries))
+            c.executemany("INSERT OR IGNORE INTO overlay_dep VALUES (?, ?, ?, ?)",
+                          ((o, provider, env, idv) for idv, env, _, _, ovs in entries for o in ovs))
+
+    def record_manifests(self, pairs):
+        """pairs: [(realized path, manifest path)]"""
+        with self.transaction() as c:
+            c.executemany("INSERT OR REPLACE INTO manifests VALUES (?, ?)", pairs)
+
+    # --- queries -------------------------------------------------------------------
+    def by_overlay(self, path):
+        return self.db.execute("SELECT DISTINCT provider, id FROM overlay_dep WHERE overlay=?", (path,)).fetchall()
+
+    def by_overlay_dir(self, prefix):
+        # a changed directory (or a file the index has never seen under it)
+        return self.db.execute("SELECT DISTINCT provider, id FROM overlay_dep WHERE substr(overlay, 1, ?)=?",
+                               (len(prefix), prefix)).fetchall()
+
+    def by_hash(self, h):
+        return self.db.execute("SELECT provider, id FROM entries WHERE hash=?", (h,)).fetchall()
+
+    def by_id(self, idv):
+        return self.db.execute("SELECT provider, id FROM entries WHERE id=?", (idv,)).fetchall()
+
+    def by_realized(self, path):
+        return self.db.execute("SELECT provider, id FROM entries WHERE realized=?", (path,)).fetchall()
+
+    def by_view(self, view):
+        return self.db.execute("SELECT provider, id FROM entries WHERE view=?", (view,)).fetchall()
+
+    def entry(self, provider, idv):
+        """(env, digest, realized, view) or None"""
+        return self.db.execute("SELECT env, hash, realized, view FROM entries WHERE provider=? AND id=?",
+                               (provider, idv)).fetchone()
+
+    def manifest_of(self, realized):
+        row = self.db.execute("SELECT manifest FROM manifests WHERE realized=?", (realized,)).fetchone()
+        return row and row[0]
@@ -0,0 +1,144 @@
+import json, os, re, sys, time, shutil
+from .registry import open_registry, KINDS
+# CAS reachability GC. Mark: every object the registry index points at, every
+# entry named by a view or by .rtt/linkmap.json (resolved through the registry,
+# plus the CAS file a materialized .link points at), and every 'sha256:<hex>'
+# inside a retained plan or WAL frame. Sweep: stream the loose CAS dir and move
+# unmarked objects older than the grace period to a quarantine dir (or delete
+# them); quarantined batches are purged once they too are past the grace.
+#
+# Marks are kept as 64-bit digest prefixes in a set of ints rather than hex
+# strings (well under half the memory at millions of objects). A prefix
+# collision can only keep a garbage object alive, never drop a live one.
+
+DIGEST = re.compile(r'sha256:([0-9a-f]{64})')
+HEX64 = re.compile(r'[0-9a-f]{64}')
+QUARANTINE = "quarantine"
+DEFAULT_GRACE_S = 24 * 3600
+
+class DigestSet:
+    """Membership over 64-bit prefixes of sha256 digests (hex or raw bytes)."""
+    __slots__ = ('_s',)
+    def __init__(self): self._s = set()
+    @staticmethod
+    def _key(h):
+        if isinstance(h, (bytes, bytearray, memoryview)): return int.from_bytes(bytes(h[:8]), 'big')
+        if h.startswith("sha256:"): h = h[7:]
+        return int(h[:16], 16)
+    def add(self, h): self._s.add(self._key(h))
+    def update(self, hs):
+        for h in hs: self._s.add(self._key(h))
+    def __contains__(self, h): return self._key(h) in self._s
+    def __len__(self): return len(self._s)
+
+def _scan_refs(path, marks):
+    """Add every 'sha256:<hex>' found in a JSON file; unreadable files mark nothing."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f: text = f.read()
+    except OSError:
+        return 0
+    n = 0
+    for m in DIGEST.finditer(text): marks.add(m.group(1)); n += 1
+    return n
+
+def mark(root, index_json):
+    """-> (DigestSet of live objects, {root kind: count}) for the repo at root."""
+    root = str(root)
+    marks, counts = DigestSet(), {}
+    with open_registry(index_json) as reg:
+        for kind in KINDS:
+            for _, ref in reg.items(kind): marks.add(ref)
+        counts["registry"] = len(marks)
+        # views and the linkmap name entries by id@version; the registry maps them to objects
+        named = set()
+        vdir = os.path.join(root, "views")
+        for name in (sorted(os.listdir(vdir)) if os.path.isdir(vdir) else []):
+            if not name.endswith(".view.json"): continue
+            try:
+                with open(os.path.join(vdir, name), 'r', encoding='utf-8') as f: view = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] gc: view {name}: {e}", file=sys.stderr); continue
+            named.update(e["id"] for e in view.get("entries", []) if "id" in e)
+        counts["views"] = len(named)
+        linked = 0
+        lm = os.path.join(root, ".rtt", "linkmap.json")
+        if os.path.isfile(lm):
+            with open(lm, 'r', encoding='utf-8') as f: linkmap = json.load(f)
+            for prov in linkmap.values():
+                for idv, realized in prov.items():
+                    named.add(idv)
+                    # the .link beside a realized file is a symlink (or proxy) into the CAS
+                    link = os.path.join(root, realized + ".link")
+                    target = os.path.realpath(link) if os.path.islink(link) else None
+                    if target is None and os.path.isfile(link):
+                        try:
+                            with open(link, 'r', encoding='utf-8') as f:
+                                target = os.path.normpath(os.path.join(os.path.dirname(link), json.load(f).get("ref", "")))
+                        except (OSError, ValueError): target = None
+                    stem = os.path.basename(target or "")[:-5]
+                    if HEX64.fullmatch(stem): marks.add(stem); linked += 1
+        counts["linkmap_links"] = linked
+        for idv in named:
+            ref = reg.get("agents", idv)
+            if ref: marks.add(ref)
+    # retained plans and WAL frames
+    counts["plan_refs"] = 0
+    for d in (os.path.join(root, "plans"), os.path.join(root, ".rtt", "wal")):
+        if not os.path.isdir(d): continue
+        with os.scandir(d) as it:
+            for e in it:
+                if e.name.endswith(".json") and e.is_file(): counts["plan_refs"] += _scan_refs(e.path, marks)
+    counts["marked"] = len(marks)
+    return marks, counts
+
+def sweep(cas_dir, marks, grace_s=DEFAULT_GRACE_S, mode="quarantine", dry_run=True, now=None, sample=20):
+    """Stream cas_dir; unmarked objects older than grace_s are quarantined or deleted.
+    mode: 'quarantine' | 'delete'. Returns a report dict; with dry_run nothing moves."""
+    now = time.time() if now is None else now
+    cas_dir = str(cas_dir)
+    qdir = os.path.join(os.path.dirname(cas_dir), QUARANTINE, time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)))
+    rep = {"scanned": 0, "live": 0, "young": 0, "garbage": 0, "garbage_bytes": 0, "swept": 0, "sample": [],
+           "mode": mode, "dry_run": dry_run, "quarantine": None if dry_run or mode != "quarantine" else qdir}
+    if not os.path.isdir(cas_dir): return rep
+    with os.scandir(cas_dir) as it:
+        for e in it:
+            if not e.name.endswith(".json") or not HEX64.fullmatch(e.name[:-5]): continue
+            rep["scanned"] += 1
+            if e.name[:-5] in marks: rep["live"] += 1; continue
+            try: st = e.stat()
+            except FileNotFoundError: continue
+            if now - st.st_mtime < grace_s: rep["young"] += 1; continue
+            rep["garbage"] += 1; rep["garbage_bytes"] += st.st_size
+            if len(rep["sample"]) < sample: rep["sample"].append(e.name[:-5])
+            if dry_run: continue
+            try:
+                if mode == "delete": os.remove(e.path)
+                else:
+                    os.makedirs(qdir, exist_ok=True); os.replace(e.path, os.path.join(qdir, e.name))
+                rep["swept"] += 1
+            except FileNotFoundError:
+                pass
+    return rep
+
+def quarantined(cas_dir):
+    qroot = os.path.join(os.path.dirname(str(cas_dir)), QUARANTINE)
+    return [os.path.join(qroot, d) for d in sorted(os.listdir(qroot))] if os.path.isdir(qroot) else []
+
+def purge(cas_dir, grace_s=DEFAULT_GRACE_S, dry_run=True, now=None):
+    """Remove quarantine batches older than grace_s. -> [(batch dir, objects)]"""
+    now = time.time() if now is None else now
+    out = []
+    for d in quarantined(cas_dir):
+        if now - os.stat(d).st_mtime < grace_s: continue
+        out.append((d, len(os.listdir(d))))
+        if not dry_run: shutil.rmtree(d)
+    return out
+
+def restore(cas_dir):
+    """Move every quarantined object back into the CAS. -> objects restored"""
+    n = 0
+    for d in quarantined(cas_dir):
+        for name in os.listdir(d):
+            os.replace(os.path.join(d, name), os.path.join(str(cas_dir), name)); n += 1
+        os.rmdir(d)
+    return n
@@ -0,0 +1,106 @@
+import json, os, sys, time, hashlib
+from concurrent.futures import ProcessPoolExecutor
+from .util import canon
+from .pack import PackReader, pack_paths
+from .registry import open_registry
+# Bulk CAS ingest shared by agents_ingest, skills_ingest and mcp_ingest. Source
+# documents are parsed, canonicalised and hashed in a process pool; a worker
+# only writes an object that is neither a loose CAS file nor in a pack, and
+# writes it to a temp name first so a reader never sees half an object. The
+# parent collects (key, ref) pairs and commits them to the registry in one
+# transaction at the end.
+
+CHUNK = 256          # source items per task
+POOL_MIN = 2 * CHUNK # below this the pool costs more than it saves
+
+def agent_record(obj):
+    return f"{obj['id']}@{obj.get('version','1.0.0')}", {"type":"agent","agent":obj}
+
+def skill_record(obj):
+    key = obj.get("id", obj.get("name"))
+    # checked here, in the worker: a bad key must fail its file, not the registry commit after the blobs are written
+    if not isinstance(key, str) or not key: raise ValueError("skill has no string id or name")
+    return key, {"type":"skill","skill":obj}
+
+def mcp_record(provider, t):
+    return f"{provider}/{t.get('name','tool')}@{t.get('version','1.0.0')}", {"type":"mcp_tool","provider":provider,"tool":t}
+
+# index kind -> (item -> [(key, record, source)])
+def _file_items(make):
+    def load(path):
+        with open(path, 'r', encoding='utf-8') as f: return [(*make(json.load(f)), path)]
+    return load
+
+LOADERS = {
+    "agents": _file_items(agent_record),
+    "skills": _file_items(skill_record),
+    "mcp_tools": lambda item: [(*mcp_record(*item), item[1])],   # item: (provider, tool dict)
+}
+
+_packs = []
+
+def _open_packs(pack_dir):
+    global _packs
+    _packs = [PackReader(p, l) for p, l in pack_paths(str(pack_dir))] if pack_dir and os.path.isdir(pack_dir) else []
+
+def _have(cas_dir, h):
+    # a re-referenced loose object gets a fresh mtime, so cas_gc's grace period
+    # covers it until the registry commit below marks it live
+    try: os.utime(os.path.join(cas_dir, f"{h}.json")); return True
+    except FileNotFoundError: return any(h in p for p in _packs)
+
+def write_object(cas_dir, h, b):
+    """Write one CAS object via temp + rename; concurrent writers of the same digest are harmless."""
+    tmp = os.path.join(cas_dir, f".{h}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f: f.write(b)
+    os.replace(tmp, os.path.join(cas_dir, f"{h}.json"))
+
+def _ingest_chunk(kind, cas_dir, items):
+    """-> ([(key, ref, source, new)], bytes_read, bytes_written, errors)"""
+    out, nread, nwrite, errs = [], 0, 0, []
+    for item in items:
+        try: recs = LOADERS[kind](item)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            errs.append((str(item if isinstance(item, str) else item[1].get('name')), f"{type(e).__name__}: {e}")); continue
+        for key, rec, src in recs:
+            b = canon(rec); h = hashlib.sha256(b).hexdigest()
+            nread += len(b)
+            new = not _have(cas_dir, h)
+            if new: write_object(cas_dir, h, b); nwrite += len(b)
+            out.append((key, f"sha256:{h}", src, new))
+    return out, nread, nwrite, errs
+
+def bulk_ingest(kind, items, cas_dir, index_json, pack_dir=None, workers=None, chunk=CHUNK, log=print):
+    """Ingest items (paths, or (provider, tool) pairs for mcp_tools) into the CAS and
+    the registry. Returns the stats dict that is also logged as the summary line."""
+    t0 = time.perf_counter()
+    cas_dir = str(cas_dir); os.makedirs(cas_dir, exist_ok=True)
+    items = list(items)
+    chunks = [items[i:i + chunk] for i in range(0, len(items), chunk)]
+    workers = workers or os.cpu_count() or 1
+    results = []
+    if workers > 1 and len(items) >= POOL_MIN:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_open_packs, initargs=(pack_dir,)) as ex:
+            results = list(ex.map(_ingest_chunk, [kind] * len(chunks), [cas_dir] * len(chunks), chunks))
+    else:
+        _open_packs(pack_dir)
+        try: results = [_ingest_chunk(kind, cas_dir, c) for c in chunks]
+        finally:
+            for p in _packs: p.close()
+    entries, stats = {}, {"objects": 0, "new": 0, "skipped": 0, "bytes": 0, "bytes_written": 0, "errors": []}
+    for out, nread, nwrite, errs in results:
+        for key, ref, src, new in out:
+            entries[key] = ref
+            stats["objects"] += 1; stats["new" if new else "skipped"] += 1
+            if log and new: log(f"[OK] {kind} {key} -> {ref}")
+        stats["bytes"] += nread; stats["bytes_written"] += nwrite; stats["errors"] += errs
+    with open_registry(index_json) as reg:
+        reg.upsert(kind, entries.items())
+    dt = max(time.perf_counter() - t0, 1e-9)
+    stats.update(seconds=round(dt, 3), objects_per_s=round(stats["objects"] / dt, 1), mb_per_s=round(stats["bytes"] / dt / 1e6, 2))
+    for path, err in stats["errors"]:
+        print(f"[WARN] {kind} {path}: {err}", file=sys.stderr)
+    if log:
+        log(f"[OK] {kind}: {stats['objects']} objects ({stats['new']} new, {stats['skipped']} already stored) in {dt:.2f}s "
+            f"- {stats['objects_per_s']:.0f} objects/s, {stats['mb_per_s']:.1f} MB/s")
+    return stats
@@ -0,0 +1,41 @@
+import json, os
+from contextlib import contextmanager
+# .rtt/linkmap.json: provider -> {id@version -> realized path}. Several tools
+# write it (view_materialize, project_providers); each replaces only the
+# providers it produced, under a lock, and swaps the file in with a rename so
+# readers never see a partial map and concurrent writers don't drop each other.
+# The lock file sits in the sibling cache dir (.rtt/cache/linkmap.json.lock).
+
+try:
+    import fcntl
+except ImportError:   # no advisory locks (Windows); writers must not overlap there
+    fcntl = None
+
+@contextmanager
+def _lock(path):
+    cache = os.path.join(os.path.dirname(path), "cache")
+    os.makedirs(cache, exist_ok=True)
+    with open(os.path.join(cache, os.path.basename(path) + ".lock"), "a+b") as f:
+        if fcntl: fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try: yield
+        finally:
+            if fcntl: fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def load_linkmap(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f: return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def update_linkmap(path, maps):
+    """Merge maps (provider -> {id -> path}) into the linkmap at path; returns the merged map."""
+    path = str(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with _lock(path):
+        try: merged = load_linkmap(path)
+        except ValueError: merged = {}   # a torn file from an older, non-atomic writer
+        merged.update(maps)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f: f.write(json.dumps(merged, indent=2))
+        os.replace(tmp, path)
+    return merged
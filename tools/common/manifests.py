@@ -0,0 +1,105 @@
+import json, os, sys, hashlib, marshal
+# Shared manifest store. Every tool used to glob .rtt/manifests/*.json and parse
+# every file on every run; this keeps a snapshot of the parsed manifests under
+# the sibling cache dir (.rtt/cache) keyed by per-file stat fingerprints, so a
+# run only re-parses files whose (mtime_ns, size, inode) changed. Stdlib only:
+# imported both as tools.common.manifests and, from scripts, common.manifests.
+
+SNAPSHOT_VERSION = 1
+# marshal, not json: the snapshot is a private cache and marshal round-trips
+# plain dicts/lists several times faster. The header pins the interpreter so a
+# snapshot from another Python is simply ignored.
+SNAPSHOT_TAG = f"rtt-manifests/{SNAPSHOT_VERSION}/py{sys.version_info[0]}.{sys.version_info[1]}/m{marshal.version}"
+
+def default_cache_dir(mdir):
+    # .rtt/manifests -> .rtt/cache; dirs without a cache sibling are not snapshotted
+    d = os.path.join(os.path.dirname(os.path.abspath(mdir)), 'cache')
+    return d if os.path.isdir(d) else None
+
+class ManifestStore:
+    """Parsed manifests of one directory.
+
+    docs: file name -> whole manifest, symbols: saddr -> manifest['symbol'],
+    paths: saddr -> file path, errors: [{'path', 'error'}] for files that failed
+    to parse or have no symbol.saddr (reported, never silently dropped), fps: file
+    name -> (mtime_ns, size, inode) as loaded."""
+    def __init__(self, mdir, cache_dir=None):
+        self.mdir = str(mdir)
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir(mdir)
+        self.docs, self.symbols, self.paths, self.errors = {}, {}, {}, []
+        self.fps = {}
+        self.stats = {'files': 0, 'parsed': 0, 'cached': 0}
+
+    def snapshot_path(self):
+        if not self.cache_dir: return None
+        key = hashlib.sha256(os.path.abspath(self.mdir).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"manifests-{key}.snap")
+
+    def _read_snapshot(self):
+        p = self.snapshot_path()
+        if not p or not os.path.isfile(p): return {}
+        try:
+            with open(p, 'rb') as f: tag, mdir, files = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}   # a torn or foreign snapshot just means a cold load
+        if tag != SNAPSHOT_TAG or mdir != os.path.abspath(self.mdir): return {}
+        return files
+
+    def _write_snapshot(self, files):
+        p = self.snapshot_path()
+        if not p: return
+        tmp = f"{p}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'wb') as f: f.write(marshal.dumps((SNAPSHOT_TAG, os.path.abspath(self.mdir), files)))
+            os.replace(tmp, p)
+        except OSError as e:
+            print(f"[WARN] manifest snapshot not written: {e}", file=sys.stderr)
+            if os.path.exists(tmp): os.remove(tmp)
+
+    def load(self):
+        # files: name -> (mtime_ns, size, inode, doc or None, error or None)
+        old = self._read_snapshot()
+        files, parsed = {}, 0
+        try:
+            entries = [e for e in os.scandir(self.mdir) if e.name.endswith('.json') and e.is_file()]
+        except FileNotFoundError:
+            entries = []
+        entries.sort(key=lambda e: e.name)
+        for e in entries:
+            st = e.stat()
+            ent = old.get(e.name)
+            if ent is None or ent[0] != st.st_mtime_ns or ent[1] != st.st_size or ent[2] != st.st_ino:
+                doc = err = None
+                try:
+                    with open(e.path, 'r', encoding='utf-8') as f: doc = json.load(f)
+                except (OSError, ValueError) as x:
+                    err = f"{type(x).__name__}: {x}"
+                ent = (st.st_mtime_ns, st.st_size, st.st_ino, doc, err)
+                parsed += 1
+            files[e.name] = ent
+        self.stats.update(files=len(files), parsed=parsed, cached=len(files) - parsed)
+        self.fps = {name: ent[:3] for name, ent in files.items()}
+        prefix = os.path.join(self.mdir, '')
+        for name, (_, _, _, doc, err) in files.items():
+            if err is not None:
+                self.errors.append({'path': prefix + name, 'error': err}); continue
+            self.docs[name] = doc
+            sym = doc.get('symbol') if isinstance(doc, dict) else None
+            if not isinstance(sym, dict) or not sym.get('saddr'):
+                self.errors.append({'path': prefix + name, 'error': 'missing symbol.saddr'}); continue
+            self.symbols[sym['saddr']] = sym; self.paths[sym['saddr']] = prefix + name
+        if parsed or len(files) != len(old): self._write_snapshot(files)
+        return self
+
+def load_store(mdir, cache_dir=None):
+    return ManifestStore(mdir, cache_dir).load()
+
+def warn_errors(store, out=sys.stderr):
+    for e in store.errors:
+        print(f"[WARN] manifest {e['path']}: {e['error']}", file=out)
+
+def load_manifests(mdir):
+    """saddr -> symbol, as the old per-tool loaders returned; parse errors go to stderr."""
+    store = load_store(mdir)
+    warn_errors(store)
+    return store.symbols
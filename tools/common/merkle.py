@@ -0,0 +1,178 @@
+import hashlib, json, os
+from .util import canon
+# Merkle plan format (optional; plan_build.py / plan_build_ilp.py --merkle).
+#
+# Every routes_add and routes_del entry and every placement pair is a leaf, after
+# one header leaf holding the plan's other fields (order, inputs, ...):
+#   ["header", {...}]   ["routes_add", route]   ["routes_del", route]   ["placement", saddr, node]
+# in plan order (placement by saddr). A leaf hashes as sha256(0x00 || canon(leaf)),
+# an inner node as sha256(0x01 || left || right), and the tree splits at the
+# largest power of two below its size (RFC 9162's Merkle tree hash), so the same
+# plan always gives the same root. The plan carries
+#   "merkle": {"v": V, "root": <hex>, "leaves": n},  "plan_id": "sha256-<root>"
+# and its ed25519 signature covers message(root, n) rather than the whole plan.
+# One route is then checked with its leaf, an O(log n) inclusion proof and that
+# signature (see proof() / check_proof()), and a rebuild rehashes only the leaves
+# that changed, given the previous tree (its leaf digests are kept next to the
+# plan, plans/<plan_id>.leaves).
+
+V = "rtt-plan-merkle/1"
+SECTIONS = ("routes_add", "routes_del", "placement")
+_NOT_HEADER = frozenset(SECTIONS + ("plan_id", "sign", "merkle"))
+
+def leaf_hash(data): return hashlib.sha256(b"\x00" + data).digest()
+def node_hash(l, r): return hashlib.sha256(b"\x01" + l + r).digest()
+
+def levels(hashes, prev=None):
+    """Every level of the tree, leaves first. Pairs are hashed bottom-up and an odd last
+    node is carried up unchanged, which gives RFC 9162's tree (split at the largest power
+    of two). With prev (the previous tree's levels), a pair whose two children are the very
+    objects prev paired at the same position keeps prev's parent instead of being rehashed."""
+    out = [hashes]
+    while len(out[-1]) > 1:
+        lvl, d = out[-1], len(out) - 1
+        pl = prev[d] if prev is not None and d + 1 < len(prev) else None
+        pu = prev[d + 1] if pl is not None else None
+        up = []
+        for i in range(0, len(lvl) - 1, 2):
+            l, r = lvl[i], lvl[i + 1]
+            if pl is not None and i + 1 < len(pl) and pl[i] is l and pl[i + 1] is r: up.append(pu[i >> 1])
+            else: up.append(node_hash(l, r))
+        if len(lvl) & 1: up.append(lvl[-1])
+        out.append(up)
+    return out
+
+def tree_root(hashes):
+    return levels(hashes)[-1][0] if hashes else hashlib.sha256(b"").digest()
+
+def inclusion_proof(lv, i):
+    """Sibling hashes from leaf i up to the root, given the tree's levels."""
+    path = []
+    for lvl in lv[:-1]:
+        j = i ^ 1
+        if j < len(lvl): path.append(lvl[j])
+        i >>= 1
+    return path
+
+def verify_inclusion(h, i, n, path, root):
+    """RFC 9162 2.1.3.2: does leaf hash h at index i of n leaves hash up to root via path?"""
+    if i >= n: return False
+    fn, sn = i, n - 1
+    for p in path:
+        if sn == 0: return False
+        if fn & 1 or fn == sn:
+            h = node_hash(p, h)
+            if not fn & 1:
+                while fn and not fn & 1: fn >>= 1; sn >>= 1
+        else:
+            h = node_hash(h, p)
+        fn >>= 1; sn >>= 1
+    return sn == 0 and h == root
+
+def plan_leaves(plan):
+    """[(key, leaf)]: key identifies the leaf across plan versions, leaf is what gets hashed."""
+    out = [(("header",), ["header", {k: v for k, v in plan.items() if k not in _NOT_HEADER}])]
+    for s in SECTIONS[:2]:
+        out.extend(((s, r.get("from"), r.get("to")), [s, r]) for r in plan.get(s) or [])
+    out.extend((("placement", k), ["placement", k, v]) for k, v in sorted((plan.get("placement") or {}).items()))
+    return out
+
+def message(root, n):
+    """The bytes a Merkle plan's signature covers."""
+    return canon({"leaves": n, "root": root, "v": V})
+
+class PlanTree:
+    """Leaf digests and root of a plan. prev (the previous build's tree) lends the digest
+    of every leaf whose key and content are unchanged, so only changed leaves are hashed."""
+    def __init__(self, plan, prev=None):
+        self.leaves = plan_leaves(plan)
+        old = prev.by_key() if prev is not None else {}
+        self.hashes, self.rehashed = [], 0
+        for key, leaf in self.leaves:
+            o = old.get(key)
+            if o is not None and o[0] == leaf:
+                self.hashes.append(o[1])
+            else:
+                self.hashes.append(leaf_hash(canon(leaf))); self.rehashed += 1
+        self.levels = levels(self.hashes, prev.levels if prev is not None else None)
+        self.root = (self.levels[-1][0] if self.hashes else tree_root([])).hex()
+
+    def by_key(self):
+        return {key: (leaf, h) for (key, leaf), h in zip(self.leaves, self.hashes)}
+
+    def message(self): return message(self.root, len(self.hashes))
+
+    def index(self, key):
+        return next((i for i, (k, _) in enumerate(self.leaves) if k == key), None)
+
+    def proof(self, plan, key):
+        """Self-contained inclusion proof of one leaf (checked by check_proof), or None."""
+        i = self.index(key)
+        if i is None: return None
+        return {"v": V, "plan_id": plan.get("plan_id"), "root": self.root, "leaves": len(self.hashes), "index": i,
+                "leaf": self.leaves[i][1], "path": [h.hex() for h in inclusion_proof(self.levels, i)], "sign": plan.get("sign")}
+
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f: f.write(b"".join(self.hashes))
+        os.replace(tmp, path)
+
+    @classmethod
+    def cached(cls, plan, path):
+        """The tree of an already-built Merkle plan from its saved leaf digests (None when
+        missing or not matching the plan's root); only a hint for the next build's prev."""
+        m = plan.get("merkle") or {}
+        try:
+            with open(path, 'rb') as f: raw = f.read()
+        except OSError:
+            return None
+        self = cls.__new__(cls)
+        self.leaves = plan_leaves(plan)
+        self.hashes = [raw[i:i + 32] for i in range(0, len(raw), 32)]
+        self.rehashed = 0
+        if len(self.hashes) != len(self.leaves): return None
+        self.levels = levels(self.hashes)
+        if self.levels[-1][0].hex() != m.get("root"): return None
+        self.root = m["root"]
+        return self
+
+def leaves_path(plans_dir, plan_id): return os.path.join(str(plans_dir), f"{plan_id}.leaves")
+
+def previous(plans_dir):
+    """Tree of plans_dir/latest.json when it is a Merkle plan with saved leaf digests, else None."""
+    try:
+        with open(os.path.join(str(plans_dir), "latest.json"), 'r', encoding='utf-8') as f: plan = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not plan.get("merkle"): return None
+    return PlanTree.cached(plan, leaves_path(plans_dir, plan.get("plan_id")))
+
+def sign_plan(plan, key_id, sign, prev=None):
+    """Make plan a signed Merkle plan in place. sign: bytes -> sig_b64. Returns its PlanTree."""
+    plan.pop("sign", None)
+    tree = PlanTree(plan, prev)
+    plan["merkle"] = {"v": V, "root": tree.root, "leaves": len(tree.hashes)}
+    plan["plan_id"] = "sha256-" + tree.root
+    plan["sign"] = {"alg": "ed25519", "key_id": key_id, "sig": sign(tree.message())}
+    return tree
+
+def check_plan(plan):
+    """Recompute a Merkle plan's tree: (message to verify the signature against, or None, reason)."""
+    m = plan.get("merkle") or {}
+    if m.get("v") != V: return None, f"unknown merkle format {m.get('v')!r}"
+    tree = PlanTree(plan)
+    if tree.root != m.get("root") or len(tree.hashes) != m.get("leaves"): return None, "merkle root mismatch"
+    if plan.get("plan_id") != "sha256-" + tree.root: return None, "plan_id mismatch"
+    return tree.message(), None
+
+def check_proof(proof):
+    """Check an inclusion proof against its root: (message to verify the signature against, or None, reason)."""
+    if proof.get("v") != V: return None, f"unknown merkle format {proof.get('v')!r}"
+    try:
+        root = bytes.fromhex(proof["root"]); path = [bytes.fromhex(h) for h in proof["path"]]
+        ok = verify_inclusion(leaf_hash(canon(proof["leaf"])), int(proof["index"]), int(proof["leaves"]), path, root)
+    except (KeyError, ValueError, TypeError):
+        return None, "malformed proof"
+    if not ok: return None, "inclusion proof does not reach the root"
+    if proof.get("plan_id") != "sha256-" + proof["root"]: return None, "plan_id mismatch"
+    return message(proof["root"], int(proof["leaves"])), None
@@ -0,0 +1,104 @@
+from collections import OrderedDict
+# Overlay merge engine. A patch file is compiled once into a merge plan; the
+# plans of an entry's ordered layers are composed into a single plan (cached
+# per layer combination, which thousands of entries share), and that plan is
+# applied to a base document in one pass. Application is copy-on-write: a dict
+# is copied only where the plan touches it, every other subtree is the base's
+# own object, and values a patch contributes are shared with the plan. Results
+# must therefore be treated as read-only (json.dumps them, don't mutate them).
+#
+# Semantics are exactly deep_merge's, layer after layer:
+#   dict onto dict   -> merge key by key
+#   anything else    -> the patch value replaces the base value
+# A plan node is either Set(value) (replace) or Merge({key: node}) (merge into a
+# dict, or become the merged patch value when the base is not a dict).
+
+def deep_merge(base, patch):
+    # reference semantics; the engine below must agree with it
+    if isinstance(base, dict) and isinstance(patch, dict):
+        out = dict(base)
+        for k,v in patch.items():
+            out[k] = deep_merge(out.get(k), v) if k in out else v
+        return out
+    return patch
+
+class Set:
+    __slots__ = ('value',)
+    def __init__(self, value): self.value = value
+
+class Merge:
+    __slots__ = ('items', '_value')
+    def __init__(self, items, value=None):
+        self.items = items      # [(key, node)]
+        self._value = value     # the node as a plain value, built on first use
+    @property
+    def value(self):
+        if self._value is None:
+            self._value = {k: n.value for k, n in self.items}
+        return self._value
+
+def compile_patch(patch):
+    """Merge plan for one parsed patch document."""
+    if isinstance(patch, dict):
+        return Merge([(k, compile_patch(v)) for k, v in patch.items()], patch)
+    return Set(patch)
+
+def compose(a, b):
+    """Plan equivalent to applying a, then b."""
+    if isinstance(b, Set): return b
+    if isinstance(a, Set): return Set(apply(a.value, b))
+    items = dict(a.items)
+    for k, n in b.items:
+        items[k] = compose(items[k], n) if k in items else n
+    return Merge(list(items.items()))
+
+def apply(base, plan):
+    """deep_merge of the plan's layers onto base, sharing every untouched subtree."""
+    if isinstance(plan, Set): return plan.value
+    if not isinstance(base, dict): return plan.value
+    out = dict(base)
+    for k, n in plan.items:
+        if k in base:
+            out[k] = apply(base[k], n)
+        else:
+            out[k] = n.value
+    return out
+
+class OverlayEngine:
+    """Composed plans per layer combination and merged documents per (base digest, layer digests).
+
+    layers: [(sha256, parsed patch)] in application order."""
+    def __init__(self, max_results=4096):
+        self.plans = {}                 # sha256 -> compiled plan of one patch
+        self.composed = {}              # tuple of sha256 -> composed plan
+        self.results = OrderedDict()    # (base digest, tuple of sha256) -> merged document
+        self.max_results = max_results
+        self.stats = {"compiled": 0, "composed": 0, "hits": 0, "merges": 0}
+
+    def plan(self, layers):
+        key = tuple(h for h, _ in layers)
+        p = self.composed.get(key)
+        if p is None:
+            for h, doc in layers:
+                if h not in self.plans:
+                    self.plans[h] = compile_patch(doc); self.stats["compiled"] += 1
+            p = None
+            for h in key: p = self.plans[h] if p is None else compose(p, self.plans[h])
+            self.composed[key] = p; self.stats["composed"] += 1
+        return key, p
+
+    def merge(self, base_digest, base, layers):
+        """base merged with layers; base_digest identifies base (None disables the result cache)."""
+        if not layers: return base
+        key, plan = self.plan(layers)
+        if base_digest is None:
+            self.stats["merges"] += 1
+            return apply(base, plan)
+        rk = (base_digest, key)
+        out = self.results.get(rk)
+        if out is not None:
+            self.results.move_to_end(rk); self.stats["hits"] += 1
+            return out
+        out = self.results[rk] = apply(base, plan); self.stats["merges"] += 1
+        if len(self.results) > self.max_results: self.results.popitem(last=False)
+        return out
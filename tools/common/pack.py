@@ -0,0 +1,405 @@
+import hashlib, json, mmap, os, re, struct, zlib
+from collections import Counter
+from contextlib import contextmanager
+# CAS packfile v2. Stdlib only: imported as tools.common.pack and, from the
+# script tools, as common.pack.
+#
+#   pack  = b"RTTPACK2" | object bytes ...           (offsets are absolute)
+#   lut   = b"RTTLUT2\n" | count u32 | flags u32 | sha256(rest) 32B
+#           | [dict len u32 | zlib preset dict]    (if flags & LUT_DICT)
+#           | fanout 256 x u32 | count x entry
+#   entry = digest 32B | offset u64 | length u32 | flags u32, sorted by digest
+#
+# An entry with FLAG_ZLIB holds raw deflate made with the LUT's preset dict;
+# the digest and all integrity checks are over the inflated bytes, and
+# uncompressed entries can sit in the same pack.
+#
+# A pack dir holds several packs, listed newest first in packs.json (written
+# via rename, so it is the commit point for appends and compaction). Without a
+# packs.json the dir is the single agents.pack + index.lut that build writes.
+#
+# fanout[b] is the number of entries whose digest's first byte is <= b, so a
+# lookup bisects only inside [fanout[b-1], fanout[b]). Objects are addressed by
+# the sha256 of their canonical (uncompressed) bytes, as in the loose CAS, so a
+# deflated entry keeps its name; integrity checks hash the same bytes.
+
+PACK_MAGIC = b"RTTPACK2"
+LUT_MAGIC = b"RTTLUT2\n"
+LUT_HEAD = struct.Struct(">8sII32s")
+ENTRY = struct.Struct(">32sQII")
+FANOUT = struct.Struct(">256I")
+LUT_DICT = 1
+FLAG_ZLIB = 1
+DICT_MAX = 32 << 10   # zlib only uses the last 32 KiB of a preset dict
+
+def digest_bytes(h):
+    """'sha256:<hex>', '<hex>' or 32 raw bytes -> 32 raw bytes."""
+    if isinstance(h, (bytes, bytearray)) and len(h) == 32: return bytes(h)
+    if h.startswith("sha256:"): h = h[7:]
+    return bytes.fromhex(h)
+
+class PackError(Exception):
+    pass
+
+def _dict_section(zdict):
+    return struct.pack(">I", len(zdict)) + zdict if zdict else b""
+
+def _lut_bytes(entries, zdict=b""):
+    # entries: sorted [(digest32, offset, length, flags)]
+    fan = [0] * 256
+    for d, *_ in entries: fan[d[0]] += 1
+    for i in range(1, 256): fan[i] += fan[i - 1]
+    body = _dict_section(zdict) + FANOUT.pack(*fan) + b"".join(ENTRY.pack(*e) for e in entries)
+    return LUT_HEAD.pack(LUT_MAGIC, len(entries), LUT_DICT if zdict else 0, hashlib.sha256(body).digest()) + body
+
+def train_dict(samples, size=DICT_MAX):
+    """Preset dictionary from sample documents: the JSON fragments (runs of one to three
+    tokens) that save the most bytes across the sample, most valuable last, as zlib prefers."""
+    tok = re.compile(rb'"(?:[^"\\]|\\.)*"|[-0-9.eE+]+|true|false|null|[{}\[\]:,]')
+    score = Counter()
+    for doc in samples:
+        t = tok.findall(bytes(doc))
+        seen = set()
+        for n in (1, 2, 3):
+            for i in range(len(t) - n + 1):
+                frag = b"".join(t[i:i + n])
+                if len(frag) > 3 and frag not in seen: seen.add(frag)
+        for frag in seen: score[frag] += len(frag)
+    picked, total = [], 0
+    for frag, sc in score.most_common():
+        if sc <= 2 * len(frag): break   # fragments seen once or twice don't pay for their space
+        if total + len(frag) > size: continue
+        if any(frag in p for p in picked[-64:]): continue
+        picked.append(frag); total += len(frag)
+    return b"".join(reversed(picked))
+
+def deflate(data, zdict, level=9):
+    c = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict) if zdict else zlib.compressobj(level, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush()
+
+def inflate(buf, zdict):
+    d = zlib.decompressobj(-15, zdict=zdict) if zdict else zlib.decompressobj(-15)
+    return d.decompress(buf) + d.flush()
+
+def _encode(data, zdict, compress):
+    """(stored bytes, flags): compressed only when it actually saves space."""
+    if compress:
+        z = deflate(data, zdict)
+        if len(z) < len(data): return z, FLAG_ZLIB
+    return data, 0
+
+def write_lut(lut_path, entries, zdict=b""):
+    """Write the LUT next to its pack via write-then-rename, so readers never see a torn index.
+    entries is a list of (digest, offset, length, flags) or ready LUT bytes."""
+    tmp = f"{lut_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(entries if isinstance(entries, bytes) else _lut_bytes(sorted(entries), zdict))
+        f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, lut_path)
+
+def write_pack(pack_path, lut_path, objects, zdict=None):
+    """objects: iterable of (digest, bytes). Duplicate digests are stored once. With zdict
+    (b"" for no preset dict) objects are stored deflated wherever that is smaller."""
+    entries, seen = [], set()
+    tmp = f"{pack_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(PACK_MAGIC); off = len(PACK_MAGIC)
+        for h, data in objects:
+            d = digest_bytes(h)
+            if d in seen: continue
+            seen.add(d)
+            data, flags = _encode(data, zdict, zdict is not None)
+            f.write(data); entries.append((d, off, len(data), flags)); off += len(data)
+        f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, pack_path)
+    write_lut(lut_path, entries, zdict or b"")
+    return len(entries)
+
+class PackReader:
+    """mmap-backed reader for one pack + LUT. get() returns a memoryview: zero-copy
+    into the pack for stored objects (release it before close()), over the inflated
+    bytes for compressed ones."""
+    def __init__(self, pack_path, lut_path):
+        self.pack_path, self.lut_path = str(pack_path), str(lut_path)
+        self._files, self._maps = [], []
+        try:
+            self._load()
+        except Exception:
+            self.close(); raise
+
+    def _map(self, path):
+        f = open(path, "rb"); self._files.append(f)
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ); self._maps.append(m)
+        return m
+
+    def _load(self):
+        lut = self._map(self.lut_path)
+        if lut[:1] == b"{":
+            # v1: JSON {hex: {offset, len}} over u32-length-prefixed records; rebuilt as a v2 table in memory
+            import json
+            d = json.loads(bytes(lut).decode("utf-8"))
+            lut, self._v1 = _lut_bytes(sorted((bytes.fromhex(h), e["offset"] + 4, e["len"], 0) for h, e in d.items())), True
+        magic, self.count, lflags, chk = LUT_HEAD.unpack_from(lut, 0)
+        if magic != LUT_MAGIC: raise PackError(f"{self.lut_path}: not a v2 LUT")
+        start = base = LUT_HEAD.size
+        self.zdict = b""
+        if lflags & LUT_DICT:
+            (dlen,) = struct.unpack_from(">I", lut, base)
+            self.zdict = bytes(lut[base + 4:base + 4 + dlen]); base += 4 + dlen
+        end = base + FANOUT.size + self.count * ENTRY.size
+        if len(lut) < end: raise PackError(f"{self.lut_path}: truncated")
+        if hashlib.sha256(lut[start:end]).digest() != chk: raise PackError(f"{self.lut_path}: checksum mismatch")
+        self.fanout = FANOUT.unpack_from(lut, base)
+        self._lut, self._ebase = lut, base + FANOUT.size
+        self._pack = self._map(self.pack_path)
+        if not getattr(self, "_v1", False) and self._pack[:8] != PACK_MAGIC: raise PackError(f"{self.pack_path}: not a v2 pack")
+        self._view = memoryview(self._pack)
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self._lut, self._ebase + i * ENTRY.size)
+
+    def _digest_at(self, i):
+        p = self._ebase + i * ENTRY.size
+        return self._lut[p:p + 32]
+
+    def _lower_bound(self, d):
+        b = d[0]
+        lo, hi = (self.fanout[b - 1] if b else 0), self.fanout[b]
+        lut, base, size = self._lut, self._ebase, ENTRY.size
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            p = base + mid * size
+            if lut[p:p + 32] < d: lo = mid + 1
+            else: hi = mid
+        return lo
+
+    def find(self, h):
+        """(offset, length, flags) for digest h, or None."""
+        d = digest_bytes(h)
+        i = self._lower_bound(d)
+        p = self._ebase + i * ENTRY.size
+        if i < self.fanout[d[0]] and self._lut[p:p + 32] == d:
+            return ENTRY.unpack_from(self._lut, p)[1:]
+        return None
+
+    def lut_with(self, new):
+        """LUT bytes for this table plus new (digest, offset, length, flags) entries not already in it,
+        spliced into the raw sorted table rather than rebuilt entry by entry."""
+        size, raw = ENTRY.size, self._lut[self._ebase:self._ebase + self.count * ENTRY.size]
+        fan, pieces, last = list(self.fanout), [], 0
+        for e in sorted(new):
+            i = self._lower_bound(e[0])
+            pieces.append(raw[last * size:i * size]); pieces.append(ENTRY.pack(*e)); last = i
+            for b in range(e[0][0], 256): fan[b] += 1
+        pieces.append(raw[last * size:])
+        body = _dict_section(self.zdict) + FANOUT.pack(*fan) + b"".join(pieces)
+        return LUT_HEAD.pack(LUT_MAGIC, self.count + len(new), LUT_DICT if self.zdict else 0, hashlib.sha256(body).digest()) + body
+
+    def __contains__(self, h): return self.find(h) is not None
+    def __len__(self): return self.count
+
+    def _read(self, off, ln, flags):
+        if off + ln > len(self._pack): raise PackError(f"{self.pack_path}: shorter than its LUT")
+        mv = self._view[off:off + ln]
+        if flags & FLAG_ZLIB:
+            try: return memoryview(inflate(mv, self.zdict))
+            except zlib.error as e: raise PackError(f"{self.pack_path}: bad deflate at {off}: {e}")
+            finally: mv.release()
+        return mv
+
+    def get(self, h, verify=False):
+        """memoryview of the object's bytes, or None. verify=True re-hashes it."""
+        e = self.find(h)
+        if e is None: return None
+        mv = self._read(*e)
+        if verify and hashlib.sha256(mv).digest() != digest_bytes(h):
+            raise PackError(f"{self.pack_path}: object {digest_bytes(h).hex()} fails its hash")
+        return mv
+
+    def objects(self):
+        """(digest32, memoryview) for every object, in digest order."""
+        for i in range(self.count):
+            d, off, ln, flags = self._entry(i)
+            yield d, self._read(off, ln, flags)
+
+    def digests(self):
+        for i in range(self.count): yield self._digest_at(i).hex()
+
+    def check(self):
+        """Re-hash every object; returns the hex digests that don't match."""
+        bad = []
+        for d, mv in self.objects():
+            try:
+                if hashlib.sha256(mv).digest() != d: bad.append(d.hex())
+            finally: mv.release()
+        return bad
+
+    def close(self):
+        v = getattr(self, "_view", None)
+        if v is not None: v.release(); self._view = None
+        for m in self._maps:
+            try: m.close()
+            except BufferError: pass   # a caller still holds a view; the map goes when it does
+        for f in self._files: f.close()
+        self._maps, self._files = [], []
+
+    def __enter__(self): return self
+    def __exit__(self, *a): self.close()
+
+# --- pack dirs: append-only packing and compaction ----------------------------
+LIST = "packs.json"
+BASE = {"pack": "agents.pack", "lut": "index.lut"}
+ACTIVE_MAX_BYTES = 256 << 20   # roll over to a new incremental pack past this
+
+try:
+    import fcntl
+except ImportError:   # no advisory locks (Windows); writers must not overlap there
+    fcntl = None
+
+@contextmanager
+def pack_lock(pack_dir):
+    """Serialise writers (append / compaction swap) on one pack dir. Readers never lock."""
+    with open(os.path.join(pack_dir, ".lock"), "a+b") as f:
+        if fcntl: fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try: yield
+        finally:
+            if fcntl: fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def load_list(pack_dir):
+    p = os.path.join(pack_dir, LIST)
+    if os.path.isfile(p):
+        with open(p, "r", encoding="utf-8") as f: return json.load(f)
+    have = os.path.isfile(os.path.join(pack_dir, BASE["pack"])) and os.path.isfile(os.path.join(pack_dir, BASE["lut"]))
+    return {"version": 1, "seq": 0, "active": None, "packs": [dict(BASE)] if have else []}
+
+def write_list(pack_dir, meta):
+    p = os.path.join(pack_dir, LIST); tmp = f"{p}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2); f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, p)
+
+def pack_paths(pack_dir, meta=None):
+    """[(pack_path, lut_path)] in search order (newest first)."""
+    meta = meta or load_list(pack_dir)
+    return [(os.path.join(pack_dir, e["pack"]), os.path.join(pack_dir, e["lut"])) for e in meta["packs"]]
+
+SAMPLE_OBJECTS = 2000
+
+def sample_dict(readers, reachable=None, n=SAMPLE_OBJECTS):
+    """Train a preset dict on an evenly spaced sample of the objects in readers."""
+    total = sum(r.count for r in readers)
+    step, sample = max(1, total // n), []
+    for r in readers:
+        for i in range(0, r.count, step):
+            d, off, ln, flags = r._entry(i)
+            if reachable is None or d.hex() in reachable: sample.append(bytes(r._read(off, ln, flags)))
+    return train_dict(sample)
+
+def append_objects(pack_dir, objects, max_bytes=ACTIVE_MAX_BYTES, compress=None):
+    """Append objects (iterable of (digest, bytes)) that no listed pack holds yet to the active
+    pack, then swap in its updated LUT. The pack only grows: a crash before the LUT rename
+    leaves unindexed tail bytes that compaction drops. Returns the number appended.
+    compress=None keeps doing what the newest pack does: a new incremental pack inherits
+    its preset dict, and objects are deflated whenever the pack has one."""
+    os.makedirs(pack_dir, exist_ok=True)
+    with pack_lock(pack_dir):
+        meta = load_list(pack_dir)
+        readers = [PackReader(p, l) for p, l in pack_paths(pack_dir, meta)]
+        try:
+            new, seen = [], set()
+            for h, data in objects:
+                d = digest_bytes(h)
+                if d in seen or any(d in r for r in readers): continue
+                seen.add(d); new.append((d, data))
+            if not new: return 0
+            act = meta.get("active")
+            pack = os.path.join(pack_dir, f"{act}.pack") if act else None
+            if not act or not os.path.isfile(pack) or os.path.getsize(pack) >= max_bytes:
+                meta["seq"] += 1
+                act = meta["active"] = f"incr-{meta['seq']:06d}"
+                pack = os.path.join(pack_dir, f"{act}.pack")
+                with open(pack, "wb") as f: f.write(PACK_MAGIC)
+                write_lut(os.path.join(pack_dir, f"{act}.lut"), [], readers[0].zdict if readers else b"")
+                meta["packs"].insert(0, {"pack": f"{act}.pack", "lut": f"{act}.lut"})
+                write_list(pack_dir, meta)
+                readers.insert(0, PackReader(pack, os.path.join(pack_dir, f"{act}.lut")))
+            lut = os.path.join(pack_dir, f"{act}.lut")
+            old = next(r for r in readers if r.pack_path == pack)
+            if compress is None: compress = bool(old.zdict)
+            entries = []
+            with open(pack, "ab") as f:
+                off = f.seek(0, os.SEEK_END)
+                for d, data in new:
+                    data, flags = _encode(data, old.zdict, compress)
+                    f.write(data); entries.append((d, off, len(data), flags)); off += len(data)
+                f.flush(); os.fsync(f.fileno())
+            write_lut(lut, old.lut_with(entries))
+            return len(new)
+        finally:
+            for r in readers: r.close()
+
+def compact(pack_dir, reachable=None, compress=None):
+    """Merge every listed pack into one new base pack, keeping the first copy of each object and,
+    if reachable (a set of hex digests) is given, only those. Appends may run meanwhile: the
+    active pack is sealed first, and packs created during the merge stay in front of the result.
+    compress=True retrains a preset dict on the merged objects and deflates them, False stores
+    them plain, None compresses if any merged pack had a dict."""
+    os.makedirs(pack_dir, exist_ok=True)
+    with pack_lock(pack_dir):
+        meta = load_list(pack_dir)
+        meta["active"] = None; meta["seq"] += 1
+        seq = meta["seq"]
+        if os.path.isfile(os.path.join(pack_dir, LIST)) or meta["packs"]: write_list(pack_dir, meta)
+        snap = [dict(e) for e in meta["packs"]]
+    name = f"base-{seq:06d}"
+    readers = [PackReader(p, l) for p, l in pack_paths(pack_dir, {"packs": snap})]
+    try:
+        if compress is None: compress = any(r.zdict for r in readers)
+        zdict = sample_dict(readers, reachable) if compress else None
+        def objs():
+            for r in readers:
+                for d, mv in r.objects():
+                    if reachable is not None and d.hex() not in reachable: continue
+                    yield d, mv
+        kept = write_pack(os.path.join(pack_dir, f"{name}.pack"), os.path.join(pack_dir, f"{name}.lut"), objs(), zdict)
+        total = sum(r.count for r in readers)
+    finally:
+        for r in readers: r.close()
+    with pack_lock(pack_dir):
+        meta = load_list(pack_dir)
+        newer = [e for e in meta["packs"] if e not in snap]
+        meta["packs"] = newer + [{"pack": f"{name}.pack", "lut": f"{name}.lut"}]
+        write_list(pack_dir, meta)
+        for e in snap:   # open readers keep their mappings; the files go once they close
+            for k in ("pack", "lut"):
+                try: os.remove(os.path.join(pack_dir, e[k]))
+                except FileNotFoundError: pass
+    return {"packs_merged": len(snap), "objects": total, "kept": kept, "pack": f"{name}.pack"}
+
+class CasReader:
+    """Object bytes by digest: the packs listed in pack_dir in order, then the loose CAS file.
+    get() returns a memoryview, zero-copy into the pack for stored objects, like PackReader.get:
+    it stays valid until released, and views into a pack must be released before close()."""
+    def __init__(self, pack_dir, cas_dir):
+        self.cas_dir = str(cas_dir)
+        self.packs = []
+        try:
+            for p, l in pack_paths(str(pack_dir)): self.packs.append(PackReader(p, l))
+        except Exception:
+            self.close(); raise
+
+    def get(self, h):
+        for pack in self.packs:
+            mv = pack.get(h, verify=True)
+            if mv is not None: return mv
+        p = os.path.join(self.cas_dir, f"{digest_bytes(h).hex()}.json")
+        if os.path.isfile(p):
+            with open(p, "rb") as f: return memoryview(f.read())
+        return None
+
+    def close(self):
+        for pack in self.packs: pack.close()
+        self.packs = []
+
+    def __enter__(self): return self
+    def __exit__(self, *a): self.close()
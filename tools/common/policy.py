@@ -1,6 +1,136 @@
-import fnmatch
+import fnmatch, os, re
+from functools import lru_cache
+
 def allowed(policy, sfrom, sto):
     for r in policy.get('allow', [{'from':'*','to':'*'}]):
         if fnmatch.fnmatch(sfrom, r.get('from','*')) and fnmatch.fnmatch(sto, r.get('to','*')):
             return True
     return False
+
+# --- compiled matcher -------------------------------------------------------
+# allowed() re-runs fnmatch over every rule for every route. For large policies
+# compile_policy() builds the rules once: each rule is bucketed by the literal
+# prefixes of its patterns, cut back to a '/' boundary (scheme / domain / class),
+# and each bucket becomes one alternation regex. A lookup probes only the
+# buckets whose prefix the subject starts with, and decisions are memoised.
+# Semantics are exactly those of fnmatch.fnmatch (first matching rule wins).
+
+SEP = '\x00'
+
+def _body(pat):
+    # fnmatch.translate gives '(?s:...)\Z'; drop the anchor so parts can be joined
+    return fnmatch.translate(os.path.normcase(pat))[:-2]
+
+def _prefix(pat):
+    i = 0
+    while i < len(pat) and pat[i] not in '*?[': i += 1
+    lit = pat[:i]
+    return lit if i == len(pat) else lit[:lit.rfind('/') + 1]
+
+class _Matcher:
+    """First-match index over glob rules; a rule is a tuple of patterns matched against a tuple of strings."""
+    def __init__(self, rules):
+        self.rules = rules
+        self.slow = []   # rules carrying the separator can't be joined; checked with fnmatch
+        tree = {}
+        for i, pats in enumerate(rules):
+            if any(SEP in p for p in pats): self.slow.append((i, pats)); continue
+            node = tree
+            for p in pats[:-1]:
+                node = node.setdefault(_prefix(os.path.normcase(p)), {})
+            node.setdefault(_prefix(os.path.normcase(pats[-1])), []).append(
+                '(?P<r%d>%s\\Z)' % (i, SEP.join(_body(p) for p in pats)))
+        self.tree = self._freeze(tree)
+
+    def _freeze(self, node):
+        # {prefix: child} -> (sorted prefix lengths, {prefix: child}); leaves become one regex
+        if isinstance(node, list): return re.compile('|'.join(node))
+        return sorted({len(k) for k in node}), {k: self._freeze(v) for k, v in node.items()}
+
+    def first(self, subj):
+        """Index of the first rule matching subj (a tuple of strings), or None."""
+        subj = tuple(os.path.normcase(s) for s in subj)
+        if any(SEP in s for s in subj):
+            return self._scan(subj, enumerate(self.rules))
+        best = self._scan(subj, self.slow)
+        hits = []
+        self._probe(self.tree, subj, 0, SEP.join(subj), hits)
+        return min(hits + ([] if best is None else [best]), default=None)
+
+    def _probe(self, node, subj, k, joined, hits):
+        lens, kids = node
+        s = subj[k]
+        for L in lens:
+            if L > len(s): break
+            kid = kids.get(s[:L])
+            if kid is None: continue
+            if k + 1 < len(subj): self._probe(kid, subj, k + 1, joined, hits)
+            else:
+                m = kid.match(joined)
+                if m: hits.append(int(m.lastgroup[1:]))
+
+    def _scan(self, subj, rules):
+        for i, pats in rules:
+            if all(fnmatch.fnmatchcase(s, os.path.normcase(p)) for s, p in zip(subj, pats)): return i
+        return None
+
+class Compiled:
+    """A policy compiled once for repeated allow / pin / qos / failover lookups.
+
+    default_allow is used when the policy has no 'allow' key (allow-all here,
+    none in tools/policy_match)."""
+    def __init__(self, policy, default_allow=({'from':'*','to':'*'},), cache=1 << 16):
+        self.policy = policy
+        allow = policy.get('allow', list(default_allow))
+        self._allow = _Matcher([(r.get('from','*'), r.get('to','*')) for r in allow])
+        self.pins = [(r, *parse_route(r.get('route',''))) for r in policy.get('pin', [])]
+        self._pin = _Matcher([(f, unversioned(t[0]) if t else '') for _, f, t in self.pins])
+        self.qos_rules = policy.get('qos', [])
+        self._qos = _Matcher([(r.get('match','*'),) for r in self.qos_rules])
+        self.failovers = [(r, *parse_route(r.get('route',''))) for r in policy.get('failover', [])]
+        self._fo = _Matcher([(f,) for _, f, _ in self.failovers])
+        self.allowed = lru_cache(maxsize=cache)(self._allowed)
+
+    def _allowed(self, sfrom, sto):
+        return self._allow.first((sfrom, sto)) is not None
+
+    def allow_rule(self, sfrom, sto):
+        """Index of the first allow rule admitting sfrom -> sto, or None."""
+        return self._allow.first((sfrom, sto))
+
+    def qos(self, saddr):
+        """First qos rule whose 'match' glob matches saddr, or None."""
+        i = self._qos.first((saddr,))
+        return None if i is None else self.qos_rules[i]
+
+    def pin(self, sfrom, sto):
+        """Pinned target saddr for sfrom -> sto (same address, any version), or None.
+        Pin sources are usually written without a version, so the bare address is tried too."""
+        for f in _forms(sfrom):
+            i = self._pin.first((f, unversioned(sto)))
+            if i is not None: return self.pins[i][2][0]
+        return None
+
+    def failover(self, sfrom):
+        """(ordered failover targets, rule) for routes out of sfrom, or ([], None)."""
+        for f in _forms(sfrom):
+            i = self._fo.first((f,))
+            if i is not None: return self.failovers[i][2], self.failovers[i][0]
+        return [], None
+
+def _forms(saddr):
+    u = unversioned(saddr)
+    return (saddr,) if u == saddr else (saddr, u)
+
+def unversioned(saddr):
+    return saddr.split('#', 1)[0].split('@', 1)[0]
+
+def parse_route(s):
+    """'FROM -> TO' or 'FROM -> [A, B]' -> (FROM, [TO...])."""
+    sf, _, rhs = s.partition('->')
+    rhs = rhs.strip()
+    if rhs.startswith('[') and rhs.endswith(']'): rhs = rhs[1:-1]
+    return sf.strip(), [t.strip() for t in rhs.split(',') if t.strip()]
+
+def compile_policy(policy, default_allow=({'from':'*','to':'*'},)):
+    return Compiled(policy, default_allow)
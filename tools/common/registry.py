@@ -0,0 +1,164 @@
+import json, os, sqlite3
+from contextlib import contextmanager
+# Registry index: id@version -> 'sha256:<hex>' for agents, skills and MCP tools,
+# plus the trusted signer list. It used to be .rtt/registry/index.json, loaded
+# whole and rewritten by every ingest (O(registry) per ingest, and concurrent
+# ingests lost each other's updates). It is now a stdlib sqlite3 database in WAL
+# mode: ingests upsert their batch in one BEGIN IMMEDIATE transaction and
+# readers look entries up through indexes. index.json stays the interchange
+# format: open_registry() migrates it once into an empty database, and
+# export_json() writes it back out for tools that still read it.
+
+SCHEMA_VERSION = 1
+KINDS = ("agents", "skills", "mcp_tools")
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    *(s for kind in KINDS for s in (
+        f"CREATE TABLE IF NOT EXISTS {kind} (key TEXT PRIMARY KEY, name TEXT NOT NULL, version TEXT, ref TEXT NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS {kind}_ref ON {kind} (ref)",
+        f"CREATE INDEX IF NOT EXISTS {kind}_name ON {kind} (name, version)")),
+    "CREATE TABLE IF NOT EXISTS signers (seq INTEGER PRIMARY KEY AUTOINCREMENT, signer TEXT NOT NULL UNIQUE)",
+]
+
+def default_db(index_json):
+    # .rtt/registry/index.json -> .rtt/registry/index.db
+    return os.path.splitext(str(index_json))[0] + ".db"
+
+def split_key(key):
+    """'id@1.0.0' -> ('id', '1.0.0'); keys without a version (skills) -> (key, None)."""
+    name, at, ver = key.rpartition('@')
+    return (name, ver) if at else (key, None)
+
+def _ref(h):
+    return h if h.startswith("sha256:") else f"sha256:{h}"
+
+def _kind(kind):
+    if kind not in KINDS: raise ValueError(f"unknown registry kind {kind!r}")
+    return kind
+
+class Registry:
+    """sqlite3 registry index. Writes go through transaction(); reads need no lock.
+    threads=True lets several threads share the connection (callers serialise use)."""
+    def __init__(self, path, timeout=30.0, threads=False):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE so a
+        # writer takes the write lock up front instead of failing on upgrade mid-batch
+        self.db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=not threads)
+        # journal mode and schema persist in the file: only a new database (or an old
+        # one not yet in WAL mode) takes the write lock here, so plain opens never wait
+        if self.db.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        v = self._schema()
+        if v is None:
+            with self.transaction() as c:
+                for s in _SCHEMA: c.execute(s)
+                c.execute("INSERT OR IGNORE INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+            v = self._schema()
+        if int(v) != SCHEMA_VERSION:
+            self.close(); raise RuntimeError(f"{self.path}: registry schema {v}, expected {SCHEMA_VERSION}")
+
+    def _schema(self):
+        try: return self.meta("schema")
+        except sqlite3.OperationalError: return None   # no meta table yet
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.db
+        except BaseException:
+            self.db.execute("ROLLBACK"); raise
+        self.db.execute("COMMIT")
+
+    def meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    # --- writes ----------------------------------------------------------------
+    def upsert(self, kind, items, c=None):
+        """items: iterable of (key, 'sha256:<hex>' or bare hex), written as one batch."""
+        rows = [(k, *split_key(k), _ref(h)) for k, h in items]
+        sql = f"INSERT OR REPLACE INTO {_kind(kind)} (key, name, version, ref) VALUES (?, ?, ?, ?)"
+        if c is not None: c.executemany(sql, rows)
+        else:
+            with self.transaction() as c: c.executemany(sql, rows)
+        return len(rows)
+
+    def add_signers(self, signers, c=None):
+        rows = [(s,) for s in signers]
+        if c is not None: c.executemany("INSERT OR IGNORE INTO signers (signer) VALUES (?)", rows)
+        else:
+            with self.transaction() as c: c.executemany("INSERT OR IGNORE INTO signers (signer) VALUES (?)", rows)
+
+    # --- reads -----------------------------------------------------------------
+    def get(self, kind, key):
+        """'sha256:<hex>' for key ('id@version', or a skill id), or None."""
+        row = self.db.execute(f"SELECT ref FROM {_kind(kind)} WHERE key=?", (key,)).fetchone()
+        return row and row[0]
+
+    def by_hash(self, h):
+        """[(kind, key)] of every entry pointing at object h."""
+        ref = _ref(h)
+        return [(kind, k) for kind in KINDS
+                for (k,) in self.db.execute(f"SELECT key FROM {kind} WHERE ref=?", (ref,))]
+
+    def items(self, kind):
+        return self.db.execute(f"SELECT key, ref FROM {_kind(kind)} ORDER BY key").fetchall()
+
+    def signers(self):
+        return [s for (s,) in self.db.execute("SELECT signer FROM signers ORDER BY seq")]
+
+    def counts(self):
+        out = {kind: self.db.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0] for kind in KINDS}
+        out["signers"] = self.db.execute("SELECT COUNT(*) FROM signers").fetchone()[0]
+        return out
+
+    # --- index.json compatibility ------------------------------------------------
+    def import_index(self, index, c=None):
+        """Upsert every entry of an index.json document."""
+        def load(c):
+            for kind in KINDS:
+                self.upsert(kind, (index.get(kind) or {}).items(), c)
+            self.add_signers(index.get("signers") or [], c)
+        if c is not None: load(c)
+        else:
+            with self.transaction() as c: load(c)
+
+    def to_index(self):
+        """The registry as an index.json document (kinds with no entries are left out, as before)."""
+        out = {kind: dict(self.items(kind)) for kind in KINDS}
+        out = {k: v for k, v in out.items() if v}
+        out["signers"] = self.signers()
+        return out
+
+    def export_json(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f: f.write(json.dumps(self.to_index(), indent=2))
+        os.replace(tmp, path)
+
+    def migrate(self, index_json):
+        """One-shot import of index_json; a no-op once the database has been migrated."""
+        if self.meta("migrated_from") is not None: return False   # the common case, without the write lock
+        with self.transaction() as c:
+            if self.meta("migrated_from") is not None: return False
+            if os.path.isfile(index_json):
+                with open(index_json, 'r', encoding='utf-8') as f: self.import_index(json.load(f), c)
+            c.execute("INSERT INTO meta VALUES ('migrated_from', ?)", (os.path.abspath(index_json),))
+        return True
+
+def open_registry(index_json, db=None, **kw):
+    """Registry next to index_json, seeded from it the first time."""
+    reg = Registry(db or default_db(index_json), **kw)
+    try: reg.migrate(index_json)
+    except Exception:
+        reg.close(); raise
+    return reg
@@ -1,17 +1,81 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+@lru_cache(maxsize=1 << 16)
 def parse(ver:str):
     parts = ver.split('.')
     while len(parts)<3: parts.append('0')
     return tuple(int(p) for p in parts[:3])
 def cmp(a,b): return (a>b) - (a<b)
+
+# A version set is a conjunction of bounds, i.e. one interval [lo, hi]; bounds
+# are folded into it once at parse time instead of re-tokenised per check.
+LOWEST = (-1, -1, -1)
+HIGHEST = (float('inf'),) * 3
+
+class VersionSet:
+    """Parsed version_set expression ('>=1.0 <2.0', '==1.2.3', '1.2.3', ...)."""
+    __slots__ = ('expr', 'lo', 'lo_incl', 'hi', 'hi_incl')
+    def __init__(self, expr:str):
+        self.expr = expr
+        self.lo, self.lo_incl, self.hi, self.hi_incl = LOWEST, True, HIGHEST, True
+        for tok in expr.replace(',', ' ').split():
+            if tok.startswith('>='): self._lower(parse(tok[2:]), True)
+            elif tok.startswith('>'): self._lower(parse(tok[1:]), False)
+            elif tok.startswith('<='): self._upper(parse(tok[2:]), True)
+            elif tok.startswith('<'): self._upper(parse(tok[1:]), False)
+            elif tok.startswith('=='): v = parse(tok[2:]); self._lower(v, True); self._upper(v, True)
+            elif tok[0].isdigit(): v = parse(tok); self._lower(v, True); self._upper(v, True)
+
+    def _lower(self, v, incl):
+        if v > self.lo or (v == self.lo and not incl): self.lo, self.lo_incl = v, incl
+    def _upper(self, v, incl):
+        if v < self.hi or (v == self.hi and not incl): self.hi, self.hi_incl = v, incl
+
+    def allows(self, v) -> bool:
+        """v is a parsed version tuple."""
+        if v < self.lo or (v == self.lo and not self.lo_incl): return False
+        if v > self.hi or (v == self.hi and not self.hi_incl): return False
+        return True
+
+    def best(self, versions):
+        """Index of the highest entry of an ascending list of version tuples inside the set, or None."""
+        i = (bisect_right if self.hi_incl else bisect_left)(versions, self.hi) - 1
+        return i if i >= 0 and self.allows(versions[i]) else None
+
+    def __repr__(self): return f"VersionSet({self.expr!r})"
+
+@lru_cache(maxsize=1 << 14)
+def version_set(expr:str) -> VersionSet:
+    """Interned VersionSet for expr."""
+    return VersionSet(expr)
+
 def check_set(version:str, expr:str)->bool:
-    v = parse(version)
-    toks = expr.replace(',', ' ').split()
-    for tok in toks:
-        if not tok: continue
-        if tok.startswith('>=') and not (cmp(v, parse(tok[2:]))>=0): return False
-        if tok.startswith('>')  and not (cmp(v, parse(tok[1:]))>0):  return False
-        if tok.startswith('<=') and not (cmp(v, parse(tok[2:]))<=0): return False
-        if tok.startswith('<')  and not (cmp(v, parse(tok[1:]))<0):  return False
-        if tok.startswith('==') and not (cmp(v, parse(tok[2:]))==0): return False
-        if tok[0].isdigit() and not (cmp(v, parse(tok))==0): return False
-    return True
+    return version_set(expr).allows(parse(version))
+
+def split_saddr(saddr:str):
+    """rtt://d/c/name@1.2.3#frag -> ('rtt://d/c/name#frag', '1.2.3' or None)."""
+    if '@' not in saddr: return saddr, None
+    base, rest = saddr.split('@', 1)
+    ver, _, frag = rest.partition('#')
+    return (base + '#' + frag if frag else base), ver
+
+class VersionIndex:
+    """Per-base-saddr sorted versions; best(base, expr) is a bisect, not a scan."""
+    def __init__(self, saddrs=()):
+        self.by_base = {}
+        for s in saddrs: self.add(s)
+
+    def add(self, saddr:str):
+        base, ver = split_saddr(saddr)
+        try: v = parse(ver or '1.0.0')
+        except ValueError: return   # non-numeric versions can't be ordered; leave them out
+        vers, addrs = self.by_base.setdefault(base, ([], []))
+        i = bisect_right(vers, v)
+        vers.insert(i, v); addrs.insert(i, saddr)
+
+    def best(self, saddr:str, expr:str='>=0.0.0'):
+        """Highest indexed saddr with the same base as saddr whose version meets expr, or None."""
+        vers, addrs = self.by_base.get(split_saddr(saddr)[0], ((), ()))
+        i = version_set(expr).best(vers) if vers else None
+        return None if i is None else addrs[i]
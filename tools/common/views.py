@@ -0,0 +1,184 @@
+import json, os, time, threading, hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from .util import canon
+from .pack import CasReader
+from .registry import open_registry
+from .overlay import OverlayEngine
+# Provider views: overlay selection and merging, the realization key, and a
+# lazy resolver. view_materialize.py writes every realized document of a view
+# to disk; ViewResolver realizes provider/id@ver on demand (registry -> pack or
+# loose CAS -> overlays) into a bounded LRU, revalidated on every read against
+# the registry's data_version and the overlay files' stat fingerprints.
+
+def _fp(p):
+    try:
+        st = os.stat(p); return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        return None
+
+class Overlays:
+    """Overlay files read, hashed and parsed at most once. preload() reads the whole
+    overlays tree up front, so pool workers inherit every parse (and need no exists()
+    stats). With revalidate=True every lookup re-stats the file and re-reads it when its
+    fingerprint changed, for long-lived readers like ViewResolver."""
+    def __init__(self, root, revalidate=False):
+        self.root = str(root)
+        self.revalidate = revalidate
+        self.files = {}   # path -> [fingerprint, sha256, bytes or the parsed document]
+        self.complete = False
+        self.engine = OverlayEngine()
+
+    def preload(self):
+        if os.path.isdir(self.root):
+            for d, _, names in sorted(os.walk(self.root)):
+                for n in sorted(names):
+                    if n.endswith(".json"): self.doc(os.path.join(d, n))
+        self.complete = True
+        return self
+
+    def _entry(self, p):
+        p = str(p)
+        ent = self.files.get(p)
+        if ent is not None and not self.revalidate: return ent
+        fp = _fp(p) if self.revalidate or ent is None else ent[0]
+        if fp is None:
+            self.files.pop(p, None); return None
+        if ent is None or ent[0] != fp:
+            with open(p, 'rb') as f: b = f.read()
+            ent = self.files[p] = [fp, hashlib.sha256(b).hexdigest(), b]
+        return ent
+
+    def exists(self, p):
+        if self.complete and not self.revalidate: return str(p) in self.files
+        return self._entry(p) is not None
+    def sha(self, p): return self._entry(p)[1]
+    def doc(self, p):
+        ent = self._entry(p)
+        if isinstance(ent[2], bytes): ent[2] = json.loads(ent[2])
+        return ent[2]
+    def layers(self, files):
+        """[(sha256, parsed patch)] for OverlayEngine; a file's plan is compiled once per content."""
+        return [(self.sha(p), self.doc(p)) for p in files]
+
+@lru_cache(maxsize=1 << 16)
+def _candidates(root, provider, env, id_):
+    # provider-specific patch for the exact id, then env global, then env id-specific
+    return (os.path.join(root, "provider", provider, f"{id_}.patch.json"),
+            os.path.join(root, "env", env, "_global.patch.json"),
+            os.path.join(root, "env", env, f"{id_}.patch.json"))
+
+def overlay_candidates(ov, provider, env, idver):
+    """Every overlay path that would apply to idver, whether it exists or not."""
+    return _candidates(ov.root, provider, env, idver.split("@",1)[0])
+
+def overlay_files(ov, provider, env, idver):
+    return [p for p in overlay_candidates(ov, provider, env, idver) if ov.exists(p)]
+
+def apply_overlays(base_obj, files, ov, h=None):
+    """deep_merge of each file in order, via the engine's composed plan (and its result
+    cache when h, the base object's digest, is given). Treat the result as read-only."""
+    return ov.engine.merge(h, base_obj, ov.layers(files))
+
+@lru_cache(maxsize=1 << 16)
+def _rel(p, root): return os.path.relpath(p, root)
+
+def realization_key(h, files, provider, env, ov, root):
+    """Digest of everything a realized file depends on: the CAS object, the ordered
+    overlay files (by content), provider and env. Equal keys mean equal output."""
+    parts = [h, [(_rel(p, root), ov.sha(p)) for p in files], provider, env]
+    return hashlib.sha256(canon(parts)).hexdigest()
+
+def realize(raw, files, ov, h=None):
+    """Realized document bytes, exactly as view_materialize writes them. raw: object bytes
+    or a memoryview (decoded in place)."""
+    return json.dumps(apply_overlays(json.loads(str(raw, 'utf-8')), files, ov, h), indent=2).encode('utf-8')
+
+class ViewResolver:
+    """Realized agent documents of provider views, on demand.
+
+    get(provider, idver) -> bytes or None (not in the provider's view, or not in the
+    registry). Hits cost a memoized registry lookup and up to three overlay stats; an
+    LRU of at most `capacity` documents / `max_bytes` holds the realized bytes. View
+    files are re-checked at most every `views_check_s`; overlays and the registry on
+    every read."""
+    def __init__(self, root, env="prod", capacity=4096, max_bytes=64 << 20, views_check_s=1.0):
+        self.root = str(root)
+        rdir = os.path.join(self.root, ".rtt", "registry")
+        self.env, self.capacity, self.max_bytes = env, capacity, max_bytes
+        self.reg = open_registry(os.path.join(rdir, "index.json"), threads=True)
+        self.cas = CasReader(os.path.join(rdir, "pack"), os.path.join(rdir, "cas", "sha256"))
+        self.ov = Overlays(os.path.join(self.root, "overlays"), revalidate=True)
+        self.lock = threading.RLock()
+        self.lru = OrderedDict()   # (provider, idver) -> ((digest, overlay shas, overlay paths), bytes)
+        self.nbytes = 0
+        self.refs, self.data_version = {}, None
+        self.views, self.views_fp, self.views_at, self.views_check_s = {}, None, 0.0, views_check_s
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidated": 0}
+        self._views()
+
+    def close(self):
+        self.cas.close(); self.reg.close()
+    def __enter__(self): return self
+    def __exit__(self, *a): self.close()
+
+    def _views(self):
+        # provider -> set of id@ver, reloaded when the views dir or a view file changes
+        now = time.monotonic()
+        if now - self.views_at < self.views_check_s: return self.views
+        self.views_at = now
+        vdir = os.path.join(self.root, "views")
+        names = sorted(n for n in os.listdir(vdir) if n.endswith(".view.json")) if os.path.isdir(vdir) else []
+        fp = tuple((n, _fp(os.path.join(vdir, n))) for n in names)
+        if fp != self.views_fp:
+            views = {}
+            for n in names:
+                with open(os.path.join(vdir, n), 'r', encoding='utf-8') as f: v = json.load(f)
+                views.setdefault(v["provider"], set()).update(e["id"] for e in v.get("entries", []))
+            self.views, self.views_fp = views, fp
+        return self.views
+
+    def _ref(self, idver):
+        # any commit to index.db (from any process) bumps data_version and drops the memo
+        dv = self.reg.db.execute("PRAGMA data_version").fetchone()[0]
+        if dv != self.data_version: self.refs, self.data_version = {}, dv
+        ref = self.refs.get(idver, False)
+        if ref is False: ref = self.refs[idver] = self.reg.get("agents", idver)
+        return ref
+
+    def entries(self, provider):
+        with self.lock: return sorted(self._views().get(provider, ()))
+
+    def get(self, provider, idver):
+        with self.lock:
+            if idver not in self._views().get(provider, ()): return None
+            ref = self._ref(idver)
+            if not ref: return None
+            h = ref.split(':', 1)[1]
+            files = overlay_files(self.ov, provider, self.env, idver)
+            # the same inputs realization_key digests, compared as a tuple (provider and
+            # env are fixed per slot); no hashing on the hit path
+            key = (h, tuple(self.ov.sha(p) for p in files), tuple(files))
+            k = (provider, idver)
+            ent = self.lru.get(k)
+            if ent is not None:
+                if ent[0] == key:
+                    self.lru.move_to_end(k); self.stats["hits"] += 1
+                    return ent[1]
+                self._drop(k); self.stats["invalidated"] += 1
+            self.stats["misses"] += 1
+            raw = self.cas.get(h)
+            if raw is None: raise FileNotFoundError(f"object missing from pack and CAS: {h}")
+            try: doc = realize(raw, files, self.ov)
+            finally: raw.release()
+            self.lru[k] = (key, doc); self.nbytes += len(doc)
+            while self.lru and (len(self.lru) > self.capacity or self.nbytes > self.max_bytes):
+                self._drop(next(iter(self.lru))); self.stats["evictions"] += 1
+            return doc
+
+    def _drop(self, k):
+        self.nbytes -= len(self.lru.pop(k)[1])
+
+    def info(self):
+        with self.lock:
+            return dict(self.stats, cached=len(self.lru), cached_bytes=self.nbytes, providers=sorted(self._views()))
@@ -5,31 +5,45 @@ from .solver_ilp import solve_ilp
 from ..common.io import load_json
 from ..common.crypto_ed25519 import sign
 from ..common.util import canon
+from ..common import merkle
 
 ROOT = Path(__file__).resolve().parents[2]
 
 def main():
-    if len(sys.argv) < 8:
-        print("usage: plan_build_ilp.py <.rtt/routes.json> <.rtt/manifests> <key_id> <.rtt/policy.json> <.rtt/topology.json> <prefer_list> <admit_priority> [plans/last_applied.json]")
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opts = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "1") for a in sys.argv[1:] if a.startswith("--"))
+    if len(args) < 7:
+        print("usage: plan_build_ilp.py <.rtt/routes.json> <.rtt/manifests> <key_id> <.rtt/policy.json> <.rtt/topology.json> <prefer_list> <admit_priority> [plans/last_applied.json] [--decompose] [--workers=N] [--time-limit=S] [--gap=REL] [--no-warm-start] [--incremental] [--hops=N] [--merkle]")
         sys.exit(2)
-    routes_f, mani_dir, key_id, policy_f, topo_f, prefer, admit = sys.argv[1:8]
-    last = sys.argv[8] if len(sys.argv)>8 else None
+    routes_f, mani_dir, key_id, policy_f, topo_f, prefer, admit = args[:7]
+    last = args[7] if len(args)>7 else None
     prefer_list = [p.strip() for p in prefer.split(',') if p.strip()]
-    res = solve_ilp(routes_f, mani_dir, key_id, policy_f, topo_f, prefer_list, float(admit), last_plan_file=last)
+    workers = int(opts["workers"]) if "workers" in opts else None
+    time_limit = float(opts["time-limit"]) if "time-limit" in opts else None
+    gap_rel = float(opts["gap"]) if "gap" in opts else None
+    res = solve_ilp(routes_f, mani_dir, key_id, policy_f, topo_f, prefer_list, float(admit), last_plan_file=last,
+                    decompose="decompose" in opts, workers=workers, time_limit=time_limit, gap_rel=gap_rel,
+                    warm="no-warm-start" not in opts, incremental="incremental" in opts, hops=int(opts.get("hops", 1)))
     if not res.get("ok"):
         print(json.dumps(res, indent=2)); sys.exit(1)
-    plan = {"plan_id":"sha256-PLACEHOLDER","routes_add": res["routes_add"], "routes_del": [], "order":[f"A{i}" for i in range(1, len(res['routes_add'])+1)], "placement": res["placement"]}
-    payload = canon(plan); pid = "sha256-" + hashlib.sha256(payload).hexdigest()
-    plan["plan_id"] = pid
+    plan = {"plan_id":"sha256-PLACEHOLDER","routes_add": res["routes_add"], "routes_del": [], "order":[f"A{i}" for i in range(1, len(res['routes_add'])+1)], "placement": res["placement"], "inputs": res["inputs"]}
     priv = (ROOT / ".rtt" / "registry" / "keys" / "private" / f"{key_id}.priv").read_text().strip()
-    sig = sign(priv, payload)
-    plan["sign"] = {"alg":"ed25519","key_id": key_id, "sig": sig}
+    (ROOT / "plans").mkdir(parents=True, exist_ok=True)
+    if "merkle" in opts:
+        tree = merkle.sign_plan(plan, key_id, lambda m: sign(priv, m), prev=merkle.previous(ROOT / "plans"))
+        pid = plan["plan_id"]
+        tree.save(merkle.leaves_path(ROOT / "plans", pid))
+    else:
+        payload = canon(plan); pid = "sha256-" + hashlib.sha256(payload).hexdigest()
+        plan["plan_id"] = pid
+        sig = sign(priv, payload)
+        plan["sign"] = {"alg":"ed25519","key_id": key_id, "sig": sig}
     out = ROOT / "plans" / (pid + ".json")
-    out.parent.mkdir(parents=True, exist_ok=True)
     out.write_text(json.dumps(plan, indent=2))
     (ROOT / "plans" / "latest.json").write_text(json.dumps(plan, indent=2))
     # summary
-    summary = {"admitted": len(res['routes_add']), "rejected": res['rejects']}
+    summary = {"admitted": len(res['routes_add']), "rejected": res['rejects'], "solve": res.get("solve"), "incremental": res.get("incremental")}
+    if "merkle" in opts: summary["merkle"] = {"leaves": len(tree.hashes), "rehashed": tree.rehashed}
     (ROOT / "plans" / "analysis.json").write_text(json.dumps(summary, indent=2))
     print(json.dumps(summary, indent=2))
     print(f"[OK] wrote {out}")
@@ -1,9 +1,11 @@
-import json, os
+import json, os, time, tempfile
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple
 from ..common.io import load_manifests, load_json
-from ..common.semver import check_set
-from ..common.policy import allowed
-from ..common.util import version_of_saddr, canon
+from ..common.semver import check_set, VersionIndex
+from ..common.policy import compile_policy
+from ..common.util import version_of_saddr
+from ..common.canonjson import Canonicalizer, digest
 
 LANE_BASE_MS = {'shm':0.2, 'uds':0.6, 'tcp':1.5}
 NUMA_PENALTY_MS = 0.4
@@ -16,144 +18,185 @@ def feasible_lanes(sym_f, sym_t, same_node):
     lanes += ['uds','tcp']
     return lanes
 
-def solve_ilp(routes_file, manifests_dir, key_id, policy_file, topo_file, prefer_list, admit_priority=1000.0, churn_weight=1.0, change_threshold_ms=0.15, last_plan_file=None):
-    try:
-        import pulp
-    except Exception as e:
-        raise RuntimeError("PuLP not installed. Install with: pip install pulp") from e
+# QoS and demand
+def qos(sym): return sym.get('qos', {"latency_budget_ms": 2000, "throughput_qps": 1})
+def demand(sym):
+    q = qos(sym)
+    thr = q.get('throughput_qps', 1)
+    cpuw = sym.get('tags', {}).get('cpu_weight', 1.0)
+    mem = sym.get('tags', {}).get('mem_mb', 16)
+    return {'cpu': max(0.1, cpuw * (thr/10.0)), 'mem': mem}
+def capacity(topo, node):
+    n = topo.get('nodes', {}).get(node, {})
+    cap = n.get('capacity', {})
+    return {'cpu': cap.get('cpu', 64.0), 'mem': cap.get('mem_mb', 65536)}
 
-    routes = load_json(routes_file)
-    manis = load_manifests(manifests_dir)
-    policy = load_json(policy_file) if os.path.isfile(policy_file) else {"allow":[{"from":"*","to":"*"}]}
-    topo = load_json(topo_file) if os.path.isfile(topo_file) else {"nodes":{"0":{"name":"n0"}}, "place":{}}
-    last = load_json(last_plan_file) if last_plan_file and os.path.isfile(last_plan_file) else {}
-    prev_place = last.get("placement", {})
-    prev_lanes = {(r.get("from"), r.get("to")): r.get("lane") for r in last.get("routes_add", []) if r.get("from") and r.get("to") and r.get("lane")}
+def components(R):
+    # connected components of the route graph; routes keep their order inside each component
+    parent = {}
+    def find(s):
+        while parent[s] != s:
+            parent[s] = parent[parent[s]]; s = parent[s]
+        return s
+    for sf,st in R:
+        parent.setdefault(sf, sf); parent.setdefault(st, st)
+        rf, rt = find(sf), find(st)
+        if rf != rt: parent[rf] = rt
+    groups = {}
+    for r in R:
+        groups.setdefault(find(r[0]), []).append(r)
+    return list(groups.values())
 
-    # candidates
-    R = []
-    for r in routes.get('routes', []):
-        sf, st = r['from'], r['to']
-        if sf not in manis or st not in manis: continue
-        if not allowed(policy, sf, st): continue
-        # semver meet
-        vf = version_of_saddr(sf); vt = version_of_saddr(st)
-        if not check_set(vf, manis[st].get('version_set','>=0.0.0')): continue
-        if not check_set(vt, manis[sf].get('version_set','>=0.0.0')): continue
-        R.append((sf,st))
-    S = sorted({s for r in R for s in r})
-    N = list(topo.get('nodes', {}).keys()) or ['0']
+def route_budget(manis, sf, st):
+    qf = qos(manis[sf]); qt = qos(manis[st])
+    return min(qf.get('latency_budget_ms', 1e9), qt.get('latency_budget_ms', 1e9))
+
+def cbc_stats(log_path):
+    # CBC only prints the bound and gap when it stops before proving optimality
+    out = {}
+    with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+        for ln in f:
+            if ln.startswith("Result - "): out["result"] = ln[9:].strip()
+            k, _, v = ln.partition(':')
+            k = {"Objective value": "objective", "Lower bound": "bound"}.get(k.strip())
+            if k:
+                try: out[k] = float(v.split()[0])
+                except (ValueError, IndexError): pass
+    return out
 
-    # QoS and demand
-    def qos(sym): return sym.get('qos', {"latency_budget_ms": 2000, "throughput_qps": 1})
-    def demand(sym):
-        q = qos(sym)
-        thr = q.get('throughput_qps', 1)
-        cpuw = sym.get('tags', {}).get('cpu_weight', 1.0)
-        mem = sym.get('tags', {}).get('mem_mb', 16)
-        return {'cpu': max(0.1, cpuw * (thr/10.0)), 'mem': mem}
-    def capacity(node):
-        n = topo.get('nodes', {}).get(node, {})
-        cap = n.get('capacity', {})
-        return {'cpu': cap.get('cpu', 64.0), 'mem': cap.get('mem_mb', 65536)}
-    place_hint = topo.get('place', {})
+def solve_status(m, result):
+    # pulp reports "Optimal" whenever CBC returns an incumbent, also when CBC stopped on its time limit;
+    # the solution status and CBC's own result line tell a proven optimum from an early stop
+    import pulp
+    status = pulp.LpStatus[m.status]
+    if status != "Optimal": return status
+    result = (result or "").lower()
+    if "time limit" in result: return "TimeLimit"
+    if m.sol_status != pulp.LpSolutionOptimal or (result and not result.startswith("optimal")): return "Feasible"
+    return "Optimal"
+
+def build_model(R, N, manis, caps, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, pinned=None):
+    import pulp
+    # Prune up front: only lanes both endpoints support and whose base latency fits the QoS budget get variables
+    lanes = {}; budget = {}
+    for r in R:
+        if r in lanes: continue
+        sf, st = r; b = route_budget(manis, sf, st)
+        ls = [l for l in feasible_lanes(manis[sf], manis[st], True) if LANE_BASE_MS[l] <= b]
+        if ls: lanes[r] = ls; budget[r] = b
+    K = list(lanes)
+    S = sorted({s for r in K for s in r})
+    inc = {s: [] for s in S}
+    for r in K:
+        for s in set(r): inc[s].append(r)
+    dem = {s: demand(manis[s]) for s in S}
 
     # Model
     m = pulp.LpProblem("rtt_exact_admission", pulp.LpMinimize)
 
     # Variables
     x = pulp.LpVariable.dicts('x', ((s,n) for s in S for n in N), lowBound=0, upBound=1, cat='Binary')  # place
-    a = pulp.LpVariable.dicts('a', (r for r in R), lowBound=0, upBound=1, cat='Binary')  # admit route
-    y = pulp.LpVariable.dicts('y', ((sf,st,l) for sf,st in R for l in ['shm','uds','tcp']), lowBound=0, upBound=1, cat='Binary')  # lane
-    d = pulp.LpVariable.dicts('d', (r for r in R), lowBound=0, upBound=1, cat='Binary')  # cross-node delta
-    mv = pulp.LpVariable.dicts('mv', (s for s in S), lowBound=0, upBound=1, cat='Binary')  # move indicator
-    lc = pulp.LpVariable.dicts('lc', (r for r in R), lowBound=0, upBound=1, cat='Binary')  # lane change
+    a = pulp.LpVariable.dicts('a', (r for r in K), lowBound=0, upBound=1, cat='Binary')  # admit route
+    y = pulp.LpVariable.dicts('y', ((sf,st,l) for sf,st in K for l in lanes[(sf,st)]), lowBound=0, upBound=1, cat='Binary')  # lane
+    d = pulp.LpVariable.dicts('d', (r for r in K), lowBound=0, upBound=1, cat='Binary')  # cross-node delta
+    moved = [s for s in S if prev_place.get(s) in N]
+    mv = pulp.LpVariable.dicts('mv', (s for s in moved), lowBound=0, upBound=1, cat='Binary')  # move indicator
+    relane = [r for r in K if prev_lanes.get(r) in lanes[r]]
+    lc = pulp.LpVariable.dicts('lc', (r for r in relane), lowBound=0, upBound=1, cat='Binary')  # lane change
 
     # Link a and y
-    for sf,st in R:
-        m += pulp.lpSum([y[(sf,st,l)] for l in ['shm','uds','tcp']]) == a[(sf,st)]
+    for r in K:
+        m += pulp.lpSum([y[r + (l,)] for l in lanes[r]]) == a[r]
 
-    # Lane feasibility: shm implies co-placement
-    for sf,st in R:
-        # y_shm ≤ x_sf,n and y_shm ≤ x_st,n for the same n aggregated via classic trick:
-        # enforce equality of placement when y_shm=1: for all n: x_sf,n - x_st,n ≤ 1 - y_shm and x_st,n - x_sf,n ≤ 1 - y_shm
-        yshm = y[(sf,st,'shm')]
-        for n in N:
-            m += x[(sf,n)] - x[(st,n)] <= 1 - yshm
-            m += x[(st,n)] - x[(sf,n)] <= 1 - yshm
-
-    # One node per active symbol; activate symbol if any incident route admitted
+    # One node per active symbol; a symbol is placed if any incident route is admitted
     for s in S:
-        incident = [a[r] for r in R if s in r]
-        if incident:
-            m += pulp.lpSum([x[(s,n)] for n in N]) >= pulp.lpSum(incident) * 0.0001  # if any admitted, sum x ≥ tiny
-            m += pulp.lpSum([x[(s,n)] for n in N]) <= 1
+        xs = pulp.lpSum([x[(s,n)] for n in N])
+        m += xs <= 1
+        m += pulp.lpSum([a[r] for r in inc[s]]) <= len(inc[s]) * xs
 
-    # Cross-node delta d[r] ≥ |x_f - x_t| in 0/1 form
-    for sf,st in R:
+    # Cross-node delta: admitted routes have both endpoints placed, so d >= x_f,n - x_t,n over n already forces d=1
+    # when split; the -(1 - a) term leaves d free (hence 0) for a rejected route, whichever endpoint is placed
+    for r in K:
+        sf, st = r
         for n in N:
-            m += d[(sf,st)] >= x[(sf,n)] - x[(st,n)]
-            m += d[(sf,st)] >= x[(st,n)] - x[(sf,n)]
+            m += d[r] >= a[r] + x[(sf,n)] - x[(st,n)] - 1
+        # shm, and any lane that only meets the QoS budget without the NUMA penalty, needs co-placement
+        for l in lanes[r]:
+            if l == 'shm' or LANE_BASE_MS[l] + NUMA_PENALTY_MS > budget[r]:
+                m += y[r + (l,)] + d[r] <= 1
 
-    # QoS latency budget: forbid lane choices that exceed budget
-    for sf,st in R:
-        qf = qos(manis[sf]); qt = qos(manis[st])
-        budget = min(qf.get('latency_budget_ms', 1e9), qt.get('latency_budget_ms', 1e9))
-        for l, base in LANE_BASE_MS.items():
-            # worst-case cross penalty = NUMA_PENALTY_MS * d
-            # require: base + NUMA_PENALTY_MS * d ≤ budget when y_l = 1. Use big-M: base + NUMA*d ≤ budget + M*(1 - y_l)
-            M = 1e6
-            m += base + NUMA_PENALTY_MS * d[(sf,st)] <= budget + M*(1 - y[(sf,st,l)])
+    # Symbols held at a fixed node (incremental re-planning boundary)
+    for s, n in (pinned or {}).items():
+        if s in inc and n in N: m += x[(s,n)] == 1
 
     # Capacity per node
     for n in N:
-        cpu = pulp.lpSum([ (demand(manis[s])['cpu']) * x[(s,n)] for s in S ])
-        mem = pulp.lpSum([ (demand(manis[s])['mem']) * x[(s,n)] ])
-        cap = capacity(n)
-        m += cpu <= cap['cpu']
-        m += mem <= cap['mem']
+        m += pulp.lpSum([dem[s]['cpu'] * x[(s,n)] for s in S]) <= caps[n]['cpu']
+        m += pulp.lpSum([dem[s]['mem'] * x[(s,n)] for s in S]) <= caps[n]['mem']
 
     # Movement indicator against previous placement
-    for s in S:
-        prev = prev_place.get(s)
-        if prev and prev in N:
-            # mv ≥ 1 - x[s,prev]
-            m += mv[s] >= 1 - x[(s,prev)]
-        else:
-            # no penalty baseline
-            m += mv[s] >= 0
-
-    # Lane change indicator
-    for sf,st in R:
-        prev = prev_lanes.get((sf,st))
-        if prev:
-            # if admitted and choose lane ≠ prev, penalize
-            m += lc[(sf,st)] >= a[(sf,st)] - y[(sf,st,prev)]
-        else:
-            m += lc[(sf,st)] >= 0
+    for s in moved:
+        m += mv[s] >= 1 - x[(s,prev_place[s])]
+
+    # Lane change indicator; a previous lane that is no longer feasible is a change whenever the route is admitted
+    for r in relane:
+        m += lc[r] >= a[r] - y[r + (prev_lanes[r],)]
+    forced = [a[r] for r in K if prev_lanes.get(r) and r not in lc]
 
     # Prefer list biases via objective weights
     lane_bias = {l: (0.0 if l in prefer_list else 0.05) for l in ['shm','uds','tcp']}
 
-    # Objective
-    lat_cost = pulp.lpSum([ y[(sf,st,l)] * (LANE_BASE_MS[l] + lane_bias[l]) for (sf,st) in R for l in ['shm','uds','tcp'] ])                  + pulp.lpSum([ d[(sf,st)] * NUMA_PENALTY_MS * a[(sf,st)] for (sf,st) in R ])
-    churn_cost = pulp.lpSum([ mv[s] for s in S ]) + pulp.lpSum([ lc[(sf,st)] for (sf,st) in R ])
+    # Objective (d is only pushed to 1 for an admitted route placed apart, so it needs no product with a)
+    lat_cost = pulp.lpSum([ y[r + (l,)] * (LANE_BASE_MS[l] + lane_bias[l]) for r in K for l in lanes[r] ]) \
+               + pulp.lpSum([ d[r] * NUMA_PENALTY_MS for r in K ])
+    churn_cost = pulp.lpSum([ mv[s] for s in moved ]) + pulp.lpSum([ lc[r] for r in relane ]) + pulp.lpSum(forced)
     # Maximize admissions by large negative coefficient
-    admit_reward = -admit_priority * pulp.lpSum([ a[(sf,st)] for (sf,st) in R ])
+    admit_reward = -admit_priority * pulp.lpSum([ a[r] for r in K ])
     m += lat_cost + churn_weight*churn_cost + admit_reward
+    return m, {"S": S, "K": K, "lanes": lanes, "x": x, "a": a, "y": y, "d": d, "mv": mv, "lc": lc}
 
-    # Hints: place to hinted node when inactive or no conflict
-    for s in S:
-        pref = place_hint.get(s)
-        if pref and pref in N:
-            # soft hint via tiny objective term
-            m += 0  # no hard constraint
+def solve_model(R, N, manis, caps, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, time_limit=None, gap_rel=None, warm=None, pinned=None):
+    import pulp
+    m, v = build_model(R, N, manis, caps, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, pinned)
+    S, K, lanes, x, a, y, d, mv, lc = (v[k] for k in ("S", "K", "lanes", "x", "a", "y", "d", "mv", "lc"))
+
+    # Warm start from a known incumbent; CBC discards it if it turns out infeasible
+    if warm:
+        wp = {s: n for s, n in warm.get("placement", {}).items() if n in N}
+        wl = warm.get("lanes", {})
+        for s in S:
+            for n in N:
+                x[(s,n)].setInitialValue(1 if wp.get(s) == n else 0)
+            if s in mv: mv[s].setInitialValue(1 if wp.get(s) != prev_place[s] else 0)
+        for r in K:
+            nf, nt = wp.get(r[0]), wp.get(r[1])
+            lane = wl.get(r)
+            if lane == 'shm' and nf != nt: lane = 'uds'
+            ok = nf is not None and nt is not None and lane in lanes[r] \
+                and LANE_BASE_MS[lane] + (NUMA_PENALTY_MS if nf != nt else 0.0) <= route_budget(manis, *r)
+            a[r].setInitialValue(1 if ok else 0)
+            for l in lanes[r]:
+                y[r + (l,)].setInitialValue(1 if ok and l == lane else 0)
+            d[r].setInitialValue(1 if ok and nf != nt else 0)
+            if r in lc: lc[r].setInitialValue(1 if ok and prev_lanes[r] != lane else 0)
 
     # Solve
-    m.solve(pulp.PULP_CBC_CMD(msg=False))
-    status = pulp.LpStatus[m.status]
-    if status not in ("Optimal","Feasible"):
-        return {"ok": False, "status": status, "reason": "solver_failed"}
+    fd, log_path = tempfile.mkstemp(suffix=".cbc.log"); os.close(fd)
+    t0 = time.perf_counter()
+    try:
+        m.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=gap_rel, warmStart=bool(warm), logPath=log_path))
+        stats = cbc_stats(log_path)
+    finally:
+        os.unlink(log_path)
+    status = solve_status(m, stats.get("result"))
+    solve = {"status": status, "result": stats.get("result"), "time_s": round(time.perf_counter() - t0, 3),
+             "time_limit": time_limit, "gap_rel": gap_rel, "warm_start": (warm or {}).get("source")}
+    if status not in ("Optimal","Feasible","TimeLimit"):
+        return {"ok": False, "status": status, "reason": "solver_failed", "solve": solve}
+    obj = pulp.value(m.objective) or 0.0
+    # an optimum is its own bound; an early stop only has the bound CBC printed, if any
+    bound = stats.get("bound", obj if status == "Optimal" else None)
+    solve.update({"objective": obj, "bound": bound, "gap": _gap(obj, bound)})
 
     place = {}
     for s in S:
@@ -162,13 +205,233 @@ def solve_ilp(routes_file, manifests_dir, key_id, policy_file, topo_file, prefer
                 place[s] = n; break
     routes_add = []
     rejects = []
-    for sf,st in R:
-        if pulp.value(a[(sf,st)]) < 0.5:
+    for r in R:
+        sf, st = r
+        if r not in lanes:
+            rejects.append({"from":sf,"to":st,"reason":"qos_budget"})
+            continue
+        if pulp.value(a[r]) < 0.5:
             rejects.append({"from":sf,"to":st,"reason":"not_admitted"})
             continue
         chosen = None
-        for l in ['shm','uds','tcp']:
-            if pulp.value(y[(sf,st,l)]) > 0.5:
+        for l in lanes[r]:
+            if pulp.value(y[r + (l,)]) > 0.5:
                 chosen = l; break
         routes_add.append({"from": sf, "to": st, "lane": chosen})
-    return {"ok": True, "placement": place, "routes_add": routes_add, "rejects": rejects}
+    return {"ok": True, "placement": place, "routes_add": routes_add, "rejects": rejects, "solve": solve}
+
+def _gap(obj, bound):
+    return None if bound is None else abs(obj - bound) / max(abs(obj), 1e-9)
+
+def _solve_job(job):
+    return solve_model(*job)
+
+def _usage(place, manis):
+    use = {}
+    for s, n in place.items():
+        u = use.setdefault(n, {'cpu':0.0,'mem':0.0}); dm = demand(manis[s])
+        u['cpu'] += dm['cpu']; u['mem'] += dm['mem']
+    return use
+
+def solve_decomposed(R, N, manis, caps, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, workers=None, time_limit=None, gap_rel=None, warm=None):
+    # Components only interact through node capacity. If every node could hold all symbols at once the
+    # components are independent; otherwise the master hands each a share of every node proportional to its
+    # demand, then re-solves components that rejected routes against the capacity the others left unused.
+    # Shares that still leave routes unadmitted may have cost admissions the whole model would make, so
+    # then the monolithic model is solved too, warm-started from the merged result; solve["master"]
+    # reports what the shares lost.
+    comps = components(R)
+    syms = [sorted({s for r in c for s in r}) for c in comps]
+    dem = [{'cpu': sum(demand(manis[s])['cpu'] for s in ss), 'mem': sum(demand(manis[s])['mem'] for s in ss)} for ss in syms]
+    tot = {'cpu': sum(dm['cpu'] for dm in dem), 'mem': sum(dm['mem'] for dm in dem)}
+    binding = any(tot['cpu'] > caps[n]['cpu'] or tot['mem'] > caps[n]['mem'] for n in N)
+    def share(i):
+        if not binding: return caps
+        return {n: {k: caps[n][k] * (dem[i][k] / tot[k] if tot[k] else 0.0) for k in ('cpu','mem')} for n in N}
+    t0 = time.perf_counter()
+    def job(i, c):
+        sub = {s: manis[s] for s in syms[i]}
+        w = None
+        if warm:
+            w = {"source": warm.get("source"), "placement": {s: warm["placement"][s] for s in syms[i] if s in warm.get("placement", {})},
+                 "lanes": {r: warm["lanes"][r] for r in comps[i] if r in warm.get("lanes", {})}}
+        return (comps[i], N, sub, c, {s: prev_place[s] for s in syms[i] if s in prev_place},
+                {r: prev_lanes[r] for r in comps[i] if r in prev_lanes}, prefer_list, admit_priority, churn_weight,
+                time_limit, gap_rel, w)
+    jobs = [job(i, share(i)) for i in range(len(comps))]
+    if len(jobs) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(_solve_job, jobs))
+    else:
+        parts = [_solve_job(j) for j in jobs]
+    for i, p in enumerate(parts):
+        if not p.get("ok"):
+            return dict(p, component=i)
+    if binding:
+        for i in sorted((i for i, p in enumerate(parts) if p["rejects"]), key=lambda i: -len(parts[i]["rejects"])):
+            others = {}
+            for j, p in enumerate(parts):
+                if j != i: others.update(p["placement"])
+            used = _usage(others, manis)
+            left = {n: {k: max(0.0, caps[n][k] - used.get(n, {}).get(k, 0.0)) for k in ('cpu','mem')} for n in N}
+            p = _solve_job(job(i, left))
+            if p.get("ok") and len(p["rejects"]) < len(parts[i]["rejects"]):
+                parts[i] = p
+    order = {r: k for k, r in enumerate(R)}
+    place = {}; routes_add = []; rejects = []
+    for p in parts:
+        place.update(p["placement"]); routes_add += p["routes_add"]; rejects += p["rejects"]
+    routes_add.sort(key=lambda e: order[(e["from"], e["to"])])
+    rejects.sort(key=lambda e: order[(e["from"], e["to"])])
+    # components are independent models, so objectives and bounds add up; under binding shares they are
+    # restricted models, so the sum is an incumbent without a global bound
+    obj = sum(p["solve"]["objective"] for p in parts)
+    bounds = [p["solve"]["bound"] for p in parts]
+    bound = None if binding or None in bounds else sum(bounds)
+    results = [p["solve"].get("result") or "" for p in parts]
+    statuses = {p["solve"]["status"] for p in parts}
+    status = "TimeLimit" if "TimeLimit" in statuses else "Optimal" if statuses == {"Optimal"} and not binding else "Feasible"
+    solve = {"status": status,
+             "result": next((r for r in results if not r.startswith("Optimal")), "Optimal solution found"),
+             "time_s": round(time.perf_counter() - t0, 3), "time_limit": time_limit, "gap_rel": gap_rel,
+             "warm_start": (warm or {}).get("source"), "objective": obj, "bound": bound,
+             "gap": _gap(obj, bound)}
+    out = {"ok": True, "placement": place, "routes_add": routes_add, "rejects": rejects, "components": len(comps), "capacity_binding": binding, "solve": solve}
+    if binding and any(e["reason"] == "not_admitted" for e in rejects):
+        init = {"source": "decomposed", "placement": place, "lanes": {(e["from"], e["to"]): e["lane"] for e in routes_add}}
+        mono = solve_model(R, N, manis, caps, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, time_limit, gap_rel, init)
+        master = {"objective": obj, "admitted": len(routes_add), "fallback": None, "loss": 0.0}
+        if mono.get("ok") and mono["solve"]["objective"] <= obj:
+            master.update(fallback="monolithic", loss=obj - mono["solve"]["objective"])
+            out = dict(mono, components=len(comps), capacity_binding=binding)
+            out["solve"] = dict(mono["solve"], time_s=round(time.perf_counter() - t0, 3))
+        out["solve"]["master"] = master
+    return out
+
+def warm_start(R, manis, topo, prev_place, prev_lanes, prefer_list):
+    # last applied plan if it places every symbol, else the placement heuristic seeded from it
+    S = {s for r in R for s in r}
+    if S and all(s in prev_place for s in S):
+        return {"source": "last_applied", "placement": prev_place, "lanes": prev_lanes}
+    from ..solver_placement import optimize
+    place, lane_map, _ = optimize(manis, [{"from": sf, "to": st} for sf,st in R], topo, prev_place, prev_lanes, prefer_list)
+    return {"source": "heuristic", "placement": place, "lanes": lane_map}
+
+def _sha(obj): return digest(obj)
+
+def input_digest(R, manis, policy, topo, caps, sha=_sha):
+    # recorded in the plan so the next build can tell what changed since
+    return {"candidates": [list(r) for r in R],
+            "symbols": {s: sha(manis[s]) for s in sorted({s for r in R for s in r})},
+            "policy": sha(policy), "topology": sha(topo), "nodes": caps}
+
+def neighborhood(R, manis, policy, topo, caps, last, hops=1, sha=_sha):
+    # symbols whose routes, manifest or node changed since the last plan, grown by `hops` along candidate routes.
+    # None (a full solve) when the last plan carries no input digest, or when the policy or the topology
+    # changed: either one reprices every route, not a neighborhood.
+    prev = last.get("inputs")
+    if not prev: return None
+    if prev.get("policy") != sha(policy) or prev.get("topology") != sha(topo): return None
+    changed = set()
+    for r in {tuple(r) for r in prev.get("candidates", [])} ^ set(R):
+        changed.update(r)
+    syms = {s for r in R for s in r}
+    for s in syms:
+        if prev.get("symbols", {}).get(s) != sha(manis[s]): changed.add(s)
+    old_caps = prev.get("nodes", {})
+    for s, n in last.get("placement", {}).items():
+        if s in syms and (n not in caps or old_caps.get(n) != caps[n]): changed.add(s)
+    adj = {}
+    for sf, st in R:
+        adj.setdefault(sf, set()).add(st); adj.setdefault(st, set()).add(sf)
+    hood = set(changed); edge = set(changed)
+    for _ in range(hops):
+        edge = {o for s in edge for o in adj.get(s, ())} - hood
+        hood |= edge
+    return hood
+
+def solve_incremental(R, N, manis, caps, last, hood, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, time_limit=None, gap_rel=None, warm=True, topo=None):
+    # Re-solve only routes touching the neighborhood. Their other endpoints stay pinned where the last plan
+    # put them, every other symbol keeps its node and every other route keeps its last lane or rejection.
+    t0 = time.perf_counter()
+    sub = [r for r in R if r[0] in hood or r[1] in hood]
+    sub_syms = {s for r in sub for s in r}
+    live = {s for r in R for s in r}
+    pinned = {s: prev_place[s] for s in sub_syms - hood if prev_place.get(s) in N}
+    outside = {s: n for s, n in prev_place.items() if s in live and s not in sub_syms and n in N}
+    used = _usage(outside, manis)
+    left = {n: {k: max(0.0, caps[n][k] - used.get(n, {}).get(k, 0.0)) for k in ('cpu','mem')} for n in N}
+    if sub:
+        init = warm_start(sub, manis, topo or {}, prev_place, prev_lanes, prefer_list) if warm else None
+        res = solve_model(sub, N, manis, left, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, time_limit, gap_rel, init, pinned)
+        if not res.get("ok"): return res
+    else:
+        res = {"placement": {}, "routes_add": [], "rejects": [], "solve": None}
+    new = {(e["from"], e["to"]): e for e in res["routes_add"] + res["rejects"]}
+    kept = {(e["from"], e["to"]): e for e in last.get("routes_add", [])}
+    in_sub = set(sub)
+    routes_add = []; rejects = []
+    for r in R:
+        if r in in_sub: e = new[r]
+        else: e = kept.get(r) or {"from": r[0], "to": r[1], "reason": "not_admitted"}
+        (rejects if "reason" in e else routes_add).append(e)
+    place = dict(outside); place.update(res["placement"])
+    return {"ok": True, "placement": place, "routes_add": routes_add, "rejects": rejects, "solve": res["solve"],
+            "incremental": {"neighborhood": len(hood), "routes": len(sub), "pinned": len(pinned), "time_s": round(time.perf_counter() - t0, 3)}}
+
+def candidates(routes, manis, pol, vidx=None):
+    """(from, to) pairs that pass the manifest, policy and semver checks. With a
+    VersionIndex, an unversioned target resolves to the highest version the caller accepts."""
+    R = []
+    for r in routes.get('routes', []):
+        sf, st = r['from'], r['to']
+        if sf not in manis: continue
+        if st not in manis and '@' not in st and vidx is not None:
+            st = vidx.best(st, manis[sf].get('version_set','>=0.0.0')) or st
+        if st not in manis: continue
+        if not pol.allowed(sf, st): continue
+        # semver meet
+        vf = version_of_saddr(sf); vt = version_of_saddr(st)
+        if not check_set(vf, manis[st].get('version_set','>=0.0.0')): continue
+        if not check_set(vt, manis[sf].get('version_set','>=0.0.0')): continue
+        R.append((sf,st))
+    return R
+
+def solve_ilp(routes_file, manifests_dir, key_id, policy_file, topo_file, prefer_list, admit_priority=1000.0, churn_weight=1.0, change_threshold_ms=0.15, last_plan_file=None, decompose=False, workers=None, time_limit=None, gap_rel=None, warm=True, incremental=False, hops=1):
+    routes = load_json(routes_file)
+    manis = load_manifests(manifests_dir)
+    policy = load_json(policy_file) if os.path.isfile(policy_file) else {"allow":[{"from":"*","to":"*"}]}
+    topo = load_json(topo_file) if os.path.isfile(topo_file) else {"nodes":{"0":{"name":"n0"}}, "place":{}}
+    last = load_json(last_plan_file) if last_plan_file and os.path.isfile(last_plan_file) else {}
+    return solve_loaded(routes, manis, policy, topo, last, prefer_list, admit_priority, churn_weight, decompose, workers, time_limit, gap_rel, warm, incremental, hops)
+
+def solve_loaded(routes, manis, policy, topo, last, prefer_list, admit_priority=1000.0, churn_weight=1.0, decompose=False, workers=None, time_limit=None, gap_rel=None, warm=True, incremental=False, hops=1, pol=None, vidx=None):
+    """solve_ilp on already-parsed inputs; pol / vidx let a resident caller reuse its compiled policy and version index."""
+    try:
+        import pulp
+    except Exception as e:
+        raise RuntimeError("PuLP not installed. Install with: pip install pulp") from e
+
+    prev_place = last.get("placement", {})
+    prev_lanes = {(r.get("from"), r.get("to")): r.get("lane") for r in last.get("routes_add", []) if r.get("from") and r.get("to") and r.get("lane")}
+
+    R = candidates(routes, manis, pol or compile_policy(policy), vidx or VersionIndex(manis))
+    N = list(topo.get('nodes', {}).keys()) or ['0']
+    caps = {n: capacity(topo, n) for n in N}
+
+    # manifests are not mutated while solving: each one is canonicalized and hashed once
+    sha = Canonicalizer().digest
+    inputs = input_digest(R, manis, policy, topo, caps, sha)
+
+    hood = neighborhood(R, manis, policy, topo, caps, last, hops, sha) if incremental else None
+    if hood is not None:
+        res = solve_incremental(R, N, manis, caps, last, hood, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, time_limit, gap_rel, warm, topo)
+        return dict(res, inputs=inputs) if res.get("ok") else res
+
+    init = warm_start(R, manis, topo, prev_place, prev_lanes, prefer_list) if warm and R else None
+
+    if decompose:
+        res = solve_decomposed(R, N, manis, caps, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, workers, time_limit, gap_rel, init)
+    else:
+        res = solve_model(R, N, manis, caps, prev_place, prev_lanes, prefer_list, admit_priority, churn_weight, time_limit, gap_rel, init)
+    return dict(res, inputs=inputs) if res.get("ok") else res
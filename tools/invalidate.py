@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Rebuild only what a change makes stale, using the reverse-dependency index
+# (.rtt/cache/deps.db; see tools/common/deps.py) that view_materialize and
+# view_to_rtt maintain.
+#
+# usage: invalidate.py [--dry-run] <change> ...     (or '-' to read changes from stdin)
+#   a change is a path (overlays/..., views/*.view.json, a realized .agent.json, a CAS
+#   object), a digest ('sha256:<hex>' or bare hex), or a registry key ('id@ver').
+#   e.g. git diff --name-only HEAD~1 | python tools/invalidate.py -
+import json, os, re, sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+from common.deps import DepIndex
+from common.registry import open_registry
+from common.linkmap import update_linkmap
+from common.views import Overlays
+from view_materialize import materialize_view, record_deps, DEPS, INDEX, LINKMAP, OVERLAYS
+from view_to_rtt import convert
+
+HEX64 = re.compile(r'(?:sha256:)?([0-9a-f]{64})')
+
+def closure(changes, deps, reg, log=print):
+    """-> ({view: set of id@ver}, {views rebuilt whole}, {realized files of those entries})"""
+    entries, whole = set(), set()
+    def by_hash(h):
+        entries.update(deps.by_hash(h))
+        for kind, key in reg.by_hash(h):   # a digest the views have not seen yet, via its registry key
+            if kind == "agents": entries.update(deps.by_id(key))
+    for c in changes:
+        m = HEX64.fullmatch(c)
+        if m: by_hash(m.group(1)); continue
+        if '@' in c and '/' not in c and not os.path.exists(c):
+            entries.update(deps.by_id(c)); continue
+        p = pathlib.Path(os.path.abspath(c))
+        try: rel = p.relative_to(ROOT).as_posix()
+        except ValueError:
+            if log: log(f"[WARN] not under the repo: {c}")
+            continue
+        if rel.startswith("overlays/"):
+            hit = deps.by_overlay(rel)
+            entries.update(hit if hit or rel.endswith(".json") else deps.by_overlay_dir(rel.rstrip("/") + "/"))
+        elif rel.startswith("views/") and rel.endswith(".view.json"):
+            whole.add(rel)
+        elif rel.startswith(".rtt/registry/cas/") and HEX64.fullmatch(p.name[:-5]):
+            by_hash(p.name[:-5])
+        elif rel.endswith(".agent.json"):
+            entries.update(deps.by_realized(rel))
+        elif log:
+            log(f"[WARN] no dependents tracked for {rel}")
+    per_view, realized = {}, set()
+    for prov, idv in entries:
+        ent = deps.entry(prov, idv)
+        if ent and ent[3] not in whole:
+            per_view.setdefault(ent[3], set()).add(idv); realized.add(ent[2])
+    return per_view, whole, realized
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    dry = "--dry-run" in sys.argv
+    changes = [ln.strip() for ln in sys.stdin if ln.strip()] if args == ["-"] else args
+    if not changes:
+        print("usage: invalidate.py [--dry-run] <path|sha256:hex|id@ver> ... | -"); sys.exit(2)
+    with DepIndex(DEPS) as deps, open_registry(INDEX) as reg:
+        per_view, whole, realized = closure(changes, deps, reg)
+        manis = {r: deps.manifest_of(r) for r in realized}
+    n = sum(len(ids) for ids in per_view.values())
+    if dry:
+        print(json.dumps({"views": sorted(whole), "entries": {v: sorted(ids) for v, ids in per_view.items()},
+                          "realized": sorted(realized), "manifests": sorted(m for m in manis.values() if m)}, indent=2))
+        print(f"[OK] {len(changes)} changes -> {n} entries in {len(per_view)} views, {len(whole)} whole views (dry run)")
+        return
+    ov = Overlays(OVERLAYS)
+    results = [materialize_view(ROOT / v, ov, only=None if v in whole else per_view[v])
+               for v in sorted(set(per_view) | whole)]
+    update_linkmap(LINKMAP, {r["provider"]: r["linkmap"] for r in results})
+    record_deps(results)
+    # derived RTT manifests of the entries that were rebuilt (whole views: every entry that had one)
+    with DepIndex(DEPS) as deps:
+        for r in results:
+            if r["full"]: manis.update((d[3], deps.manifest_of(d[3])) for d in r["deps"])
+    todo = sorted(r for r, m in manis.items() if m and os.path.exists(ROOT / r))
+    if todo: convert([str(ROOT / r) for r in todo], log=None)
+    for r in results:
+        print(f"[OK] {r['view']}: {r['realized']} realized, {r['unchanged']} unchanged in {r['seconds']:.2f}s")
+    print(f"[OK] {len(changes)} changes -> {n} entries in {len(per_view)} views, {len(whole)} whole views; {len(todo)} manifests")
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,13 @@
 #!/usr/bin/env python3
 import json, sys, os, glob
 from pathlib import Path
+from common.manifests import load_store
 
 def load_json(p): return json.loads(open(p,'r',encoding='utf-8').read())
 
-def check_exists(routes, mani_dir):
+def check_exists(routes, store):
     # every from and to must exist as saddr in manifests
-    saddr = set()
-    for p in glob.glob(os.path.join(mani_dir, "*.json")):
-        try:
-            m = load_json(p)
-            saddr.add(m["symbol"]["saddr"])
-        except Exception: pass
+    saddr = store.symbols
     missing = []
     for r in routes.get("routes", []):
         if r["from"] not in saddr: missing.append(("from", r["from"]))
@@ -32,7 +28,9 @@ def main():
     routes = load_json(sys.argv[1])
     mani_dir = sys.argv[2]
     errs=[]
-    missing = check_exists(routes, mani_dir)
+    store = load_store(mani_dir)
+    if store.errors: errs.append({"manifest_errors": store.errors})
+    missing = check_exists(routes, store)
     if missing: errs.append({"missing_endpoints": missing})
     dup = check_dupes(routes)
     if dup: errs.append({"duplicate_routes": dup})
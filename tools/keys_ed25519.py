@@ -2,6 +2,7 @@
 import os, base64, sys, json
 from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
+from common.registry import open_registry
 PUBS = ROOT / ".rtt" / "registry" / "trust" / "keys"
 PRIVS = ROOT / ".rtt" / "registry" / "keys" / "private"
 
@@ -19,9 +20,6 @@ def main():
     PRIVS.mkdir(parents=True, exist_ok=True)
     (PUBS / f"{key_id}.pub").write_text(f"ed25519:{pub_b64}\n")
     (PRIVS / f"{key_id}.priv").write_text(f"{priv_b64}\n")
-    idx = ROOT / ".rtt" / "registry" / "index.json"
-    j = json.loads(idx.read_text()) if idx.exists() else {"agents":{}, "mcp_tools":{}, "skills":{}, "signers":[]}
-    if f"ed25519:{key_id}" not in j["signers"]: j["signers"].append(f"ed25519:{key_id}")
-    idx.write_text(json.dumps(j, indent=2))
+    with open_registry(ROOT / ".rtt" / "registry" / "index.json") as reg: reg.add_signers([f"ed25519:{key_id}"])
     print(f"[OK] keys for {key_id}")
 if __name__ == "__main__": main()
@@ -1,16 +1,14 @@
 #!/usr/bin/env python3
-import json, sys, hashlib, os
+# usage: mcp_ingest.py <provider> <mcp/tools.json> [--workers=N]
+import json, sys, os
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
+from common.ingest import bulk_ingest
 CAS = ROOT / ".rtt" / "registry" / "cas" / "sha256"
 INDEX = ROOT / ".rtt" / "registry" / "index.json"
 MANI = ROOT / ".rtt" / "manifests"
-
-def canon(obj): 
-    import json
-    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
-def sha256(b): import hashlib; return hashlib.sha256(b).hexdigest()
+PACKS = ROOT / ".rtt" / "registry" / "pack"
 
 def to_rtt(provider, t):
     name = t.get("name","tool")
@@ -32,23 +30,17 @@ def to_rtt(provider, t):
     }
 
 def main():
-    if len(sys.argv) < 3:
-        print("usage: mcp_ingest.py <provider> <mcp/tools.json>"); sys.exit(2)
-    prov = sys.argv[1]; jf = Path(sys.argv[2])
+    opts = dict(a[2:].split("=", 1) for a in sys.argv[1:] if a.startswith("--") and "=" in a)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
+        print("usage: mcp_ingest.py <provider> <mcp/tools.json> [--workers=N]"); sys.exit(2)
+    prov = args[0]; jf = Path(args[1])
     tools = json.loads(jf.read_text()).get("tools", [])
-    idx = json.loads(INDEX.read_text()) if INDEX.exists() else {"agents":{}, "mcp_tools":{}, "skills":{}, "signers":[]}
-    idx.setdefault("mcp_tools", {})
-    CAS.mkdir(parents=True, exist_ok=True); MANI.mkdir(parents=True, exist_ok=True)
+    MANI.mkdir(parents=True, exist_ok=True)
     for t in tools:
-        record = {"type":"mcp_tool","provider":prov,"tool":t}
-        h = sha256(canon(record))
-        (CAS / f"{h}.json").write_bytes(canon(record))
-        key = f"{prov}/{t.get('name','tool')}@{t.get('version','1.0.0')}"
-        idx["mcp_tools"][key] = f"sha256:{h}"
         # emit RTT manifest
         mani = to_rtt(prov, t)
         (MANI / f"mcp.{prov}.tool.{t.get('name','tool')}.json").write_text(json.dumps(mani, indent=2))
-        print(f"[OK] MCP {key} -> CAS sha256:{h}")
-    INDEX.write_text(json.dumps(idx, indent=2))
-    print(f"[OK] updated index.json")
+    bulk_ingest("mcp_tools", [(prov, t) for t in tools], CAS, INDEX, PACKS,
+                workers=int(opts["workers"]) if "workers" in opts else None)
 if __name__ == "__main__": main()
@@ -2,25 +2,15 @@
 import json, sys, hashlib, glob, os
 from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
+from common.canonjson import canon
 from ed25519_helper import sign as sign_msg
-
-def canon(obj): 
-    import json
-    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+from common.manifests import load_store
+from common import merkle
 
 def saddr_from_agent(ag):
     ver = ag.get("version","1.0.0")
     return ag.get("rtt_saddr", f"rtt://agent/api/{ag['id']}@{ver}")
 
-def load_manifests(mdir):
-    out={}
-    for p in glob.glob(os.path.join(mdir, "*.json")):
-        try:
-            m=json.load(open(p,'r',encoding='utf-8'))
-            out[m["symbol"]["saddr"]]=m["symbol"]
-        except Exception: pass
-    return out
-
 def autowire(routes, mcp_provider, skills_dir, agents_dir, manifests_dir):
     # Simple strategy: connect agent.id to MCP tool with same name.
     idx_agents = {}
@@ -64,8 +54,9 @@ def autowire(routes, mcp_provider, skills_dir, agents_dir, manifests_dir):
 
 def invariant_gate(routes, manifests_dir):
     # Weak gate: endpoints exist, no dupes, no self loops.
-    errs=[]
-    manis=load_manifests(manifests_dir)
+    store=load_store(manifests_dir)
+    errs=[{"manifest_error": e} for e in store.errors]
+    manis=store.symbols
     for r in routes.get("routes", []):
         if r["from"] not in manis: errs.append({"missing_from": r["from"]})
         if r["to"] not in manis: errs.append({"missing_to": r["to"]})
@@ -79,7 +70,7 @@ def invariant_gate(routes, manifests_dir):
 
 def main():
     if len(sys.argv) < 6:
-        print("usage: plan_build.py <.rtt/routes.json> <.rtt/manifests> <key_id> <agents_dir> <mcp_provider> [skills_dir] [--autowire]")
+        print("usage: plan_build.py <.rtt/routes.json> <.rtt/manifests> <key_id> <agents_dir> <mcp_provider> [skills_dir] [--autowire] [--merkle]")
         sys.exit(2)
     routes_f, mani_dir, key_id, agents_dir, mcp_provider = sys.argv[1:6]
     skills_dir = sys.argv[6] if len(sys.argv) > 6 and not sys.argv[6].startswith("--") else "skills"
@@ -94,16 +85,21 @@ def main():
     # Deterministic plan
     add = sorted([{"from": r["from"], "to": r["to"]} for r in routes["routes"]], key=lambda x: (x["from"], x["to"]))
     plan = { "plan_id":"sha256-PLACEHOLDER", "routes_add": add, "routes_del": [], "order":[f"A{i}" for i in range(1, len(add)+1)] }
-    payload = canon(plan)
-    pid = "sha256-" + hashlib.sha256(payload).hexdigest()
-    plan["plan_id"] = pid
-    # Sign
     priv = (ROOT / ".rtt" / "registry" / "keys" / "private" / f"{key_id}.priv").read_text().strip()
-    from ed25519_helper import sign as sign_msg
-    sig = sign_msg(priv, payload)
-    plan["sign"] = {"alg":"ed25519","key_id": key_id, "sig": sig}
+    (ROOT / "plans").mkdir(parents=True, exist_ok=True)
+    if "--merkle" in sys.argv:
+        # Sign the Merkle root; leaves unchanged since plans/latest.json are not rehashed
+        tree = merkle.sign_plan(plan, key_id, lambda m: sign_msg(priv, m), prev=merkle.previous(ROOT / "plans"))
+        pid = plan["plan_id"]
+        tree.save(merkle.leaves_path(ROOT / "plans", pid))
+    else:
+        payload = canon(plan)
+        pid = "sha256-" + hashlib.sha256(payload).hexdigest()
+        plan["plan_id"] = pid
+        # Sign
+        sig = sign_msg(priv, payload)
+        plan["sign"] = {"alg":"ed25519","key_id": key_id, "sig": sig}
     out = ROOT / "plans" / (pid + ".json")
-    out.parent.mkdir(parents=True, exist_ok=True)
     out.write_text(json.dumps(plan, indent=2))
     (ROOT / "plans" / "latest.json").write_text(json.dumps(plan, indent=2))
     print(f"[OK] wrote {out}")
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# Inclusion proof of one route (or placement) of a Merkle plan (plan_build*.py --merkle):
+# the leaf, its O(log n) sibling hashes and the plan's signed root. Check it with
+# plan_verify.py, which needs neither the plan nor any other route.
+# usage: plan_proof.py <plan.json> <from> <to> [--del]     a routes_add (routes_del) entry
+#        plan_proof.py <plan.json> --placement <saddr>
+import json, sys
+from pathlib import Path
+from common import merkle
+
+def main():
+    args = [a for a in sys.argv[1:] if a not in ("--del", "--placement")]
+    if len(args) != (2 if "--placement" in sys.argv else 3):
+        print("usage: plan_proof.py <plan.json> <from> <to> [--del] | <plan.json> --placement <saddr>"); sys.exit(2)
+    plan = json.loads(Path(args[0]).read_text())
+    if not plan.get("merkle"): print(f"[FAIL] {args[0]}: not a Merkle plan (build it with --merkle)"); sys.exit(1)
+    if "--placement" in sys.argv: key = ("placement", args[1])
+    else: key = ("routes_del" if "--del" in sys.argv else "routes_add", args[1], args[2])
+    proof = merkle.PlanTree(plan).proof(plan, key)
+    if proof is None: print(f"[FAIL] {args[0]}: no leaf {list(key)}"); sys.exit(1)
+    print(json.dumps(proof, indent=2))
+if __name__ == "__main__": main()
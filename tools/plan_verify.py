@@ -2,17 +2,30 @@
 import json, sys, hashlib
 from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
-from ed25519_helper import verify as verify_sig
-def canon(obj): 
-    import json
-    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+from common.canonjson import canon
+from common.crypto_ed25519 import Ed25519
+from common import merkle
+def message(doc):
+    """(bytes the signature must cover, or None, failure reason) for a plan, a Merkle plan or an inclusion proof."""
+    if "path" in doc and "leaf" in doc: return merkle.check_proof(doc)
+    if "merkle" in doc: return merkle.check_plan(doc)
+    payload = dict(doc); payload.pop("sign", None)
+    # plan_id and the signature are taken over the plan before its id was filled in
+    payload["plan_id"] = "sha256-PLACEHOLDER"
+    body = canon(payload)
+    if "sha256-" + hashlib.sha256(body).hexdigest() != doc.get("plan_id"): return None, "plan_id mismatch"
+    return body, None
 def main():
-    if len(sys.argv)<2: print("usage: plan_verify.py plans/<hash>.json"); sys.exit(2)
-    f = Path(sys.argv[1]); plan = json.loads(f.read_text())
-    payload = dict(plan); payload.pop("sign", None)
-    pid = "sha256-" + hashlib.sha256(canon(payload)).hexdigest()
-    if pid != plan.get("plan_id"): print("[FAIL] plan_id mismatch"); sys.exit(1)
-    sign = plan.get("sign",{}); pub = (ROOT/".rtt/registry/trust/keys"/f"{sign.get('key_id')}.pub").read_text().strip().split(":",1)[1]
-    if not verify_sig(pub, canon(payload), sign.get("sig","")): print("[FAIL] signature invalid"); sys.exit(1)
-    print("[OK] plan verified")
+    if len(sys.argv)<2: print("usage: plan_verify.py <plans/<hash>.json | inclusion proof from plan_proof.py> ..."); sys.exit(2)
+    items, failed = [], 0
+    for a in sys.argv[1:]:
+        f = Path(a); doc = json.loads(f.read_text())
+        body, why = message(doc)
+        if body is None: print(f"[FAIL] {f}: {why}"); failed += 1; continue
+        sign = doc.get("sign") or {}; items.append((f, (sign.get("key_id"), body, sign.get("sig",""))))
+    with Ed25519(ROOT/".rtt/registry/trust/keys") as ed: oks = ed.verify_many([it for _, it in items])
+    for (f, _), ok in zip(items, oks):
+        if not ok: print(f"[FAIL] {f}: signature invalid"); failed += 1
+    if failed: sys.exit(1)
+    print("[OK] plan verified" if len(sys.argv)==2 else f"[OK] {len(items)} plans verified")
 if __name__ == "__main__": main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# Resident planner: keeps manifests, routes, policy, topology and the last plan
+# parsed in memory (with the compiled policy and semver index) and answers
+# validate / plan / explain over a UDS next to panel.sock. The client falls back
+# to running the same handler in-process when no daemon is listening.
+#
+# usage: python -m tools.planner_daemon serve [--poll=S]
+#        python -m tools.planner_daemon validate|stats [--no-daemon]
+#        python -m tools.planner_daemon plan [--decompose] [--workers=N] [--time-limit=S] [--gap=REL]
+#                                            [--no-warm-start] [--incremental] [--hops=N] [--no-daemon]
+#        python -m tools.planner_daemon explain <from> <to> [--no-daemon]
+import json, os, sys, time, socket, socketserver, threading
+from pathlib import Path
+from .common.io import load_json
+from .common.manifests import load_store
+from .common.policy import compile_policy
+from .common.semver import VersionIndex, check_set
+from .common.util import version_of_saddr
+
+ROOT = Path(__file__).resolve().parents[1]
+SOCK = ROOT / ".rtt" / "sockets" / "planner.sock"
+DEFAULT_POLICY = {"allow": [{"from": "*", "to": "*"}]}
+DEFAULT_TOPO = {"nodes": {"0": {"name": "n0"}}, "place": {}}
+
+def _fp(p):
+    try:
+        st = os.stat(p); return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        return None
+
+class PlannerState:
+    """Parsed planner inputs, refreshed when their files change."""
+    def __init__(self, root=ROOT):
+        rtt = Path(root) / ".rtt"
+        self.paths = {"manifests": rtt / "manifests", "routes": rtt / "routes.json", "policy": rtt / "policy.json",
+                      "topology": rtt / "topology.json", "last": Path(root) / "plans" / "last_applied.json"}
+        self.lock = threading.RLock()
+        self.fps = {}
+        self.generation = 0
+        self.store = None; self.manis = {}; self.vidx = VersionIndex()
+        self.routes = {"routes": []}; self.policy = DEFAULT_POLICY; self.pol = compile_policy(DEFAULT_POLICY)
+        self.topo = DEFAULT_TOPO; self.last = {}
+
+    def _json(self, key, default):
+        p = self.paths[key]
+        return load_json(p) if os.path.isfile(p) else default
+
+    def refresh(self, full=False):
+        """Re-read whatever changed. The manifest dir's own stat catches added, removed and
+        renamed files; in-place edits are caught by a full pass (the serve loop's poll), which
+        compares per-file fingerprints against the store this state holds. The on-disk
+        snapshot is shared with every other loader, so how much this load parsed says nothing."""
+        with self.lock:
+            fps = {k: _fp(p) for k, p in self.paths.items()}
+            changed = {k for k in fps if fps[k] != self.fps.get(k)} if self.fps else set(fps)
+            if full or "manifests" in changed or self.store is None:
+                store = load_store(self.paths["manifests"])
+                if self.store is None or store.fps != self.store.fps:
+                    self.store, self.manis, self.vidx = store, store.symbols, VersionIndex(store.symbols)
+                    changed.add("manifests")
+                else:
+                    changed.discard("manifests")
+            if "routes" in changed: self.routes = self._json("routes", {"routes": []})
+            if "policy" in changed:
+                self.policy = self._json("policy", DEFAULT_POLICY); self.pol = compile_policy(self.policy)
+            if "topology" in changed: self.topo = self._json("topology", DEFAULT_TOPO)
+            if "last" in changed: self.last = self._json("last", {})
+            self.fps = fps
+            if changed: self.generation += 1
+            return changed
+
+    # --- ops -----------------------------------------------------------------
+    def validate(self, msg):
+        # same checks and shape as tools/invariants_check.py
+        errs = []
+        if self.store.errors: errs.append({"manifest_errors": self.store.errors})
+        rs = self.routes.get("routes", [])
+        missing = [(k, r[k]) for r in rs for k in ("from", "to") if r[k] not in self.manis]
+        if missing: errs.append({"missing_endpoints": missing})
+        seen = set(); dup = []
+        for r in rs:
+            k = (r["from"], r["to"])
+            if k in seen: dup.append({"from": r["from"], "to": r["to"]})
+            seen.add(k)
+        if dup: errs.append({"duplicate_routes": dup})
+        errs += [{"self_loop": r} for r in rs if r["from"] == r["to"]]
+        return {"ok": not errs, "errors": errs} if errs else {"ok": True}
+
+    def plan(self, msg):
+        from .ilp.solver_ilp import solve_loaded
+        o = msg.get("options", {})
+        with self.lock:   # refresh swaps whole objects, so holding references is enough to solve outside the lock
+            routes, manis, policy, topo, last, pol, vidx = self.routes, self.manis, self.policy, self.topo, self.last, self.pol, self.vidx
+        # the last applied plan always feeds churn penalties and the warm start, as in plan_build_ilp
+        return solve_loaded(routes, manis, policy, topo, last,
+                           o.get("prefer", ["shm", "uds", "tcp"]), float(o.get("admit_priority", 1000.0)),
+                           decompose=bool(o.get("decompose")), workers=o.get("workers"), time_limit=o.get("time_limit"),
+                           gap_rel=o.get("gap_rel"), warm=o.get("warm", True), incremental=bool(o.get("incremental")),
+                           hops=int(o.get("hops", 1)), pol=pol, vidx=vidx)
+
+    def explain(self, msg):
+        sf, st = msg["from"], msg["to"]
+        out = {"from": sf, "to": st, "from_manifest": sf in self.manis, "to_manifest": st in self.manis}
+        if sf in self.manis and st not in self.manis and '@' not in st:
+            st = self.vidx.best(st, self.manis[sf].get('version_set', '>=0.0.0')) or st
+            out["resolved_to"] = st if st in self.manis else None
+        i = self.pol.allow_rule(sf, st)
+        out["allow_rule"] = None if i is None else dict(self.pol.policy.get("allow", DEFAULT_POLICY["allow"])[i], index=i)
+        if sf in self.manis and st in self.manis:
+            out["version_ok"] = {"from_in_to_set": check_set(version_of_saddr(sf), self.manis[st].get('version_set', '>=0.0.0')),
+                                 "to_in_from_set": check_set(version_of_saddr(st), self.manis[sf].get('version_set', '>=0.0.0'))}
+        out["candidate"] = bool(out["from_manifest"] and st in self.manis and i is not None and all(out.get("version_ok", {}).values()))
+        out["pin"] = self.pol.pin(sf, st)
+        out["qos"] = {"from": self.pol.qos(sf), "to": self.pol.qos(st)}
+        out["failover"] = self.pol.failover(sf)[0]
+        last = [r for r in self.last.get("routes_add", []) if r.get("from") == sf and r.get("to") == st]
+        out["last_plan"] = {"plan_id": self.last.get("plan_id"), "lane": last[0].get("lane") if last else None,
+                            "placement": {s: self.last.get("placement", {}).get(s) for s in (sf, st)}}
+        out["ok"] = True
+        return out
+
+    def stats(self, msg):
+        return {"ok": True, "generation": self.generation, "manifests": len(self.manis), "routes": len(self.routes.get("routes", [])),
+                "manifest_errors": len(self.store.errors), "paths": {k: str(p) for k, p in self.paths.items()}}
+
+    def handle(self, msg):
+        op = msg.get("op")
+        fn = {"validate": self.validate, "plan": self.plan, "explain": self.explain, "stats": self.stats}.get(op)
+        if fn is None: return {"ok": False, "error": f"unknown op {op!r}"}
+        t0 = time.perf_counter()
+        try:
+            with self.lock:
+                self.refresh()
+                res = fn(msg) if op != "plan" else None
+            if res is None: res = fn(msg)
+        except Exception as e:
+            res = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        res["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return res
+
+# --- server / client ----------------------------------------------------------
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip(): continue
+            try: msg = json.loads(line)
+            except ValueError as e: res = {"ok": False, "error": f"bad request: {e}"}
+            else: res = self.server.state.handle(msg)
+            self.wfile.write((json.dumps(res) + "\n").encode()); self.wfile.flush()
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve(sock=SOCK, poll_s=2.0, root=ROOT):
+    sock = Path(sock)
+    sock.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        request({"op": "stats"}, sock, timeout=0.5)
+        print(f"[ERR] planner already listening on {sock}", file=sys.stderr); sys.exit(1)
+    except (ConnectionRefusedError, FileNotFoundError):
+        pass   # nothing listening: a stale socket file, or none
+    except OSError as e:
+        # e.g. a timeout: something is bound there but busy, so leave its socket alone
+        print(f"[ERR] {sock} is in use ({type(e).__name__}: {e})", file=sys.stderr); sys.exit(1)
+    try: os.unlink(sock)
+    except FileNotFoundError: pass
+    state = PlannerState(root); state.refresh(full=True)
+    srv = _Server(str(sock), _Handler); srv.state = state
+    def watch():
+        while True:
+            time.sleep(poll_s)
+            try: state.refresh(full=True)
+            except Exception as e: print(f"[WARN] planner refresh: {e}", file=sys.stderr)
+    threading.Thread(target=watch, daemon=True).start()
+    print(f"[OK] planner: {sock} ({len(state.manis)} manifests)")
+    try: srv.serve_forever()
+    finally:
+        srv.server_close()
+        try: os.unlink(sock)
+        except FileNotFoundError: pass
+
+def request(msg, sock=SOCK, timeout=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as c:
+        c.settimeout(timeout); c.connect(str(sock))
+        c.sendall((json.dumps(msg) + "\n").encode())
+        buf = b""
+        while not buf.endswith(b"\n"):
+            data = c.recv(65536)
+            if not data: break
+            buf += data
+    return json.loads(buf)
+
+def call(msg, sock=SOCK, use_daemon=True):
+    """Ask the daemon; with none listening, run the same handler in-process."""
+    if use_daemon:
+        try: return dict(request(msg, sock), via="daemon")
+        except (FileNotFoundError, ConnectionRefusedError):
+            pass
+    st = PlannerState(); st.refresh(full=True)
+    return dict(st.handle(msg), via="local")
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opts = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "1") for a in sys.argv[1:] if a.startswith("--"))
+    if not args or args[0] not in ("serve", "validate", "plan", "explain", "stats") or (args[0] == "explain" and len(args) < 3):
+        print("usage: planner_daemon.py serve [--poll=S] | validate | stats | plan [--decompose] [--workers=N] [--time-limit=S] [--gap=REL] [--no-warm-start] [--incremental] [--hops=N] | explain <from> <to>  [--no-daemon]")
+        sys.exit(2)
+    op = args[0]
+    if op == "serve":
+        serve(poll_s=float(opts.get("poll", 2.0))); return
+    msg = {"op": op}
+    if op == "explain": msg.update({"from": args[1], "to": args[2]})
+    if op == "plan":
+        msg["options"] = {"decompose": "decompose" in opts, "workers": int(opts["workers"]) if "workers" in opts else None,
+                          "time_limit": float(opts["time-limit"]) if "time-limit" in opts else None,
+                          "gap_rel": float(opts["gap"]) if "gap" in opts else None, "warm": "no-warm-start" not in opts,
+                          "incremental": "incremental" in opts, "hops": int(opts.get("hops", 1))}
+    res = call(msg, use_daemon="no-daemon" not in opts)
+    print(json.dumps(res, indent=2))
+    if not res.get("ok"): sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import fnmatch
+from .common.policy import Compiled
 def allowed(policy:dict, sfrom:str, sto:str)->bool:
     for rule in policy.get('allow', []):
         if fnmatch.fnmatch(sfrom, rule.get('from','*')) and fnmatch.fnmatch(sto, rule.get('to','*')):
             return True
     return False
+
+def compile_policy(policy:dict)->Compiled:
+    # same engine as tools/common/policy, but no 'allow' key means deny-all here
+    return Compiled(policy, default_allow=())
@@ -28,6 +28,7 @@ def _parse_yaml(text):
     return d
 
 ROOT = Path(__file__).resolve().parents[1]
+from common.linkmap import update_linkmap
 providers_file = ROOT / "providers" / "providers.yaml"
 agents_index_file = ROOT / "agents" / "agents.index.json"
 
@@ -66,7 +67,8 @@ def main():
     for name, cfg in providers.get('providers', {}).items():
         target = cfg['agent_target']
         linkmap[name] = { a['id']: f"{target}/{Path(a['path']).name}" for a in index['agents'] }
-    (ROOT / ".rtt" / "linkmap.json").write_text(json.dumps(linkmap, indent=2))
+    # merged, so providers materialized from views keep their sections
+    update_linkmap(ROOT / ".rtt" / "linkmap.json", linkmap)
     print(f"[OK] wrote .rtt/linkmap.json")
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# Registry index maintenance (.rtt/registry/index.db; see tools/common/registry.py).
+# usage: registry_db.py migrate [index.json]   import an index.json (again) into the database
+#        registry_db.py export [index.json]    write the database out as index.json
+#        registry_db.py get <agents|skills|mcp_tools> <key>
+#        registry_db.py hash <sha256:hex>       which entries point at an object
+#        registry_db.py stats
+import json, sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+from common.registry import open_registry, KINDS
+INDEX = ROOT / ".rtt" / "registry" / "index.json"
+
+def main():
+    args = sys.argv[1:]
+    cmd = args[0] if args else ""
+    if cmd not in ("migrate", "export", "get", "hash", "stats") or (cmd == "get" and len(args) < 3) or (cmd == "hash" and len(args) < 2):
+        print(f"usage: registry_db.py migrate [index.json] | export [index.json] | get <{'|'.join(KINDS)}> <key> | hash <sha256:hex> | stats")
+        sys.exit(2)
+    with open_registry(INDEX) as reg:
+        if cmd == "migrate":
+            src = pathlib.Path(args[1]) if len(args) > 1 else INDEX
+            reg.import_index(json.loads(src.read_text()))
+            print(f"[OK] imported {src} -> {reg.path}: {reg.counts()}")
+        elif cmd == "export":
+            dst = pathlib.Path(args[1]) if len(args) > 1 else INDEX
+            reg.export_json(dst)
+            print(f"[OK] exported {reg.path} -> {dst}")
+        elif cmd == "get":
+            ref = reg.get(args[1], args[2])
+            if ref is None: raise SystemExit(f"[ERR] not in registry: {args[1]} {args[2]}")
+            print(ref)
+        elif cmd == "hash":
+            print(json.dumps(reg.by_hash(args[1]), indent=2))
+        else:
+            print(json.dumps(dict(reg.counts(), db=reg.path), indent=2))
+
+if __name__ == "__main__":
+    main()
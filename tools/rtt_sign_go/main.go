@@ -1,15 +1,62 @@
 package main
 import (
+    "bufio"
     "crypto/ed25519"
     "crypto/rand"
     "encoding/base64"
     "fmt"
     "io/ioutil"
     "os"
+    "strings"
 )
+
+// serve: one request per line on stdin, one response line each on stdout, in order,
+// both prefixed with the request's sequence number so the caller can match them.
+//   <seq> ping -> <seq> pong | <seq> sign <priv_b64> <msg_b64> -> <seq> <sig_b64> | <seq> ERR ...
+//   <seq> verify <pub_b64> <msg_b64> <sig_b64> -> <seq> OK | <seq> FAIL
+// A line without a numeric sequence number is answered with "0 ERR".
+func serve() {
+    r := bufio.NewReaderSize(os.Stdin, 1<<16)
+    w := bufio.NewWriter(os.Stdout)
+    defer w.Flush()
+    for {
+        line, err := r.ReadString('\n')
+        if len(line) == 0 && err != nil { return }
+        f := strings.Fields(line)
+        seq := "0"
+        if len(f) > 0 && strings.Trim(f[0], "0123456789") == "" { seq = f[0]; f = f[1:] } else { f = nil }
+        fmt.Fprint(w, seq, " ")
+        switch {
+        case f == nil:
+            fmt.Fprintln(w, "ERR missing sequence number")
+        case len(f) == 1 && f[0] == "ping":
+            fmt.Fprintln(w, "pong")
+        case len(f) == 3 && f[0] == "sign":
+            priv, e1 := base64.StdEncoding.DecodeString(f[1])
+            msg, e2 := base64.StdEncoding.DecodeString(f[2])
+            if e1 != nil || e2 != nil || len(priv) != ed25519.PrivateKeySize { fmt.Fprintln(w, "ERR bad request"); break }
+            fmt.Fprintln(w, base64.StdEncoding.EncodeToString(ed25519.Sign(ed25519.PrivateKey(priv), msg)))
+        case len(f) == 4 && f[0] == "verify":
+            pub, e1 := base64.StdEncoding.DecodeString(f[1])
+            msg, e2 := base64.StdEncoding.DecodeString(f[2])
+            sig, e3 := base64.StdEncoding.DecodeString(f[3])
+            if e1 == nil && e2 == nil && e3 == nil && len(pub) == ed25519.PublicKeySize && ed25519.Verify(ed25519.PublicKey(pub), msg, sig) {
+                fmt.Fprintln(w, "OK")
+            } else { fmt.Fprintln(w, "FAIL") }
+        default:
+            fmt.Fprintln(w, "ERR unknown request")
+        }
+        // answer everything already read before blocking on the next request
+        if r.Buffered() == 0 { w.Flush() }
+        if err != nil { return }
+    }
+}
+
 func main(){
-    if len(os.Args) < 2 { fmt.Println("usage: gen | sign <priv_b64> <file> | verify <pub_b64> <file> <sig_b64>"); return }
+    if len(os.Args) < 2 { fmt.Println("usage: gen | sign <priv_b64> <file> | verify <pub_b64> <file> <sig_b64> | serve"); return }
     switch os.Args[1] {
+    case "serve":
+        serve()
     case "gen":
         pub, priv, _ := ed25519.GenerateKey(rand.Reader)
         fmt.Println("priv:"+base64.StdEncoding.EncodeToString(priv))
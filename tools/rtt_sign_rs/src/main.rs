@@ -1,7 +1,63 @@
 use anyhow::*;
 use base64::{engine::general_purpose, Engine as _};
 use ed25519_dalek::{Signer, Verifier, SigningKey, VerifyingKey, Signature};
-use std::{fs, path::PathBuf};
+use std::{collections::HashMap, fs, io::{self, BufRead, Write}, path::PathBuf};
+
+// serve: one request per line on stdin, one response line each on stdout, in order,
+// both prefixed with the request's sequence number so the caller can match them.
+//   <seq> ping -> <seq> pong | <seq> sign <priv_b64> <msg_b64> -> <seq> <sig_b64> | <seq> ERR ...
+//   <seq> verify <pub_b64> <msg_b64> <sig_b64> -> <seq> OK | <seq> FAIL
+// A line without a numeric sequence number is answered with "0 ERR".
+// Decoded keys are kept for the life of the process.
+fn serve() -> Result<()> {
+    let b64 = general_purpose::STANDARD;
+    let mut sks: HashMap<String, SigningKey> = HashMap::new();
+    let mut vks: HashMap<String, Option<VerifyingKey>> = HashMap::new();
+    let stdin = io::stdin();
+    let mut input = stdin.lock();
+    let mut out = io::BufWriter::new(io::stdout().lock());
+    let mut line = String::new();
+    loop {
+        line.clear();
+        if input.read_line(&mut line)? == 0 { break; }
+        let all: Vec<&str> = line.split_whitespace().collect();
+        let (seq, f) = match all.split_first() {
+            Some((s, rest)) if !s.is_empty() && s.bytes().all(|b| b.is_ascii_digit()) => (*s, rest),
+            _ => ("0", &[][..]),
+        };
+        write!(out, "{} ", seq)?;
+        match f {
+            [] => writeln!(out, "ERR missing sequence number")?,
+            ["ping"] => writeln!(out, "pong")?,
+            ["sign", key, msg] => {
+                if !sks.contains_key(*key) {
+                    if let Some(sk) = b64.decode(key).ok().filter(|b| b.len() >= 32)
+                        .and_then(|b| <[u8; 32]>::try_from(&b[..32]).ok()).map(|b| SigningKey::from_bytes(&b)) {
+                        sks.insert(key.to_string(), sk);
+                    }
+                }
+                match (sks.get(*key), b64.decode(msg)) {
+                    (Some(sk), Ok(m)) => writeln!(out, "{}", b64.encode(sk.sign(&m).to_bytes()))?,
+                    _ => writeln!(out, "ERR bad request")?,
+                }
+            }
+            ["verify", key, msg, sig] => {
+                let vk = vks.entry(key.to_string()).or_insert_with(|| {
+                    b64.decode(key).ok().and_then(|b| <[u8; 32]>::try_from(b).ok())
+                        .and_then(|b| VerifyingKey::from_bytes(&b).ok())
+                });
+                let ok = match (vk, b64.decode(msg), b64.decode(sig).ok().and_then(|b| <[u8; 64]>::try_from(b).ok())) {
+                    (Some(vk), Ok(m), Some(s)) => vk.verify(&m, &Signature::from_bytes(&s)).is_ok(),
+                    _ => false,
+                };
+                writeln!(out, "{}", if ok { "OK" } else { "FAIL" })?;
+            }
+            _ => writeln!(out, "ERR unknown request")?,
+        }
+        out.flush()?;
+    }
+    Ok(())
+}
 
 fn main() -> Result<()> {
     let args: Vec<String> = std::env::args().collect();
@@ -33,7 +89,8 @@ fn main() -> Result<()> {
             vk.verify(&bytes, &sig)?;
             println!("OK");
         }
-        _ => eprintln!("usage: rtt-sign gen | sign <priv_b64> <file> | verify <pub_b64> <file> <sig_b64>"),
+        Some("serve") => serve()?,
+        _ => eprintln!("usage: rtt-sign gen | sign <priv_b64> <file> | verify <pub_b64> <file> <sig_b64> | serve"),
     }
     Ok(())
 }
@@ -2,11 +2,9 @@
 import json, sys, base64, hashlib
 from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
+from common.canonjson import canon
 from ed25519_helper import sign as sign_msg
 
-def canon(obj):
-    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
-
 def main():
     if len(sys.argv) < 3:
         print("usage: sign_view.py <views/*.view.json> <key_id>")
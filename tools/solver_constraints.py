@@ -1,19 +1,10 @@
 import json, os, glob
 from .semver import check_set
 from .policy_match import allowed
+from .common.manifests import load_manifests
 
 LANE_BASE_LAT_MS = {'shm':0.2, 'uds':0.6, 'tcp':1.5}
 
-def load_manifests(mdir):
-    out={}
-    for p in glob.glob(os.path.join(mdir, "*.json")):
-        try:
-            m=json.load(open(p,'r',encoding='utf-8'))
-            sym=m['symbol']; out[sym['saddr']] = sym
-        except Exception:
-            pass
-    return out
-
 def version_of_saddr(saddr:str)->str:
     if '@' in saddr: return saddr.split('@',1)[1].split('#',1)[0]
     return '1.0.0'
@@ -1,4 +1,4 @@
-import json
+import json, time, random, heapq
 from .solver_constraints import LANE_BASE_LAT_MS, supports_lane
 
 def numa_penalty_ms(topology, a, b):
@@ -50,39 +50,58 @@ def placement_cost(routes, place, lane_map, topology, churn_weight, prev_place):
         cost += churn_weight * moves
     return cost, moves
 
-def pack_feasible(place, symbols, topology, manifests):
-    # ensure capacity not exceeded; very simple rebalance if needed
-    usage = {node:{'cpu':0.0,'mem':0.0} for node in nodes(topology)}
+def pack(place, symbols, topology, manifests):
+    # vector bin packing on cpu and mem: evict from overcommitted nodes, then first-fit-decreasing
+    # into the node with the lowest dominant utilisation that still has room for both resources.
+    # returns (place, report); report['unplaced'] lists symbols that fit nowhere and were left in place.
+    nl = nodes(topology)
     for s in symbols:
-        n = place[s]
-        d = demand(manifests[s])
-        u = usage[n]; u['cpu'] += d['cpu']; u['mem'] += d['mem']
-    caps = {n:capacity(topology, n) for n in usage}
-    # naive fix: if node exceeds, move heaviest to least loaded
-    changed=True; guard=0
-    while changed and guard<100:
-        changed=False; guard+=1
-        for n,u in usage.items():
-            if u['cpu'] > caps[n]['cpu'] or u['mem'] > caps[n]['mem']:
-                # find symbol on n with largest cpu demand
-                heavy = None; heavy_d = 0.0
-                for s in symbols:
-                    if place[s]==n:
-                        d = demand(manifests[s])
-                        if d['cpu']>heavy_d: heavy, heavy_d = s, d['cpu']
-                # move to best other node
-                best_node = n
-                best_load = u['cpu']
-                for m in usage:
-                    if m==n: continue
-                    if usage[m]['cpu'] < best_load:
-                        best_node = m; best_load = usage[m]['cpu']
-                if best_node != n and heavy:
-                    place[heavy] = best_node
-                    usage[n]['cpu'] -= heavy_d
-                    usage[best_node]['cpu'] += heavy_d
-                    changed=True
-    return place
+        if place[s] not in nl: nl.append(place[s])
+    caps = {n: capacity(topology, n) for n in nl}
+    dem = {s: demand(manifests[s]) for s in symbols}
+    use = {n: {'cpu':0.0,'mem':0.0} for n in nl}
+    members = {n: [] for n in nl}
+    for s in symbols:
+        n = place[s]; d = dem[s]
+        use[n]['cpu'] += d['cpu']; use[n]['mem'] += d['mem']; members[n].append(s)
+    def fits(n, d):
+        return use[n]['cpu'] + d['cpu'] <= caps[n]['cpu'] + 1e-9 and use[n]['mem'] + d['mem'] <= caps[n]['mem'] + 1e-9
+    def share(d, c):
+        return max(d['cpu'] / c['cpu'] if c['cpu'] else float('inf'), d['mem'] / c['mem'] if c['mem'] else float('inf'))
+    def take(n, s, sign):
+        d = dem[s]; use[n]['cpu'] += sign*d['cpu']; use[n]['mem'] += sign*d['mem']
+    # evict the heaviest symbols first so as few as possible move
+    pool = []
+    for n in nl:
+        if fits(n, {'cpu':0.0,'mem':0.0}): continue
+        for s in sorted(members[n], key=lambda s: (-share(dem[s], caps[n]), s)):
+            take(n, s, -1); pool.append(s)
+            if fits(n, {'cpu':0.0,'mem':0.0}): break
+    total = {'cpu': sum(c['cpu'] for c in caps.values()), 'mem': sum(c['mem'] for c in caps.values())}
+    pool.sort(key=lambda s: (-share(dem[s], total), s))
+    heap = [(share(use[n], caps[n]), i, n) for i, n in enumerate(nl)]
+    heapq.heapify(heap)
+    unplaced = []
+    for s in pool:
+        d = dem[s]; skipped = []; target = None
+        while heap:
+            e = heapq.heappop(heap)
+            if fits(e[2], d): target = e; break
+            skipped.append(e)
+        if target is None:
+            take(place[s], s, 1)
+            unplaced.append({'saddr': s, 'node': place[s], 'cpu': d['cpu'], 'mem': d['mem']})
+        else:
+            n = target[2]; place[s] = n; take(n, s, 1)
+            heapq.heappush(heap, (share(use[n], caps[n]), target[1], n))
+        for e in skipped: heapq.heappush(heap, e)
+    over = {n: {'cpu': use[n]['cpu'], 'cpu_cap': caps[n]['cpu'], 'mem': use[n]['mem'], 'mem_cap': caps[n]['mem']}
+            for n in nl if not fits(n, {'cpu':0.0,'mem':0.0})}
+    return place, {'ok': not unplaced, 'moved': len(pool) - len(unplaced), 'unplaced': unplaced, 'overcommitted': over}
+
+def pack_feasible(place, symbols, topology, manifests):
+    # ensure capacity not exceeded; see pack() for the infeasibility report
+    return pack(place, symbols, topology, manifests)[0]
 
 def choose_lane(sym_from, sym_to, prefer, same_node):
     for lane in prefer:
@@ -91,7 +110,18 @@ def choose_lane(sym_from, sym_to, prefer, same_node):
             return lane
     return 'uds'
 
-def optimize(manifests, routes, topology, prev_place, prev_lanes, prefer, churn_weight=0.5, change_threshold_ms=0.2):
+def incident_routes(routes, topology):
+    # symbol -> [(other endpoint, cross-node penalty)]; lane cost never depends on placement
+    inc = {}
+    for r in routes:
+        a = r['from']; b = r['to']
+        if a == b: continue
+        w = numa_penalty_ms(topology, a, b)
+        inc.setdefault(a, []).append((b, w))
+        inc.setdefault(b, []).append((a, w))
+    return inc
+
+def seed(manifests, routes, topology, prev_place, prev_lanes, prefer, change_threshold_ms=0.2):
     # Symbols to place
     syms = sorted({r['from'] for r in routes} | {r['to'] for r in routes})
     place = initial_place(syms, topology, prev_place)
@@ -118,21 +148,148 @@ def optimize(manifests, routes, topology, prev_place, prev_lanes, prefer, churn_
             # both feasible. compare
             if lat(prev_lane) - lat(lane_map[key]) <= change_threshold_ms:
                 lane_map[key] = prev_lane
+    return syms, place, lane_map
+
+def optimize(manifests, routes, topology, prev_place, prev_lanes, prefer, churn_weight=0.5, change_threshold_ms=0.2, search='hill', time_budget_s=1.0, max_iters=100000):
+    if search == 'tabu':
+        return tabu_search(manifests, routes, topology, prev_place, prev_lanes, prefer, churn_weight, change_threshold_ms, time_budget_s, max_iters)
+    syms, place, lane_map = seed(manifests, routes, topology, prev_place, prev_lanes, prefer, change_threshold_ms)
     # local improve placement to reduce cost + churn
+    # a move of s only changes its incident routes and its own churn term, so score the delta
     base_cost, _ = placement_cost(routes, place, lane_map, topology, churn_weight, prev_place)
+    inc = incident_routes(routes, topology)
     improved=True; guard=0
     nlist = nodes(topology)
     while improved and guard<50:
         improved=False; guard+=1
         for s in syms:
             cur = place[s]; best = cur; best_cost = base_cost
+            # penalty weight of neighbours per node: moving s to n leaves those on n co-located
+            near = {}
+            for o, w in inc.get(s, ()):
+                near[place[o]] = near.get(place[o], 0.0) + w
+            held = near.get(cur, 0.0)
+            prev = prev_place.get(s) if prev_place else None
+            moved = 1 if prev and prev != cur else 0
             for n in nlist:
                 if n==cur: continue
-                place[s]=n
-                c,_ = placement_cost(routes, place, lane_map, topology, churn_weight, prev_place)
+                c = base_cost + held - near.get(n, 0.0)
+                if prev_place: c += churn_weight * ((1 if prev and prev != n else 0) - moved)
                 if c + 1e-9 < best_cost: best_cost, best = c, n
             place[s]=best
             if best!=cur:
                 base_cost = best_cost
                 improved=True
+    # re-sum once so the reported cost matches a full placement_cost() bit for bit
+    base_cost, _ = placement_cost(routes, place, lane_map, topology, churn_weight, prev_place)
     return place, lane_map, base_cost
+
+def tabu_search(manifests, routes, topology, prev_place, prev_lanes, prefer, churn_weight=0.5, change_threshold_ms=0.2, time_budget_s=1.0, max_iters=100000, tenure=10, sample=64, rng_seed=0):
+    # capacity-aware descent, then tabu search over relocations and pairwise swaps until the budget runs out.
+    # returns the best placement seen (anytime), scored with the same placement_cost() as optimize().
+    deadline = time.perf_counter() + time_budget_s
+    syms, place, lane_map = seed(manifests, routes, topology, prev_place, prev_lanes, prefer, change_threshold_ms)
+    nlist = nodes(topology)
+    for n in place.values():
+        if n not in nlist: nlist.append(n)
+    dem = {s: demand(manifests[s]) for s in syms}
+    cap = {n: capacity(topology, n) for n in nlist}
+    use = {n: {'cpu':0.0,'mem':0.0} for n in nlist}
+    res = {n: [] for n in nlist}; slot = {}
+    for s in syms:
+        n = place[s]; slot[s] = len(res[n]); res[n].append(s)
+        use[n]['cpu'] += dem[s]['cpu']; use[n]['mem'] += dem[s]['mem']
+    # only penalised routes matter to the search; near[s][n] = penalty weight of s's neighbours on n
+    inc = {s: [(o, w) for o, w in l if w] for s, l in incident_routes(routes, topology).items()}
+    near = {s: {} for s in syms}
+    pairw = {}
+    for s in syms:
+        for o, w in inc.get(s, ()):
+            near[s][place[o]] = near[s].get(place[o], 0.0) + w
+            k = (s, o) if s < o else (o, s)
+            pairw[k] = pairw.get(k, 0.0) + w / 2  # each route is listed under both endpoints
+
+    def churn(s, n):
+        p = prev_place.get(s) if prev_place else None
+        return churn_weight if p and p != n else 0.0
+    def move_delta(s, n):
+        cur = place[s]; ns = near[s]
+        return ns.get(cur, 0.0) - ns.get(n, 0.0) + churn(s, n) - churn(s, cur)
+    def swap_delta(s, t):
+        k = (s, t) if s < t else (t, s)
+        # the s-t routes stay split, but each single-move delta counted them as joined
+        return move_delta(s, place[t]) + move_delta(t, place[s]) + 2 * pairw.get(k, 0.0)
+    def fits(n, add, drop=None):
+        u = use[n]; c = cap[n]
+        cpu = u['cpu'] + add['cpu'] - (drop['cpu'] if drop else 0.0)
+        mem = u['mem'] + add['mem'] - (drop['mem'] if drop else 0.0)
+        return cpu <= c['cpu'] + 1e-9 and mem <= c['mem'] + 1e-9
+    def move(s, n):
+        cur = place[s]; d = dem[s]
+        use[cur]['cpu'] -= d['cpu']; use[cur]['mem'] -= d['mem']
+        use[n]['cpu'] += d['cpu']; use[n]['mem'] += d['mem']
+        rc = res[cur]; last = rc.pop()
+        if last != s: rc[slot[s]] = last; slot[last] = slot[s]
+        slot[s] = len(res[n]); res[n].append(s); place[s] = n
+        for o, w in inc.get(s, ()):
+            no = near[o]; no[cur] -= w; no[n] = no.get(n, 0.0) + w
+    def swap(s, t):
+        a, b = place[s], place[t]
+        move(s, b); move(t, a)
+
+    cost, _ = placement_cost(routes, place, lane_map, topology, churn_weight, prev_place)
+    best_cost, best_place = cost, dict(place)
+    # descent: first-improvement relocations that respect capacity
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for s in syms:
+            cur = place[s]; best_n = cur; best_d = 0.0
+            # only nodes holding neighbours, or the previous node, can lower the cost; ties go to nlist order like optimize()
+            ns = near[s]; held = ns.get(cur, 0.0); p = prev_place.get(s) if prev_place else None
+            stay = churn_weight if p and p != cur else 0.0
+            for n in nlist:
+                if n == cur or (n not in ns and n != p): continue
+                dl = held - ns.get(n, 0.0) + (churn_weight if p and p != n else 0.0) - stay
+                if dl + 1e-9 < best_d and fits(n, dem[s]): best_d, best_n = dl, n
+            if best_n != cur:
+                move(s, best_n); cost += best_d; improved = True
+    if cost + 1e-9 < best_cost: best_cost, best_place = cost, dict(place)
+    # tabu: take the best admissible move even when it worsens, forbid moved symbols for `tenure` iterations
+    rnd = random.Random(rng_seed)
+    tabu = {}
+    it = 0
+    while it < max_iters and time.perf_counter() < deadline:
+        it += 1
+        if len(syms) <= sample: cands = syms
+        else:
+            # favour symbols that still pay a cross-node or churn penalty
+            cands = [s for s in rnd.sample(syms, min(len(syms), 4 * sample))
+                     if sum(near[s].values()) - near[s].get(place[s], 0.0) > 1e-9 or churn(s, place[s])][:sample]
+        pick = None; pick_d = float('inf')
+        for s in cands:
+            a = place[s]; free = tabu.get(s, 0) <= it
+            for n in nlist:
+                if n == a: continue
+                dl = move_delta(s, n)
+                if dl < pick_d and (free or cost + dl + 1e-9 < best_cost) and fits(n, dem[s]):
+                    pick, pick_d = ('move', s, n), dl
+            for b in list(near[s]):
+                if b == a or b not in res: continue
+                others = res[b] if len(res[b]) <= sample else rnd.sample(res[b], sample)
+                for t in others:
+                    dl = swap_delta(s, t)
+                    if dl < pick_d and ((free and tabu.get(t, 0) <= it) or cost + dl + 1e-9 < best_cost) \
+                            and fits(b, dem[s], dem[t]) and fits(a, dem[t], dem[s]):
+                        pick, pick_d = ('swap', s, t), dl
+        if pick is None:
+            if cands is syms: break
+            continue
+        kind, s, o = pick
+        if kind == 'swap': swap(s, o); tabu[o] = it + tenure
+        else: move(s, o)
+        tabu[s] = it + tenure
+        cost += pick_d
+        if cost + 1e-9 < best_cost: best_cost, best_place = cost, dict(place)
+    best_cost, _ = placement_cost(routes, best_place, lane_map, topology, churn_weight, prev_place)
+    return best_place, lane_map, best_cost
@@ -1,10 +1,22 @@
 #!/usr/bin/env python3
-import json, sys, os, pathlib
+import json, sys, os, time, pathlib
+from concurrent.futures import ProcessPoolExecutor
 ROOT = pathlib.Path(__file__).resolve().parents[1]
+from common.pack import CasReader
+from common.registry import open_registry
+from common.views import Overlays, overlay_files, overlay_candidates, realization_key, realize
+from common.deps import DepIndex
+from common.linkmap import update_linkmap
 INDEX = ROOT / ".rtt" / "registry" / "index.json"
 CAS = ROOT / ".rtt" / "registry" / "cas" / "sha256"
+PACKS = ROOT / ".rtt" / "registry" / "pack"
 OVERLAYS = ROOT / "overlays"
 OUTROOT = ROOT / "providers"
+VIEWS = ROOT / "views"
+LINKMAP = ROOT / ".rtt" / "linkmap.json"
+DEPS = ROOT / ".rtt" / "cache" / "deps.db"
+# per-mount record of what each realized file was built from; see realization_key
+REALIZED = ".realized.json"
 
 def safe_mkdir(p: pathlib.Path):
     p.mkdir(parents=True, exist_ok=True)
@@ -22,71 +34,129 @@ def write_proxy(src: pathlib.Path, dst: pathlib.Path):
     obj = {"$schema":"https://rtt/agent-proxy/v1","ref":os.path.relpath(src, dst.parent)}
     dst.write_text(json.dumps(obj, indent=2))
 
-def resolve_hash(agent_key: str)->pathlib.Path:
+def resolve_hash(agent_key: str, reg=None)->pathlib.Path:
     # agent_key format id@ver
     idver = agent_key
-    idx = json.loads(INDEX.read_text())
-    h = idx["agents"].get(idver)
+    if reg is None:
+        with open_registry(INDEX) as reg: h = reg.get("agents", idver)
+    else:
+        h = reg.get("agents", idver)
     if not h or not h.startswith("sha256:"):
         raise SystemExit(f"[ERR] not in index: {idver}")
     return CAS / f"{h.split(':',1)[1]}.json"
 
-def overlay_files(provider: str, env: str, idver: str):
-    id_, ver = idver.split("@",1)
-    files = []
-    # provider-specific patch for the exact id or a generic
-    p1 = OVERLAYS / "provider" / provider / f"{id_}.patch.json"
-    if p1.exists(): files.append(p1)
-    # env global, then id-specific
-    p2 = OVERLAYS / "env" / env / "_global.patch.json"
-    if p2.exists(): files.append(p2)
-    p3 = OVERLAYS / "env" / env / f"{id_}.patch.json"
-    if p3.exists(): files.append(p3)
-    return files
-
-def deep_merge(base, patch):
-    if isinstance(base, dict) and isinstance(patch, dict):
-        out = dict(base)
-        for k,v in patch.items():
-            out[k] = deep_merge(out.get(k), v) if k in out else v
-        return out
-    return patch
-
-def apply_overlays(base_obj, files):
-    out = base_obj
-    for p in files:
-        with open(p, "r", encoding="utf-8") as f:
-            out = deep_merge(out, json.load(f))
-    return out
+def load_realized(mount: pathlib.Path)->dict:
+    try:
+        return json.loads((mount / REALIZED).read_text()).get("entries", {})
+    except (FileNotFoundError, ValueError):
+        return {}
 
-def materialize(view_file: pathlib.Path):
+def materialize_view(view_file: pathlib.Path, ov=None, log=print, only=None):
+    """Realize one view's mount; returns its linkmap section, dependency edges and counts
+    (writing the linkmap and the dependency index is the caller's). only: a set of
+    id@ver to (re)realize; every other entry keeps its recorded realization."""
+    t0 = time.perf_counter()
+    ov = ov or Overlays(OVERLAYS)
     view = json.loads(view_file.read_text())
     provider = view["provider"]
     env = "prod"
     mount = ROOT / view["mount"]
     safe_mkdir(mount)
-    for e in view["entries"]:
-        idv = e["id"]
-        src = resolve_hash(idv)
-        # apply overlays and write a realized file beside the link for clarity
-        realized = json.loads(src.read_text())
-        realized = apply_overlays(realized, overlay_files(provider, env, idv))
-        realized_name = f"{idv.replace('@','_')}.agent.json"
-        realized_path = mount / realized_name
-        realized_path.write_text(json.dumps(realized, indent=2))
-        # create a link file pointing to CAS for provenance
-        link_name = realized_name + ".link"
-        link_path = mount / link_name
-        if not try_symlink(src, link_path):
-            write_proxy(src, link_path)
-        print(f"[OK] {provider} materialized {realized_name}")
-    # write linkmap
+    cas = CasReader(PACKS, CAS)
+    reg = open_registry(INDEX)
+    old, keys, skipped, deps = load_realized(mount), {}, 0, []
+    vrel = os.path.relpath(view_file, ROOT)
+    try:
+        for e in view["entries"]:
+            idv = e["id"]
+            realized_name = f"{idv.replace('@','_')}.agent.json"
+            if only is not None and idv not in only and realized_name in old:
+                keys[realized_name] = old[realized_name]; skipped += 1; continue
+            src = resolve_hash(idv, reg)
+            files = overlay_files(ov, provider, env, idv)
+            realized_path = mount / realized_name
+            deps.append((idv, env, src.stem, os.path.relpath(realized_path, ROOT),
+                         [os.path.relpath(p, ROOT) for p in overlay_candidates(ov, provider, env, idv)]))
+            link_path = mount / (realized_name + ".link")
+            key = keys[realized_name] = realization_key(src.stem, files, provider, env, ov, ROOT)
+            if old.get(realized_name) == key and realized_path.exists() and (link_path.exists() or link_path.is_symlink()):
+                skipped += 1; continue
+            # object bytes come from the pack (hash-checked), falling back to the loose CAS file
+            raw = cas.get(src.stem)
+            if raw is None:
+                raise SystemExit(f"[ERR] object missing from pack and CAS: {src.stem}")
+            # apply overlays and write a realized file beside the link for clarity
+            try: realized_path.write_bytes(realize(raw, files, ov, src.stem))
+            finally: raw.release()
+            # create a link file pointing to CAS for provenance
+            if not try_symlink(src, link_path):
+                write_proxy(src, link_path)
+            if log: log(f"[OK] {provider} materialized {realized_name}")
+    finally:
+        cas.close(); reg.close()
+    # files this mount realized for entries the view no longer has
+    stale = old.keys() - keys.keys() if only is None else ()
+    for name in stale:
+        for p in (mount / name, mount / (name + ".link")):
+            if p.exists() or p.is_symlink(): p.unlink()
+        if log: log(f"[OK] {provider} removed stale {name}")
+    (mount / REALIZED).write_text(json.dumps({"provider": provider, "env": env, "entries": keys}, indent=2, sort_keys=True))
     linkmap = { e["id"]: f"{view['mount']}/{e['id'].replace('@','_')}.agent.json" for e in view["entries"] }
-    (ROOT / ".rtt" / "linkmap.json").write_text(json.dumps({provider: linkmap}, indent=2))
+    return {"view": vrel, "provider": provider, "linkmap": linkmap, "deps": deps, "full": only is None, "entries": len(keys),
+            "realized": len(keys) - skipped, "unchanged": skipped, "removed": len(stale),
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+def record_deps(results):
+    with DepIndex(DEPS) as deps:
+        for r in results: deps.record_view(r["provider"], r["view"], r["deps"], replace=r["full"])
+
+def materialize(view_file: pathlib.Path):
+    res = materialize_view(view_file)
+    print(f"[OK] {res['provider']}: {res['realized']} realized, {res['unchanged']} unchanged")
+    # other providers' sections are kept; see common/linkmap.py
+    update_linkmap(LINKMAP, {res["provider"]: res["linkmap"]})
+    record_deps([res])
     print(f"[OK] wrote linkmap")
 
+_ov = None
+
+def _init_worker(ov):
+    global _ov
+    _ov = ov
+
+def _materialize_worker(view_file):
+    return materialize_view(view_file, _ov, log=None)
+
+def materialize_all(workers=None):
+    """Every views/*.view.json in a process pool sharing one preloaded overlay set,
+    then a single merged linkmap write."""
+    t0 = time.perf_counter()
+    views = sorted(VIEWS.glob("*.view.json"))
+    ov = Overlays(OVERLAYS).preload()
+    workers = min(workers or os.cpu_count() or 1, len(views)) or 1
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ov,)) as ex:
+            results = list(ex.map(_materialize_worker, views))
+    else:
+        results = [materialize_view(v, ov, log=None) for v in views]
+    mounts = {}
+    for r in results:
+        print(f"[OK] {r['view']}: {r['entries']} entries, {r['realized']} realized, {r['unchanged']} unchanged, "
+              f"{r['removed']} removed in {r['seconds']:.2f}s")
+        mounts.setdefault(r["provider"], []).append(r["view"])
+    for prov, vs in mounts.items():
+        if len(vs) > 1: print(f"[WARN] provider {prov} has several views, linkmap keeps {vs[-1]}", file=sys.stderr)
+    update_linkmap(LINKMAP, {r["provider"]: r["linkmap"] for r in results})
+    record_deps(results)
+    print(f"[OK] {len(results)} views with {workers} workers in {time.perf_counter() - t0:.2f}s; wrote linkmap")
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("usage: view_materialize.py views/<provider>.view.json")
+    opts = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "1") for a in sys.argv[1:] if a.startswith("--"))
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if "all" in opts:
+        materialize_all(int(opts["workers"]) if "workers" in opts else None)
+    elif not args:
+        print("usage: view_materialize.py views/<provider>.view.json | --all [--workers=N]")
         sys.exit(2)
-    materialize(ROOT / sys.argv[1])
+    else:
+        materialize(ROOT / args[0])
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Read-only view server: realizes provider/id@ver on demand through
+# common.views.ViewResolver instead of materializing whole views to disk.
+#
+#   GET /<provider>/<id@ver>   realized agent document (application/json)
+#   GET /<provider>/           the view's entries
+#   GET /_stats                LRU hits / misses / evictions / invalidations
+#
+# usage: python -m tools.view_server serve [--port=N] [--host=H] [--capacity=N] [--env=E]
+#        python -m tools.view_server get <provider> <id@ver> [--env=E]
+import json, sys, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+from .common.views import ViewResolver
+
+ROOT = Path(__file__).resolve().parents[1]
+PORT = 7878
+
+class _Handler(BaseHTTPRequestHandler):
+    def _send(self, code, body, ctype="application/json"):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype); self.send_header("Content-Length", str(len(body)))
+        self.end_headers(); self.wfile.write(body)
+
+    def do_GET(self):
+        res = self.server.resolver
+        parts = [unquote(p) for p in self.path.split("?", 1)[0].strip("/").split("/")]
+        try:
+            if parts == ["_stats"]:
+                return self._send(200, json.dumps(res.info()).encode())
+            if len(parts) == 1 and parts[0]:
+                ids = res.entries(parts[0])
+                if not ids: return self._send(404, b'{"error": "no such view"}')
+                return self._send(200, json.dumps({"provider": parts[0], "entries": ids}).encode())
+            if len(parts) == 2:
+                doc = res.get(*parts)
+                if doc is None: return self._send(404, b'{"error": "not in view or registry"}')
+                return self._send(200, doc)
+            self._send(404, b'{"error": "use /<provider>/<id@ver>"}')
+        except Exception as e:
+            self._send(500, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode())
+
+    def log_message(self, fmt, *args):   # per-request logging would dominate sub-ms reads
+        pass
+
+def serve(host="127.0.0.1", port=PORT, root=ROOT, **kw):
+    resolver = ViewResolver(root, **kw)
+    srv = ThreadingHTTPServer((host, port), _Handler); srv.resolver = resolver
+    print(f"[OK] view server: http://{host}:{port}/ ({', '.join(resolver.info()['providers']) or 'no views'})")
+    try: srv.serve_forever()
+    finally:
+        srv.server_close(); resolver.close()
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opts = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "1") for a in sys.argv[1:] if a.startswith("--"))
+    if not args or args[0] not in ("serve", "get") or (args[0] == "get" and len(args) < 3):
+        print("usage: view_server.py serve [--port=N] [--host=H] [--capacity=N] [--env=E] | get <provider> <id@ver> [--env=E]")
+        sys.exit(2)
+    env = opts.get("env", "prod")
+    if args[0] == "serve":
+        serve(opts.get("host", "127.0.0.1"), int(opts.get("port", PORT)), env=env, capacity=int(opts.get("capacity", 4096)))
+        return
+    with ViewResolver(ROOT, env=env) as res:
+        t0 = time.perf_counter()
+        doc = res.get(args[1], args[2])
+        dt = time.perf_counter() - t0
+    if doc is None:
+        raise SystemExit(f"[ERR] {args[1]}/{args[2]}: not in view or registry")
+    sys.stdout.write(doc.decode() + "\n")
+    print(f"[OK] resolved in {dt * 1e3:.3f}ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
-import json, sys, pathlib
+import json, os, sys, pathlib
 ROOT = pathlib.Path(__file__).resolve().parents[1]
+from common.deps import DepIndex
 MANI = ROOT / ".rtt" / "manifests"
+DEPS = ROOT / ".rtt" / "cache" / "deps.db"
 
 def to_rtt(agent):
     id_ = agent["id"]
@@ -23,17 +25,30 @@ def to_rtt(agent):
         }
     }
 
-def main():
-    if len(sys.argv) < 2:
-        print("usage: view_to_rtt.py providers/<prov>/.<prov>/agents/*.agent.json")
-        sys.exit(2)
+def agent_of(doc):
+    # realized registry records wrap the agent: {"type": "agent", "agent": {...}}
+    return doc["agent"] if doc.get("type") == "agent" and isinstance(doc.get("agent"), dict) else doc
+
+def convert(paths, log=print):
+    """Write the RTT manifest for each realized agent file; returns [(realized, manifest)]
+    (repo-relative) and records them in the dependency index."""
     MANI.mkdir(parents=True, exist_ok=True)
-    for p in sys.argv[1:]:
+    done = []
+    for p in paths:
         ag = json.loads(open(p, 'r', encoding='utf-8').read())
-        doc = to_rtt(ag)
+        doc = to_rtt(agent_of(ag))
         name = pathlib.Path(p).stem
         out = MANI / f"agent.{name}.json"
         out.write_text(json.dumps(doc, indent=2))
-        print(f"[OK] wrote {out}")
+        done.append((os.path.relpath(os.path.abspath(p), ROOT), os.path.relpath(out, ROOT)))
+        if log: log(f"[OK] wrote {out}")
+    with DepIndex(DEPS) as deps: deps.record_manifests(done)
+    return done
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: view_to_rtt.py providers/<prov>/.<prov>/agents/*.agent.json")
+        sys.exit(2)
+    convert(sys.argv[1:])
 if __name__ == "__main__":
     main()
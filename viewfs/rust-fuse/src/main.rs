@@ -7,6 +7,8 @@ use tokio::runtime::Runtime;
 struct ViewFs {
     cas_dir: PathBuf,
     overlays_dir: PathBuf,
+    // JSON export of the sqlite registry (.rtt/registry/index.db); ingests no longer
+    // write it, so refresh it with `python tools/registry_db.py export` before mounting
     index_file: PathBuf,
 }
 